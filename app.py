@@ -1,7 +1,9 @@
 from app import create_app
 from app.extensions import socketio
+from app.services.background import start_background_services
 
 app = create_app()
+start_background_services(app)
 
 if __name__ == '__main__':
     # app.run(debug=True)
@@ -9,10 +9,11 @@ def create_app():
 
     app.config.from_object(get_config())
     from app.extensions import (
-        db, migrate, csrf, mail, limiter, login_manager, cors, socketio
+        db, migrate, csrf, mail, limiter, login_manager, cors, socketio, cache
     )
     
     db.init_app(app)
+    cache.init_app(app)
     migrate.init_app(app, db)
     csrf.init_app(app)
     mail.init_app(app)
@@ -54,6 +55,13 @@ def create_app():
     from app.main.routes.filters import remove_headings_filter
 
     app.jinja_env.filters['remove_headings'] = remove_headings_filter
+    # Derives display HTML for blog posts, samples and services when they are saved
+    from app.services import content_derivation  # noqa: F401
+    from app.utils.fragment_cache import cached_fragment
+    from app.utils.page_cache import init_page_cache
+
+    app.jinja_env.globals['cached_fragment'] = cached_fragment
+    init_page_cache(app)
 
     app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp, subdomain="auth")
@@ -195,9 +203,11 @@ def create_app():
 
     @app.context_processor
     def tags_context_processor():
-        from app.models import ServiceCategory
+        # Lazy and cached per worker: no query unless a template uses it,
+        # refreshed when a ServiceCategory change is committed
+        from app.services.reference_data import lazy_service_categories
         return {
-            'service_categories': ServiceCategory.query.all()
+            'service_categories': lazy_service_categories
         }
     
     # @app.context_processor
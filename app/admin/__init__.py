@@ -12,3 +12,4 @@ from app.admin.routes.orders import orders
 from app.admin.routes.payments import payment
 from app.admin.routes.services import services
 from app.admin.routes.users import users
+from app.admin.routes import exports
@@ -0,0 +1,54 @@
+from flask import request, redirect, flash, url_for, Response, stream_with_context, current_app
+from flask_login import login_required
+from app.admin.routes.decorator import admin_required
+from app.services.exports import ExportService, ExportError, EXPORT_FORMATS
+from app.admin import admin_bp
+
+
+@admin_bp.context_processor
+def export_formats_context():
+    # List pages only offer the formats this install can produce
+    return {'export_formats': ExportService.available_formats()}
+
+
+def _export(dataset, list_endpoint):
+    """Stream ``dataset`` in the requested format, filtered like its list page."""
+    fmt = request.args.get('format', 'csv').lower()
+    filters = ExportService.filters_from(dataset, request.args)
+    try:
+        stream = ExportService.stream(dataset, fmt, filters)
+    except ExportError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for(list_endpoint, **filters))
+
+    current_app.logger.info(f"Exporting {dataset} as {fmt} with filters {filters}")
+    return Response(
+        stream_with_context(stream),
+        mimetype=EXPORT_FORMATS[fmt][0],
+        headers={
+            'Content-Disposition': f'attachment; filename="{ExportService.filename(dataset, fmt)}"',
+            # Let proxies pass chunks through instead of buffering the whole file
+            'X-Accel-Buffering': 'no',
+        }
+    )
+
+@admin_bp.route('/orders/export')
+@login_required
+@admin_required
+def export_orders():
+    """Export orders matching the order list filters."""
+    return _export('orders', 'admin.list_orders')
+
+@admin_bp.route('/payments/export')
+@login_required
+@admin_required
+def export_payments():
+    """Export payments matching the payment list filters."""
+    return _export('payments', 'admin.list_payments')
+
+@admin_bp.route('/users/export')
+@login_required
+@admin_required
+def export_users():
+    """Export users matching the user list filters."""
+    return _export('users', 'admin.list_users')
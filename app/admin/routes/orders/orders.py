@@ -11,6 +11,9 @@ from flask_login import login_required, current_user
 # from app.models.service import Service
 # from app.models.user import User
 from app.admin import admin_bp
+from app.services.admin_orders import AdminOrderList
+from app.services.dashboard_stats import DashboardStats
+from app.utils.pagination import clamp_limit, InvalidCursor
 from app.extensions import db
 from datetime import datetime
 import os
@@ -19,53 +22,39 @@ import os
 @login_required
 @admin_required
 def list_orders():
-    """Display all orders with filtering options."""
+    """Display orders with filtering options, one keyset page at a time."""
     status_filter = request.args.get('status', '')
     search_query = request.args.get('search', '')
-    
-    # Base query
-    query = Order.query
-    
-    # Apply filters
-    if status_filter:
-        query = query.filter(Order.status == status_filter)
-        
-    if search_query:
-        query = query.filter(
-            (Order.order_number.ilike(f'%{search_query}%')) |
-            (Order.subject.ilike(f'%{search_query}%')) |
-            (Order.topic.ilike(f'%{search_query}%'))
-        )
-    
-    # Get the sorted orders
-    sort_by = request.args.get('sort_by', 'created_at')
-    sort_order = request.args.get('sort_order', 'desc')
-    
-    if sort_order == 'desc':
-        query = query.order_by(getattr(Order, sort_by).desc())
-    else:
-        query = query.order_by(getattr(Order, sort_by).asc())
-    
-    orders = query.all()
-    
-    # Get stats for the sidebar
-    pending_count = Order.query.filter_by(status='pending').count()
-    in_progress_count = Order.query.filter_by(status='active').count()
-    under_review_count = Order.query.filter_by(status='completed pending review').count()
-    completed_count = Order.query.filter_by(status='completed').count()
-    revision_count = Order.query.filter_by(status='revision').count()
+    sort_by, sort_order = AdminOrderList.normalize_sort(
+        request.args.get('sort_by'), request.args.get('sort_order')
+    )
+    cursor = request.args.get('cursor')
+
+    try:
+        page = AdminOrderList.page(status_filter, search_query, sort_by, sort_order,
+                                   cursor=cursor, limit=clamp_limit(request.args.get('limit'), default=25))
+    except InvalidCursor:
+        return redirect(url_for('admin.list_orders', status=status_filter, search=search_query,
+                                sort_by=sort_by, sort_order=sort_order))
+
+    # Sidebar counts come from the cached dashboard snapshot
+    stats = DashboardStats.snapshot()
+    count = lambda status: DashboardStats.status_count(stats, status)
     now = datetime.now()
     return render_template('admin/orders/list.html', 
-                           orders=orders,
+                           orders=page.items,
+                           next_cursor=page.next_cursor,
+                           has_more=page.has_more,
+                           is_first_page=not cursor,
                            status_filter=status_filter,
                            search_query=search_query,
                            sort_by=sort_by,
                            sort_order=sort_order,
-                           pending_count=pending_count,
-                           in_progress_count=in_progress_count,
-                           under_review_count=under_review_count,
-                           completed_count=completed_count,
-                           revision_count=revision_count,
+                           pending_count=count('pending'),
+                           in_progress_count=count('active'),
+                           under_review_count=count('completed pending review'),
+                           completed_count=count('completed'),
+                           revision_count=count('revision'),
                            now=now,
                            title='Order Management')
 
@@ -137,10 +126,10 @@ def update_status(order_id):
         order.completion_date = datetime.now()
     
     order.status = new_status
-    db.session.commit()
 
     from app.services.triggers.triggers import handle_assignment_status_change
     handle_assignment_status_change(order.id, status=new_status)
+    db.session.commit()
     # notify(current_user,
     #         title=f"Order #{order.order_number} status updated to {new_status}",
     #         message="Order status updated successfully",
@@ -1,5 +1,5 @@
 from flask import request, render_template, redirect, flash, url_for, current_app
-from app.models.payment import Payment, Transaction, Refund, Invoice
+from app.models.payment import Payment, Transaction, Refund, Invoice, DailyRevenue
 from app.services.triggers.triggers import handle_payment_completion, handle_assignment_status_change
 from datetime import datetime, timedelta
 from app.models.order import Order 
@@ -7,6 +7,7 @@ from app.models.user import User
 from flask_login import login_required, current_user
 from app.admin.routes.decorator import admin_required
 from app.admin import admin_bp
+from app.services.admin_filters import filter_payments
 from app.extensions import db
 
 @admin_bp.route('/payments/')
@@ -19,35 +20,8 @@ def list_payments():
     date_from = request.args.get('date_from', '')
     date_to = request.args.get('date_to', '')
     
-    # Base query
-    query = Payment.query
-    
-    # Apply filters
-    if status_filter:
-        query = query.filter(Payment.status == status_filter)
-        
-    if search_query:
-        query = query.join(Order).join(User).filter(
-            (Order.order_number.ilike(f'%{search_query}%')) |
-            (User.username.ilike(f'%{search_query}%')) |
-            (User.email.ilike(f'%{search_query}%')) |
-            (Payment.transaction_id.ilike(f'%{search_query}%'))
-        )
-    
-    if date_from:
-        try:
-            date_from_obj = datetime.strptime(date_from, '%Y-%m-%d')
-            query = query.filter(Payment.created_at >= date_from_obj)
-        except ValueError:
-            pass
-    
-    if date_to:
-        try:
-            date_to_obj = datetime.strptime(date_to, '%Y-%m-%d')
-            date_to_obj = date_to_obj + timedelta(days=1)  # Include the entire day
-            query = query.filter(Payment.created_at < date_to_obj)
-        except ValueError:
-            pass
+    # Same filters as the payments export
+    query = filter_payments(Payment.query, status_filter, search_query, date_from, date_to)
     
     # Get the sorted payments
     sort_by = request.args.get('sort_by', 'created_at')
@@ -109,7 +83,9 @@ def update_payment_status(payment_id):
         flash('Invalid status value', 'danger')
         return redirect(url_for('admin.view_payment', payment_id=payment_id))
     
+    previous_status = payment.status
     payment.status = new_status
+    DailyRevenue.record_payment(payment, previous_status)
     
     # If marking as completed, set payment date
     if new_status == 'completed' and not payment.payment_date:
@@ -158,6 +134,7 @@ def record_payment(order_id):
     )
     db.session.add(payment)
     db.session.flush()  
+    DailyRevenue.record_payment(payment)
     invoice = Invoice(
         order_id=order.id,
         user_id=current_user.id,
@@ -171,14 +148,14 @@ def record_payment(order_id):
     db.session.add(invoice)
     db.session.flush()
 
-    handle_payment_completion(order.id)
+    handle_payment_completion(order.id, payment.id)
 
     order.paid = True
     order.status = 'active'
 
-    db.session.commit()
-    
     handle_assignment_status_change(order.id, status='in_progress')
+
+    db.session.commit()
     
     flash('Payment recorded successfully', 'success')
     return redirect(url_for('admin.view_order', order_id=order_id))
@@ -218,6 +195,7 @@ def create_refund(payment_id):
         # Update payment status to refunded if full refund
         if amount == payment.amount:
             payment.status = 'refunded'
+            DailyRevenue.record_payment(payment, 'completed')
             if payment.order:
                 payment.order.payment_status = 'Refunded'
         
@@ -7,6 +7,7 @@ from sqlalchemy import func, and_
 from app.admin.routes.decorator import admin_required
 from flask_login import login_required, current_user
 from app.admin import admin_bp
+from app.services.admin_filters import filter_users
 from app.extensions import db
 from datetime import timedelta
 import uuid
@@ -20,22 +21,8 @@ def list_users():
     admin_filter = request.args.get('admin', '')
     search_query = request.args.get('search', '')
     
-    # Base query
-    query = User.query
-    
-    # Apply filters
-    if admin_filter == 'true':
-        query = query.filter(User.is_admin == True)
-    elif admin_filter == 'false':
-        query = query.filter(User.is_admin == False)
-        
-    if search_query:
-        query = query.filter(
-            (User.username.ilike(f'%{search_query}%')) |
-            (User.email.ilike(f'%{search_query}%')) |
-            (User.first_name.ilike(f'%{search_query}%')) |
-            (User.last_name.ilike(f'%{search_query}%'))
-        )
+    # Same filters as the users export
+    query = filter_users(User.query, admin_filter, search_query)
     
     # Get the sorted users
     sort_by = request.args.get('sort_by', 'created_at')
@@ -1,10 +1,13 @@
 class NotificationManager {
     constructor() {
         this.allNotifications = [];
-        this.filteredNotifications = [];
         this.currentPage = 0;
         this.pageSize = 50;
+        this.nextCursor = null;
+        this.hasMore = false;
         this.isLoading = false;
+        this.requestId = 0;
+        this.searchTimer = null;
         this.searchTerm = '';
         this.typeFilter = '';
         this.statusFilter = '';
@@ -57,8 +60,9 @@ class NotificationManager {
             searchInput.addEventListener('input', (e) => {
                 this.searchTerm = e.target.value;
                 this.updateSearchClearButton();
-                this.filterNotifications();
-                this.renderModalNotifications();
+                // Wait for a pause in typing before asking the server
+                clearTimeout(this.searchTimer);
+                this.searchTimer = setTimeout(() => this.loadAllNotifications(), 300);
             });
         }
         
@@ -67,8 +71,8 @@ class NotificationManager {
                 searchInput.value = '';
                 this.searchTerm = '';
                 this.updateSearchClearButton();
-                this.filterNotifications();
-                this.renderModalNotifications();
+                clearTimeout(this.searchTimer);
+                this.loadAllNotifications();
             });
         }
         
@@ -79,16 +83,24 @@ class NotificationManager {
         if (typeFilter) {
             typeFilter.addEventListener('change', (e) => {
                 this.typeFilter = e.target.value;
-                this.filterNotifications();
-                this.renderModalNotifications();
+                this.loadAllNotifications();
             });
         }
         
         if (statusFilter) {
             statusFilter.addEventListener('change', (e) => {
                 this.statusFilter = e.target.value;
-                this.filterNotifications();
-                this.renderModalNotifications();
+                this.loadAllNotifications();
+            });
+        }
+        
+        // Load the next page when the list is scrolled near its end
+        const modalList = document.getElementById('notif-modal-list');
+        if (modalList) {
+            modalList.addEventListener('scroll', () => {
+                if (modalList.scrollTop + modalList.clientHeight >= modalList.scrollHeight - 100) {
+                    this.loadMoreNotifications();
+                }
             });
         }
         
@@ -151,19 +163,27 @@ class NotificationManager {
         }
     }
     
-    async loadAllNotifications() {
-        if (this.isLoading) return;
+    async loadAllNotifications(cursor = null) {
+        // Only one page at a time; a first page (new filters) replaces any request in flight
+        if (cursor && this.isLoading) return;
         
         this.isLoading = true;
-        this.showLoading(); 
+        if (!cursor) {
+            this.nextCursor = null;
+            this.hasMore = false;
+            this.showLoading();
+        }
         
         try {
-            // Use existing socket method to get notifications
+            // The server applies the filters, so a search also finds older notifications
             if (socketClient) {
-                console.log('Emitting get_all_notifications')
                 socketClient.socket.emit('get_all_notifications', {
-                    offset: 0,
-                    limit: 1000 // Load a large number for modal
+                    cursor: cursor,
+                    limit: this.pageSize,
+                    type: this.typeFilter,
+                    status: this.statusFilter,
+                    search: this.searchTerm.trim(),
+                    request_id: ++this.requestId
                 });
             }
         } catch (error) {
@@ -173,46 +193,33 @@ class NotificationManager {
         }
     }
     
+    loadMoreNotifications() {
+        if (this.hasMore && this.nextCursor) {
+            this.loadAllNotifications(this.nextCursor);
+        }
+    }
+    
     handleNotificationsLoaded(data) {
-        this.allNotifications = data.notifications || [];
-        this.filterNotifications();
+        // Ignore answers to requests made before the filters last changed
+        if (data.request_id !== this.requestId) return;
+        
+        const notifications = data.notifications || [];
+        // A request without a cursor starts over; later pages are appended
+        this.allNotifications = data.cursor ? this.allNotifications.concat(notifications) : notifications;
+        this.nextCursor = data.next_cursor || null;
+        this.hasMore = !!data.has_more;
         this.renderModalNotifications();
         this.hideLoading();
         this.isLoading = false;
     }
     
-    filterNotifications() {
-        this.filteredNotifications = this.allNotifications.filter(notification => {
-            // Search filter
-            if (this.searchTerm) {
-                const searchLower = this.searchTerm.toLowerCase();
-                const titleMatch = notification.title.toLowerCase().includes(searchLower);
-                const messageMatch = notification.message.toLowerCase().includes(searchLower);
-                if (!titleMatch && !messageMatch) return false;
-            }
-            
-            // Type filter
-            if (this.typeFilter && notification.type !== this.typeFilter) {
-                return false;
-            }
-            
-            // Status filter
-            if (this.statusFilter) {
-                if (this.statusFilter === 'read' && !notification.is_read) return false;
-                if (this.statusFilter === 'unread' && notification.is_read) return false;
-            }
-            
-            return true;
-        });
-    }
-    
     renderModalNotifications() {
         const modalList = document.getElementById('notif-modal-list');
         const emptyState = document.getElementById('notif-empty-state');
         
         if (!modalList) return;
         
-        if (this.filteredNotifications.length === 0) {
+        if (this.allNotifications.length === 0) {
             modalList.innerHTML = '';
             if (emptyState) emptyState.style.display = 'block';
             return;
@@ -220,7 +227,7 @@ class NotificationManager {
         
         if (emptyState) emptyState.style.display = 'none';
         
-        modalList.innerHTML = this.filteredNotifications.map(notification => 
+        modalList.innerHTML = this.allNotifications.map(notification => 
             this.createModalNotificationHTML(notification)
         ).join('');
         
@@ -273,22 +280,25 @@ class NotificationManager {
                 notification.is_read = true;
             }
             
-            this.filterNotifications();
             this.renderModalNotifications();
         }
     }
     
     markAllAsRead() {
-        const unreadNotifications = this.filteredNotifications.filter(n => !n.is_read);
+        const unreadNotifications = this.allNotifications.filter(n => !n.is_read);
         
         if (unreadNotifications.length === 0) {
             this.showToast('No unread notifications to mark', 'info');
             return;
         }
         
-        unreadNotifications.forEach(notification => {
-            this.markAsRead(notification.id);
-        });
+        if (socketClient) {
+            socketClient.markNotificationsRead(unreadNotifications.map(n => n.id));
+            unreadNotifications.forEach(notification => {
+                notification.is_read = true;
+            });
+            this.renderModalNotifications();
+        }
         
         this.showToast(`Marked ${unreadNotifications.length} notifications as read`, 'success');
     }
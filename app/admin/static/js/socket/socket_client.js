@@ -86,6 +86,10 @@ class SocketClient {
             this.handleNotificationMarkedRead(data.notification_id);
         });
         
+        this.socket.on('notifications_marked_read', (data) => {
+            data.notification_ids.forEach(id => this.handleNotificationMarkedRead(id));
+        });
+        
         this.socket.on('notifications_loaded', (data) => {
             this.handleNotificationsLoaded(data);
         });
@@ -219,6 +223,10 @@ class SocketClient {
     // Notification methods
     handleNewNotification(data) {
         const notification = data.notification;
+        // Admin fan-outs arrive as one admin_room emit carrying every admin's notification id
+        if (data.notification_ids) {
+            notification.id = data.notification_ids[String(currentUserId)];
+        }
         const soundType = data.sound_type || 'notification';
         const priority = data.priority || 'normal';
         
@@ -318,6 +326,11 @@ class SocketClient {
         this.socket.emit('mark_notification_read', { notification_id: notificationId });
     }
     
+    markNotificationsRead(notificationIds) {
+        // One bulk UPDATE on the server instead of one event per notification
+        this.socket.emit('mark_notifications_read', { notification_ids: notificationIds });
+    }
+    
     markAllNotificationsRead() {
         // Get all unread notification IDs
         const unreadNotifications = document.querySelectorAll('.notification-item:not(.read)');
@@ -326,12 +339,12 @@ class SocketClient {
             this.showToast('No unread notifications', 'info');
             return;
         }
-        unreadNotifications.forEach(notif => {
-            const notificationId = notif.dataset.notificationId;
-            if (notificationId) {
-                this.markNotificationRead(parseInt(notificationId));
-            }
-        });
+        const notificationIds = Array.from(unreadNotifications)
+            .map(notif => parseInt(notif.dataset.notificationId))
+            .filter(id => !isNaN(id));
+        if (notificationIds.length > 0) {
+            this.markNotificationsRead(notificationIds);
+        }
 
         this.showToast(`Marked ${unreadNotifications.length} notifications as read`, 'success');
     }
@@ -374,16 +387,16 @@ class SocketClient {
         }, 2000);
     }
     
-    loadNotifications(offset = 0, limit = 20) {
-        this.socket.emit('get_notifications', { offset, limit });
+    loadNotifications(cursor = null, limit = 20) {
+        this.socket.emit('get_notifications', { cursor, limit });
     }
     
     handleNotificationsLoaded(data) {
         const notificationsList = document.getElementById('notifications-list');
         if (!notificationsList) return;
         
-        // Clear existing notifications if offset is 0
-        if (data.offset === 0) {
+        // Clear existing notifications on the first page
+        if (!data.cursor) {
             notificationsList.innerHTML = '';
         }
         
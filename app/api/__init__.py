@@ -4,6 +4,7 @@ api_bp = Blueprint('api', __name__)
 
 from app.api.routes import homepage, calculate_price, profile_pic
 from app.api.routes.client.chats import chat_modal
+from app.api.routes.client.notifications import notifications
 from app.api.routes.admin import dashboard
 from app.api.routes.admin.blogs import blogs
 from app.api.routes.admin.samples import samples
@@ -9,10 +9,47 @@ from app.extensions import db
 from flask import jsonify, request, current_app
 from app.utils.file_upload import allowed_file
 from app.admin.routes.orders.utils import MAX_FILE_SIZE, get_file_format
+from app.services.admin_orders import AdminOrderList
+from app.utils.pagination import clamp_limit, InvalidCursor
 from werkzeug.utils import secure_filename
 import uuid
 import os 
 
+@api_bp.route('/admin/orders', methods=['GET'])
+@login_required
+@admin_required
+def list_orders_page():
+    """
+    One keyset page of the admin order list. Accepts status, search, sort_by,
+    sort_order, limit and the cursor returned by the previous page.
+    """
+    try:
+        page = AdminOrderList.page(
+            request.args.get('status'),
+            request.args.get('search'),
+            request.args.get('sort_by'),
+            request.args.get('sort_order'),
+            cursor=request.args.get('cursor'),
+            limit=clamp_limit(request.args.get('limit'), default=25, maximum=100)
+        )
+        return jsonify({
+            'success': True,
+            'orders': [AdminOrderList.serialize(order) for order in page.items],
+            'next_cursor': page.next_cursor,
+            'has_more': page.has_more
+        })
+    except InvalidCursor:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid cursor'
+        }), 400
+    except Exception as e:
+        current_app.logger.error(f"Error listing orders: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to list orders'
+        }), 500
+
 @api_bp.route('/admin/delivery/<int:order_id>/upload-additional-files', methods=['POST'])
 @login_required
 @admin_required
@@ -37,7 +74,7 @@ def upload_additional_delivery_files(order_id):
                 db.session.add(delivery)
                 db.session.flush()
 
-                handle_order_delivery(order_id)
+                handle_order_delivery(order_id, delivery.id)
 
             except Exception as e:
                 import logging 
@@ -254,9 +291,9 @@ def request_deadline_extension():
         
         # Save to database
         db.session.add(support_ticket)
+        handle_deadline_extension_request(order.id, reason=description)
         db.session.commit()
 
-        handle_deadline_extension_request(order.id, reason=description)
         # send_extension_request_email(order, order.client)
         return jsonify({
             'success': True,
@@ -149,6 +149,7 @@ def update_ticket_status(ticket_id):
                     new_status=new_status,
                     admin_note=admin_note
                 )
+                db.session.commit()
         except Exception as e:
             # Log the error but don't fail the request
             current_app.logger.error(f"Failed to send notification for ticket {ticket_id}: {str(e)}")
@@ -257,6 +258,7 @@ def delete_ticket(ticket_id):
                     type='info',
                     link=f"/orders/{order_id}"
                 )
+                db.session.commit()
         except Exception as e:
             current_app.logger.error(f"Failed to send deletion notification for ticket {ticket_id}: {str(e)}")
         
@@ -390,6 +392,7 @@ def bulk_ticket_action(ticket_id):
                                     type='info',
                                     link=f"/orders/{ticket.order_id}"
                                 )
+                                db.session.commit()
                         except Exception:
                             pass
                     else:
@@ -2,7 +2,18 @@ from flask import jsonify, current_app, request
 from app.api import api_bp
 from app.models.service import Service, AcademicLevel, Deadline
 from app.models.price import PriceRate, PricingCategory
+from app.services.pricing import get_price_matrix
+from app.services.reference_data import get_reference_snapshot
 from bs4 import BeautifulSoup
+import numpy as np
+
+REPORT_PRICES = {
+    "standard": 4.99,
+    "turnitin": 9.99,
+}
+
+# Upper bound on quotes computed by one /calculate-price/batch call
+MAX_BATCH_QUOTES = 5000
 
 def calculate_price_internal(service_id, academic_level_id, hours_until_deadline, word_count=0, report_type=None):
     """
@@ -19,38 +30,20 @@ def calculate_price_internal(service_id, academic_level_id, hours_until_deadline
         raise ValueError("Invalid data types provided")
     
     # Calculate report price
-    if report_type:
-        if report_type == "standard":
-            report_price = 4.99
-        elif report_type == "turnitin":
-            report_price = 9.99
-        else:
-            report_price = 0
-    else:
-        report_price = 0
+    report_price = REPORT_PRICES.get(report_type, 0) if report_type else 0
     
     # Validate deadline
     if hours_until_deadline <= 0:
         raise ValueError("Deadline cannot be less than or equal to zero hours from current time!")
     
-    # Find appropriate deadline
-    deadlines = Deadline.query.order_by(Deadline.hours.asc()).all()
-    if not deadlines:
+    # Find appropriate deadline in the compiled price index (no DB round trips)
+    matrix = get_price_matrix()
+    if not matrix.has_deadlines:
         raise RuntimeError("No deadlines configured in system")
         
-    deadline_id = None 
-    selected_deadline = None
-    
-    for deadline in deadlines:
-        if hours_until_deadline <= (deadline.hours + 1):
-            deadline_id = deadline.id
-            selected_deadline = deadline
-            break
-    
-    # If no matching deadline found, use the longest available deadline
-    if deadline_id is None:
-        selected_deadline = deadlines[-1]
-        deadline_id = selected_deadline.id
+    # If no matching deadline is found, the longest available deadline is used
+    deadline_idx = matrix.deadline_index(hours_until_deadline)
+    selected_deadline = matrix.deadline(deadline_idx)
     
     # Calculate page count (with safety check for division by zero)
     # words_per_page = getattr(Config, 'WORDS_PER_PAGE', 275)
@@ -61,23 +54,17 @@ def calculate_price_internal(service_id, academic_level_id, hours_until_deadline
     page_count = max(1, round(word_count / words_per_page, 2))
     
     # Get service
-    service = Service.query.get(service_id)
-    if not service:
+    if not matrix.has_service(service_id):
         raise ValueError("Service not found")
     
     # Look up the price rate
-    price_rate = PriceRate.query.filter_by(
-        pricing_category_id=service.pricing_category_id,
-        academic_level_id=academic_level_id,
-        deadline_id=deadline_id
-    ).first()
+    price_per_page = matrix.service_rate(service_id, academic_level_id, deadline_idx)
     
     # Validate price rate exists
-    if not price_rate:
+    if price_per_page is None:
         raise ValueError("Price rate not found for the given combination of service, academic level, and deadline")
     
     # Calculate prices
-    price_per_page = price_rate.price_per_page
     pages_price = price_per_page * page_count
     total_price = pages_price + report_price
     
@@ -87,7 +74,7 @@ def calculate_price_internal(service_id, academic_level_id, hours_until_deadline
         "pages_price": pages_price,
         "report_price": report_price,
         "total_price": total_price,
-        "selected_deadline": selected_deadline.to_dict(),
+        "selected_deadline": selected_deadline,
         "hours_until_deadline": round(hours_until_deadline, 2)
     }
 
@@ -133,29 +120,202 @@ def calculate_price():
         current_app.logger.error(f"Error calculating price: {str(e)}")
         return jsonify({"error": "Internal server error occurred while calculating price"}), 500
 
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def _batch_columns(data, matrix):
+    """
+    Turn a batch request body into parallel input columns.
+    Accepts either ``quotes`` (a list of objects or
+    ``[service_id, academic_level_id, deadline_data, word_count, report_type]``
+    tuples) or a ``grid`` spec that is expanded as a cartesian product.
+    """
+    shape = None
+    if data.get('grid') is not None:
+        grid = data['grid']
+        if not isinstance(grid, dict):
+            raise ValueError("grid must be an object")
+        service_ids = _as_list(grid.get('service_ids', grid.get('service_id')))
+        level_ids = _as_list(grid.get('academic_level_ids', grid.get('academic_level_id'))) or matrix.level_ids
+        hours = _as_list(grid.get('deadline_data')) or matrix.deadline_hours
+        word_counts = _as_list(grid.get('word_counts', grid.get('word_count'))) or [0]
+        if not service_ids:
+            raise ValueError("grid requires service_id or service_ids")
+
+        shape = [len(service_ids), len(level_ids), len(hours), len(word_counts)]
+        if int(np.prod(shape)) > MAX_BATCH_QUOTES:
+            raise ValueError(f"Too many quotes requested (maximum {MAX_BATCH_QUOTES})")
+
+        try:
+            axes = np.meshgrid(
+                np.asarray(service_ids, dtype=np.int64),
+                np.asarray(level_ids, dtype=np.int64),
+                np.asarray(hours, dtype=np.float64),
+                np.asarray(word_counts, dtype=np.int64),
+                indexing='ij'
+            )
+        except (ValueError, TypeError, OverflowError):
+            raise ValueError("Invalid data types provided")
+        columns = [axis.ravel() for axis in axes]
+        report_types = [grid.get('report_type', data.get('report_type'))] * columns[0].size
+        return columns, report_types, shape
+
+    quotes = data.get('quotes')
+    if not isinstance(quotes, list) or not quotes:
+        raise ValueError("Provide a non-empty 'quotes' list or a 'grid' spec")
+    if len(quotes) > MAX_BATCH_QUOTES:
+        raise ValueError(f"Too many quotes requested (maximum {MAX_BATCH_QUOTES})")
+
+    rows = []
+    for i, quote in enumerate(quotes):
+        if isinstance(quote, dict):
+            quote = (
+                quote.get('service_id'),
+                quote.get('academic_level_id'),
+                quote.get('deadline_data'),
+                quote.get('word_count', 0),
+                quote.get('report_type'),
+            )
+        elif not isinstance(quote, (list, tuple)) or not 3 <= len(quote) <= 5:
+            raise ValueError(f"Quote at index {i} must be an object or a 3-5 item array")
+        quote = tuple(quote) + (0, None)[len(quote) - 3:]
+        if None in quote[:3]:
+            raise ValueError(f"Quote at index {i} is missing service_id, academic_level_id or deadline_data")
+        rows.append(quote)
+
+    service_ids, level_ids, hours, word_counts, report_types = zip(*rows)
+    try:
+        columns = [
+            np.asarray(service_ids, dtype=np.int64),
+            np.asarray(level_ids, dtype=np.int64),
+            np.asarray(hours, dtype=np.float64),
+            np.asarray([w or 0 for w in word_counts], dtype=np.int64),
+        ]
+    except (ValueError, TypeError, OverflowError):
+        raise ValueError("Invalid data types provided")
+    return columns, list(report_types), shape
+
+
+def calculate_prices_batch(data):
+    """
+    Compute many quotes in one vectorized pass over the compiled price matrix.
+    Returns a columnar dict; rows that cannot be priced are null and listed in ``errors``.
+    """
+    matrix = get_price_matrix()
+    if not matrix.has_deadlines:
+        raise RuntimeError("No deadlines configured in system")
+
+    (service_ids, level_ids, hours, word_counts), report_types, shape = _batch_columns(data, matrix)
+
+    deadline_idx, price_per_page, known_service = matrix.service_rates(service_ids, level_ids, hours)
+
+    words_per_page = current_app.config.get('WORDS_PER_PAGE', 275)
+    if words_per_page <= 0:
+        words_per_page = 275
+
+    page_count = np.maximum(1, np.round(word_counts / words_per_page, 2))
+    report_price = np.asarray(
+        [REPORT_PRICES.get(report_type, 0) if report_type else 0 for report_type in report_types],
+        dtype=np.float64
+    )
+    pages_price = price_per_page * page_count
+    total_price = pages_price + report_price
+
+    errors = {}
+    for i in np.flatnonzero(np.isnan(price_per_page)).tolist():
+        errors[i] = "Price rate not found for the given combination of service, academic level, and deadline"
+    for i in np.flatnonzero(~known_service).tolist():
+        errors[i] = "Service not found"
+    for i in np.flatnonzero(hours <= 0).tolist():
+        errors[i] = "Deadline cannot be less than or equal to zero hours from current time!"
+
+    def column(values):
+        values = values.tolist()
+        for i in errors:
+            values[i] = None
+        return values
+
+    priced = np.ones(deadline_idx.shape, dtype=bool)
+    priced[list(errors)] = False
+    deadline_ids = np.asarray(matrix.deadline_ids, dtype=np.int64)[deadline_idx]
+    used_deadlines = {
+        matrix.deadline_ids[idx]: matrix.deadline(idx)
+        for idx in np.unique(deadline_idx[priced]).tolist()
+    }
+
+    result = {
+        "count": int(service_ids.size),
+        "columns": {
+            "service_id": service_ids.tolist(),
+            "academic_level_id": level_ids.tolist(),
+            "hours_until_deadline": np.round(hours, 2).tolist(),
+            "word_count": word_counts.tolist(),
+            "deadline_id": column(deadline_ids),
+            "price_per_page": column(price_per_page),
+            "page_count": page_count.tolist(),
+            "pages_price": column(pages_price),
+            "report_price": report_price.tolist(),
+            "total_price": column(total_price),
+        },
+        "deadlines": used_deadlines,
+        "errors": {str(i): message for i, message in sorted(errors.items())},
+    }
+    if shape is not None:
+        # Grid order is service x academic level x deadline x word count
+        result["shape"] = shape
+    return result
+
+
+@api_bp.route('/calculate-price/batch', methods=['POST'])
+def calculate_price_batch():
+    """
+    API endpoint to price many quotes (or a full level x deadline x word count grid) at once
+    """
+    data = request.get_json(silent=True)
+    
+    try:
+        if not data or not isinstance(data, dict):
+            return jsonify({"error": "No data provided"}), 400
+        
+        return jsonify(calculate_prices_batch(data))
+        
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        current_app.logger.error(f"Error calculating batch prices: {str(e)}")
+        return jsonify({"error": "Internal server error occurred while calculating prices"}), 500
+
 ##################################################################################################################################
 ############################### API Endpoints for Services, Academic Levels, and Deadlines for hero-sec #######################################
 
+def _reference_response(name):
+    """
+    Serve a pre-serialized reference-data payload with a strong ETag,
+    answering 304 when the client's copy is current
+    """
+    payload = get_reference_snapshot().payload(name)
+    response = current_app.response_class(payload.body, status=200, mimetype='application/json')
+    response.set_etag(payload.etag)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
 @api_bp.route('/get-services')
 def api_get_services():
     """
     API endpoint to fetch all services
-    Returns services organized by category
+    Served from the reference-data snapshot
     """
     try:
-        services = Service.query.all()
-        services_data = []
-        
-        for service in services:
-            services_data.append({
-                'id': service.id,
-                'name': service.name,
-                'pricing_category_id': service.pricing_category_id,
-                'description': getattr(service, 'description', ''),  # Include if available
-                'created_at': service.created_at.isoformat() if hasattr(service, 'created_at') else None
-            })
-        
-        return jsonify(services_data), 200
+        return _reference_response('services')
         
     except Exception as e:
         return jsonify({
@@ -167,24 +327,10 @@ def api_get_services():
 @api_bp.route('/academic-levels')
 def api_get_academic_levels():
     """
-    API endpoint to fetch all academic levels
+    API endpoint to fetch all academic levels, sorted by order
     """
     try:
-        academic_levels = AcademicLevel.query.all()
-        levels_data = []
-        
-        for level in academic_levels:
-            levels_data.append({
-                'id': level.id,
-                'name': level.name,
-                'description': getattr(level, 'description', ''),  # Include if available
-                'order': getattr(level, 'order', level.id)  # Use order if available, otherwise use id
-            })
-        
-        # Sort by order if available
-        levels_data.sort(key=lambda x: x['order'])
-        
-        return jsonify(levels_data), 200
+        return _reference_response('academic_levels')
         
     except Exception as e:
         return jsonify({
@@ -196,25 +342,10 @@ def api_get_academic_levels():
 @api_bp.route('/deadlines')
 def api_get_deadlines():
     """
-    API endpoint to fetch all deadlines
+    API endpoint to fetch all deadlines, sorted by order
     """
     try:
-        deadlines = Deadline.query.all()
-        deadlines_data = []
-        
-        for deadline in deadlines:
-            deadlines_data.append({
-                'id': deadline.id,
-                'name': deadline.name,
-                'hours': deadline.hours,
-                'order': getattr(deadline, 'order', deadline.id),
-                'multiplier': getattr(deadline, 'multiplier', 1.0)  # Include if available
-            })
-        
-        # Sort by order
-        deadlines_data.sort(key=lambda x: x['order'])
-        
-        return jsonify(deadlines_data), 200
+        return _reference_response('deadlines')
         
     except Exception as e:
         return jsonify({
@@ -227,67 +358,11 @@ def api_get_deadlines():
 def api_get_all_form_data():
     """
     API endpoint to fetch all form data in one request
-    This is more efficient if you want to minimize API calls
+    Services are grouped by pricing category bucket (writing, proofreading, ...)
+    as defined by the PricingCategory table
     """
     try:
-        # Fetch all required data
-        services = Service.query.all()
-        academic_levels = AcademicLevel.query.all()
-        deadlines = Deadline.query.all()
-        
-        # Organize services by category
-        services_by_category = {
-            'writing': [],
-            'proofreading': [],
-            'technical': [],
-            'humanizing_ai': []
-        }
-        
-        for service in services:
-            service_data = {
-                'id': service.id,
-                'name': service.name,
-                'pricing_category_id': service.pricing_category_id,
-                'description': getattr(service, 'description', '')
-            }
-            
-            if service.pricing_category_id == 1:
-                services_by_category['writing'].append(service_data)
-            elif service.pricing_category_id == 2:
-                services_by_category['proofreading'].append(service_data)
-            elif service.pricing_category_id == 3:
-                services_by_category['technical'].append(service_data)
-            elif service.pricing_category_id == 4:
-                services_by_category['humanizing_ai'].append(service_data)
-        
-        # Prepare academic levels data
-        levels_data = []
-        for level in academic_levels:
-            levels_data.append({
-                'id': level.id,
-                'name': level.name,
-                'description': getattr(level, 'description', ''),
-                'order': getattr(level, 'order', level.id)
-            })
-        levels_data.sort(key=lambda x: x['order'])
-        
-        # Prepare deadlines data
-        deadlines_data = []
-        for deadline in deadlines:
-            deadlines_data.append({
-                'id': deadline.id,
-                'name': deadline.name,
-                'hours': deadline.hours,
-                'order': getattr(deadline, 'order', deadline.id),
-                'multiplier': getattr(deadline, 'multiplier', 1.0)
-            })
-        deadlines_data.sort(key=lambda x: x['order'])
-        
-        return jsonify({
-            'services': services_by_category,
-            'academic_levels': levels_data,
-            'deadlines': deadlines_data
-        }), 200
+        return _reference_response('form_data')
         
     except Exception as e:
         return jsonify({
@@ -296,22 +371,17 @@ def api_get_all_form_data():
         }), 500
 
 
-
-
-
 @api_bp.route('/services/cached')
-# @cache.cached(timeout=300)  # Cache for 5 minutes
 def api_get_services_cached():
     """
-    Cached version of services endpoint
+    Cached version of services endpoint (the snapshot is cached per worker)
     """
     return api_get_services()
 
 
 @api_bp.route('/academic-levels/cached')
-# @cache.cached(timeout=300)
 def api_get_academic_levels_cached():
     """
-    Cached version of academic levels endpoint
+    Cached version of academic levels endpoint (the snapshot is cached per worker)
     """
-    return api_get_academic_levels()
\ No newline at end of file
+    return api_get_academic_levels()
@@ -6,6 +6,7 @@ from app.models.user import User
 from app.models.order import Order
 from app.extensions import db
 from app.services.chat_services import ChatService
+from app.utils.pagination import clamp_limit, InvalidCursor
 from datetime import datetime
 
 from app.api import api_bp
@@ -14,48 +15,40 @@ from app.api import api_bp
 @api_bp.route('/client/chat/list')
 @login_required
 def get_user_chats():
-    """Get all chats for the current user"""
+    """Get the current user's chats, most recently active first (cursor-paginated)"""
     try:
-        # Get user chats
-        if current_user.is_admin:
-            chats = Chat.query.filter_by(admin_id=current_user.id).order_by(
-                Chat.created_at.desc()
-            ).all()
-        else:
-            chats = Chat.query.filter_by(user_id=current_user.id).order_by(
-                Chat.created_at.desc()
-            ).all()
+        page = ChatService.get_chat_summaries(
+            current_user.id,
+            is_admin=current_user.is_admin,
+            cursor=request.args.get('cursor'),
+            limit=clamp_limit(request.args.get('limit'), default=50, maximum=100)
+        )
         
         chat_list = []
-        for chat in chats:
-            # Get last message
-            last_message = ChatMessage.query.filter_by(
-                chat_id=chat.id
-            ).order_by(ChatMessage.created_at.desc()).first()
-            
-            # Count unread messages
-            unread_count = ChatMessage.query.filter(
-                ChatMessage.chat_id == chat.id,
-                ChatMessage.user_id != current_user.id,
-                ChatMessage.is_read == False
-            ).count()
-            
+        for chat in page.items:
             chat_data = {
                 'id': chat.id,
                 'subject': chat.subject,
                 'status': chat.status,
-                'last_message': last_message.content if last_message else 'No messages yet',
-                'unread_count': unread_count,
-                # 'updated_at': chat.updated_at.isoformat(),
+                'last_message': chat.last_message if chat.last_message is not None else 'No messages yet',
+                'unread_count': int(chat.unread_count),
+                'last_activity_at': chat.last_activity_at.isoformat(),
                 'created_at': chat.created_at.isoformat()
             }
             chat_list.append(chat_data)
         
         return jsonify({
             'success': True,
-            'chats': chat_list
+            'chats': chat_list,
+            'next_cursor': page.next_cursor,
+            'has_more': page.has_more
         })
         
+    except InvalidCursor:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid cursor'
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -223,11 +216,7 @@ def get_chat_messages(chat_id):
             message_list.append(message_data)
         
         # Mark messages as read for current user
-        ChatMessage.query.filter(
-            ChatMessage.chat_id == chat_id,
-            ChatMessage.user_id != current_user.id,
-            ChatMessage.is_read == False
-        ).update({'is_read': True})
+        ChatMessage.mark_chat_read(chat_id, current_user.id)
         db.session.commit()
         
         return jsonify({
@@ -0,0 +1,36 @@
+from flask import jsonify, request, current_app
+from flask_login import login_required, current_user
+from app.api import api_bp
+from app.sockets.utils import get_notifications_page
+from app.utils.pagination import InvalidCursor
+
+
+@api_bp.route('/client/notifications')
+@login_required
+def get_notifications():
+    """
+    Get one page of the current user's notifications, newest first.
+    Pass the returned ``next_cursor`` back as ``?cursor=`` for the next page.
+    """
+    try:
+        page = get_notifications_page(
+            current_user.id,
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', 20),
+            notification_type=request.args.get('type'),
+            status=request.args.get('status'),
+            search=request.args.get('search')
+        )
+        return jsonify(dict(page, success=True))
+    
+    except InvalidCursor:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid cursor'
+        }), 400
+    except Exception as e:
+        current_app.logger.error(f"Error fetching notifications for user {current_user.id}: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to load notifications'
+        }), 500
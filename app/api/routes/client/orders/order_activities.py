@@ -131,6 +131,7 @@ def update_order_deadline(order_id):
             link=url_for('admin.view_order', order_id=order.id),
             priority="normal"
         )
+        db.session.commit()
         
         return jsonify({'success': True})
     except ValueError:
@@ -144,13 +145,15 @@ def mark_order_complete(order_id):
     
     if not order.is_delivered:
         return jsonify({'success': False, 'error': 'Order has not been delivered yet'})
+    if order.status == 'completed':
+        return jsonify({'success': True})
     
     order.status = 'completed'
     order.updated_at = datetime.now()
-    db.session.commit()
     
     handle_assignment_status_change(order.id, status='completed')
-    handle_order_completion_by_client(order.id)
+    handle_order_completion_by_client(order.id, order.updated_at)
+    db.session.commit()
 
     # send_anything_else_email(current_user)
     return jsonify({'success': True})
@@ -189,10 +192,9 @@ def request_revision(order_id):
     db.session.commit()
 
     db.session.add(support)
-    db.session.commit()
-
     handle_revision_request(order.id, reason)
     handle_assignment_status_change(order.id, status='revision')
+    db.session.commit()
 
     # send_revision_request_email(order, current_user)
     return jsonify({'success': True})
@@ -179,6 +179,7 @@ Payoneer Payment Instructions:
     def send_notifications(support_ticket: Any, order: Any, user: Any) -> None:
         """Send notifications about the payment confirmation"""
         try:
+            from app.extensions import db
             from app.models.user import User
             from app.sockets.utils import send_system_notification as notify
             from app.utils.emails import send_admin_confirm_payment_email as send_email
@@ -188,6 +189,7 @@ Payoneer Payment Instructions:
             if admin_user:
                 notify(admin_user.id, "New Payment Confirmation", f"A payment confirmation has been submitted for Order #{order.order_number} by {user.get_name()}.", notification_type='alert', link=f"/admin/orders/{order.id}", priority='high')
             send_email(admin_user, order, support_ticket)
+            db.session.commit()
             
             current_app.logger.info(f"Notifications sent for support ticket {support_ticket.id}")
             
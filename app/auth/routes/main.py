@@ -57,6 +57,7 @@ def login():
                 flash('Please verify your email first.', 'warning')
                 send_verification_email(user)
                 send_welcome_email(user)
+                db.session.commit()
                 return redirect(url_for('auth.login'))
             # Login user with Flask-Login
             login_user(user, remember=remember)
@@ -39,12 +39,12 @@ def forgot_password():
             user.password_reset_expires = reset_expires
             
             try:
-                db.session.commit()
-                
-                # Send reset email
+                # Send reset email; the token and the queued email are committed together
                 if send_password_reset_email(user, reset_token):
+                    db.session.commit()
                     current_app.logger.info(f"Password reset email sent to {email}")
                 else:
+                    db.session.rollback()
                     current_app.logger.error(f"Failed to send password reset email to {email}")
                     flash('There was an error sending the reset email. Please try again later.', 'error')
                     return render_template('auth/forgot_password.html')
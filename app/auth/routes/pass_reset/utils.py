@@ -2,6 +2,7 @@ from flask import url_for, current_app
 from flask_mail import Message
 import re
 from app.extensions import mail
+from app.utils.mail_queue import queue_email
 
 
 def is_valid_email(email):
@@ -61,7 +62,7 @@ def send_password_reset_email(user, token):
         If you did not request a password reset, please ignore this email.
         """
         
-        mail.send(msg)
+        queue_email(msg)
         return True
     except Exception as e:
         current_app.logger.error(f"Failed to send password reset email: {str(e)}")
@@ -60,9 +60,6 @@ def register():
             if not _send_verification_email(user):
                 flash('Account created but verification email failed to send. Please contact support.', 'warning')
 
-
-            handle_user_registration(user)
-
             flash('Registration successful! Please check your email to verify your account.', 'success')
             if request.is_json:
                 return jsonify({
@@ -290,8 +287,9 @@ def _create_user(form_data):
     # Set password hash
     user.set_password(form_data['password'])
     
-    # Save to database
+    # Save to database (with the registration outbox event)
     db.session.add(user)
+    handle_user_registration(user)
     db.session.commit()
     
     current_app.logger.info(f"New user registered: {user.username} ({user.email})")
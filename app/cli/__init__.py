@@ -21,6 +21,15 @@ from app.cli.utils.init_blog import init_blog_cmd
 from app.cli.utils.init_all import init_all_cmd
 from app.cli.utils.drop_table import drop_table_cmd
 from app.cli.utils.init_faq import init_faqs_command, list_faqs_command, clear_faqs_command
+from app.cli.utils.reconcile_counters import reconcile_unread_counters_cmd
+from app.cli.utils.mail_queue import mail_queue_worker_cmd, mail_queue_status_cmd
+from app.cli.utils.outbox import outbox_dispatch_cmd, outbox_status_cmd
+from app.cli.utils.sweep_orders import sweep_orders_cmd
+from app.cli.utils.deadline_reminders import deadline_reminders_cmd
+from app.cli.utils.daily_revenue import backfill_daily_revenue_cmd
+from app.cli.utils.export_data import export_data_cmd
+from app.cli.utils.search_index import rebuild_search_index_cmd
+from app.cli.utils.derived_content import backfill_derived_content_cmd
 
 def register_cli_commands(app):
     app.cli.add_command(init_users_cmd)
@@ -33,4 +42,15 @@ def register_cli_commands(app):
     app.cli.add_command(drop_table_cmd)
     app.cli.add_command(init_faqs_command)
     app.cli.add_command(list_faqs_command)
-    app.cli.add_command(clear_faqs_command)
\ No newline at end of file
+    app.cli.add_command(clear_faqs_command)
+    app.cli.add_command(reconcile_unread_counters_cmd)
+    app.cli.add_command(mail_queue_worker_cmd)
+    app.cli.add_command(mail_queue_status_cmd)
+    app.cli.add_command(outbox_dispatch_cmd)
+    app.cli.add_command(outbox_status_cmd)
+    app.cli.add_command(sweep_orders_cmd)
+    app.cli.add_command(deadline_reminders_cmd)
+    app.cli.add_command(backfill_daily_revenue_cmd)
+    app.cli.add_command(export_data_cmd)
+    app.cli.add_command(rebuild_search_index_cmd)
+    app.cli.add_command(backfill_derived_content_cmd)
\ No newline at end of file
@@ -0,0 +1,23 @@
+import click
+from datetime import datetime, timedelta
+from flask import current_app
+from flask.cli import with_appcontext
+from app.extensions import db
+from app.models.payment import DailyRevenue
+
+
+@click.command('backfill-daily-revenue')
+@click.option('--days', type=int, default=None, help='Only rebuild the last N days (default: all history).')
+@with_appcontext
+def backfill_daily_revenue_cmd(days):
+    """Rebuild the daily_revenue rollup from completed payments."""
+    start = datetime.now().date() - timedelta(days=days - 1) if days else None
+    try:
+        written = DailyRevenue.backfill(start=start)
+        current_app.logger.info(f"Backfilled {written} days of revenue")
+        click.echo(f"✓ Backfilled {written} days of revenue")
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error backfilling daily revenue: {str(e)}")
+        click.echo(f"✗ Error backfilling daily revenue: {str(e)}", err=True)
+        raise click.Abort()
@@ -0,0 +1,26 @@
+import click
+import time
+from flask import current_app
+from flask.cli import with_appcontext
+from app.services.deadline_reminders import DeadlineReminderEngine
+
+
+@click.command('deadline-reminders')
+@click.option('--loop', is_flag=True, help='Keep firing reminders as they fall due.')
+@with_appcontext
+def deadline_reminders_cmd(loop):
+    """Send deadline reminders that are due (each threshold fires once per order)."""
+    engine = DeadlineReminderEngine(current_app._get_current_object())
+    if loop:
+        if engine.interval <= 0:
+            engine.interval = 60
+        click.echo(f"Sending deadline reminders at {engine.thresholds}h (Ctrl+C to stop)...")
+        engine.run_forever(sleep=time.sleep)
+        return
+
+    try:
+        sent = engine.run_once()
+        click.echo(f"✓ Sent {sent} deadline reminders")
+    except Exception as e:
+        click.echo(f"✗ Error sending deadline reminders: {str(e)}", err=True)
+        raise click.Abort()
@@ -0,0 +1,31 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.extensions import db
+from app.models.blog import BlogPost
+from app.models.content import Sample
+from app.models.service import Service
+from app.services.content_derivation import ContentDerivation
+
+MODELS = {'blog': BlogPost, 'sample': Sample, 'service': Service}
+
+
+@click.command('backfill-derived-content')
+@click.option('--only', 'only', type=click.Choice(sorted(MODELS)), default=None, help='Backfill a single content type.')
+@click.option('--workers', type=int, default=None, help='Worker processes (default: one per CPU).')
+@click.option('--batch-size', type=int, default=200, show_default=True)
+@with_appcontext
+def backfill_derived_content_cmd(only, workers, batch_size):
+    """Derive excerpts, word counts, reading times and tables of contents for existing content."""
+    for name, model in MODELS.items():
+        if only and name != only:
+            continue
+        try:
+            updated = ContentDerivation.backfill(model, batch_size=batch_size, workers=workers)
+            current_app.logger.info(f"Derived content for {updated} {name} rows")
+            click.echo(f"✓ Derived content for {updated} {name} rows")
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error deriving {name} content: {str(e)}")
+            click.echo(f"✗ Error deriving {name} content: {str(e)}", err=True)
+            raise click.Abort()
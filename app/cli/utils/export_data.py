@@ -0,0 +1,41 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.services.exports import ExportService, ExportError, EXPORT_DATASETS, EXPORT_FORMATS
+
+
+@click.command('export-data')
+@click.argument('dataset', type=click.Choice(sorted(EXPORT_DATASETS)))
+@click.option('--format', 'fmt', type=click.Choice(sorted(EXPORT_FORMATS)), default='csv', show_default=True)
+@click.option('--output', '-o', default='-', help='File to write (default: stdout).')
+@click.option('--status', default=None, help='Order or payment status filter.')
+@click.option('--search', default=None, help='Same search as the admin list page.')
+@click.option('--date-from', default=None, help='Payments created on or after YYYY-MM-DD.')
+@click.option('--date-to', default=None, help='Payments created on or before YYYY-MM-DD.')
+@click.option('--admin', type=click.Choice(['true', 'false']), default=None, help='Users: only admins / only clients.')
+@with_appcontext
+def export_data_cmd(dataset, fmt, output, status, search, date_from, date_to, admin):
+    """Stream orders, payments or users to CSV, NDJSON or Parquet."""
+    options = {'status': status, 'search': search, 'date_from': date_from, 'date_to': date_to, 'admin': admin}
+    filters = ExportService.filters_from(dataset, options)
+    unsupported = [name for name, value in options.items() if value and name not in filters]
+    if unsupported:
+        raise click.UsageError(f"{dataset} exports do not support: {', '.join(unsupported)}")
+
+    try:
+        stream = ExportService.stream(dataset, fmt, filters)
+        with click.open_file(output, 'wb') as f:
+            written = 0
+            for chunk in stream:
+                f.write(chunk)
+                written += len(chunk)
+    except ExportError as e:
+        click.echo(f"✗ {str(e)}", err=True)
+        raise click.Abort()
+    except Exception as e:
+        current_app.logger.error(f"Error exporting {dataset}: {str(e)}")
+        click.echo(f"✗ Error exporting {dataset}: {str(e)}", err=True)
+        raise click.Abort()
+
+    if output != '-':
+        click.echo(f"✓ Wrote {written} bytes of {dataset} to {output}")
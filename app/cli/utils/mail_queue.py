@@ -0,0 +1,39 @@
+import click
+import time
+from flask import current_app
+from flask.cli import with_appcontext
+from app.extensions import db
+from app.utils.mail_queue import MailQueueWorker, queue_stats
+
+
+@click.command('mail-queue-worker')
+@click.option('--once', is_flag=True, help='Deliver everything currently due, then exit.')
+@with_appcontext
+def mail_queue_worker_cmd(once):
+    """Deliver queued outbound emails (run alongside or instead of in-process workers)."""
+    worker = MailQueueWorker(current_app._get_current_object())
+    if once:
+        try:
+            processed = worker.run_once()
+            click.echo(f"✓ Processed {processed} queued emails")
+        except Exception as e:
+            db.session.rollback()
+            click.echo(f"✗ Error delivering queued emails: {str(e)}", err=True)
+            raise click.Abort()
+        return
+
+    click.echo("Delivering queued emails (Ctrl+C to stop)...")
+    worker.run_forever(sleep=time.sleep)
+
+
+@click.command('mail-queue-status')
+@with_appcontext
+def mail_queue_status_cmd():
+    """Show outbound mail queue depth and recent throughput."""
+    stats = queue_stats()
+    click.echo(f"Pending:           {stats['pending']}")
+    click.echo(f"Sending:           {stats['sending']}")
+    click.echo(f"Sent:              {stats['sent']}")
+    click.echo(f"Failed:            {stats['failed']}")
+    click.echo(f"Sent last minute:  {stats['sent_last_minute']}")
+    click.echo(f"Oldest pending:    {stats['oldest_pending_seconds']:.0f}s")
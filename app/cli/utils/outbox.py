@@ -0,0 +1,41 @@
+import click
+import time
+from flask import current_app
+from flask.cli import with_appcontext
+from app.extensions import db
+from app.models.outbox import OutboxEvent
+from app.services.triggers.outbox import OutboxDispatcher
+
+
+@click.command('outbox-dispatch')
+@click.option('--once', is_flag=True, help='Dispatch everything currently due, then exit.')
+@with_appcontext
+def outbox_dispatch_cmd(once):
+    """Run trigger outbox handlers (alongside or instead of in-process dispatchers)."""
+    import app.services.triggers.triggers  # registers the handlers
+
+    dispatcher = OutboxDispatcher(current_app._get_current_object())
+    if once:
+        try:
+            processed = dispatcher.run_once()
+            click.echo(f"✓ Dispatched {processed} outbox events")
+        except Exception as e:
+            db.session.rollback()
+            click.echo(f"✗ Error dispatching outbox events: {str(e)}", err=True)
+            raise click.Abort()
+        return
+
+    click.echo("Dispatching outbox events (Ctrl+C to stop)...")
+    dispatcher.run_forever(sleep=time.sleep)
+
+
+@click.command('outbox-status')
+@with_appcontext
+def outbox_status_cmd():
+    """Show trigger outbox events by status."""
+    counts = dict(
+        db.session.query(OutboxEvent.status, db.func.count(OutboxEvent.id))
+        .group_by(OutboxEvent.status).all()
+    )
+    for status in ('pending', 'processing', 'done', 'failed'):
+        click.echo(f"{status.title() + ':':<12} {counts.get(status, 0)}")
@@ -0,0 +1,20 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.extensions import db
+from app.models.communication import UnreadCounter
+
+
+@click.command('reconcile-unread-counters')
+@with_appcontext
+def reconcile_unread_counters_cmd():
+    """Recompute per-user unread message/notification counters and fix drift."""
+    try:
+        fixed = UnreadCounter.reconcile()
+        current_app.logger.info(f"Reconciled {fixed} unread counters")
+        click.echo(f"✓ Reconciled {fixed} unread counters")
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error reconciling unread counters: {str(e)}")
+        click.echo(f"✗ Error reconciling unread counters: {str(e)}", err=True)
+        raise click.Abort()
@@ -0,0 +1,20 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.extensions import db
+from app.services.search import SearchIndex
+
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_cmd():
+    """Rebuild the site search index from blog posts, services, samples and categories."""
+    try:
+        indexed = SearchIndex.rebuild()
+        current_app.logger.info(f"Indexed {indexed} search documents")
+        click.echo(f"✓ Indexed {indexed} search documents")
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error rebuilding search index: {str(e)}")
+        click.echo(f"✗ Error rebuilding search index: {str(e)}", err=True)
+        raise click.Abort()
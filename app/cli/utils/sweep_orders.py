@@ -0,0 +1,27 @@
+import click
+import time
+from flask import current_app
+from flask.cli import with_appcontext
+from app.services.order_lifecycle import OrderLifecycleSweeper
+
+
+@click.command('sweep-orders')
+@click.option('--loop', is_flag=True, help='Keep sweeping every ORDER_SWEEP_INTERVAL seconds.')
+@with_appcontext
+def sweep_orders_cmd(loop):
+    """Mark overdue orders and auto-complete orders left pending review."""
+    sweeper = OrderLifecycleSweeper(current_app._get_current_object())
+    if loop:
+        if sweeper.interval <= 0:
+            sweeper.interval = 300
+        click.echo(f"Sweeping orders every {sweeper.interval}s (Ctrl+C to stop)...")
+        sweeper.run_forever(sleep=time.sleep)
+        return
+
+    try:
+        moved = sweeper.run_once()
+        click.echo(f"✓ Marked {len(moved['overdue'])} orders overdue")
+        click.echo(f"✓ Auto-completed {len(moved['completed'])} orders")
+    except Exception as e:
+        click.echo(f"✗ Error sweeping orders: {str(e)}", err=True)
+        raise click.Abort()
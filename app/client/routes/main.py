@@ -10,7 +10,7 @@ from datetime import datetime, timedelta
 from sqlalchemy import func, and_, or_
 from app.extensions import db
 import logging
-from app.client.routes.orders.utils import _auto_complete_orders
+from app.services.client_dashboard import ClientOrderStats
 
 
 @client_bp.route('/')
@@ -45,46 +45,8 @@ def dashboard():
         }
         
         try:
-            recent_orders = Order.query.filter_by(client_id=current_user.id)\
-                                     .order_by(Order.created_at.desc())\
-                                     .limit(10)\
-                                     .all()
-            dashboard_data['recent_orders'] = recent_orders
-            
-            pending_orders = Order.query.filter_by(client_id=current_user.id, status='pending')\
-                                      .order_by(Order.due_date.asc())\
-                                      .all()
-            dashboard_data['pending_orders'] = pending_orders
-            
-            active_orders = Order.query.filter_by(client_id=current_user.id, status='active')\
-                                     .order_by(Order.due_date.asc())\
-                                     .all()
-            dashboard_data['active_orders'] = active_orders
-            
-            completed_orders = Order.query.filter_by(client_id=current_user.id, status='completed')\
-                                         .order_by(Order.created_at.desc())\
-                                         .limit(10)\
-                                         .all()
-            dashboard_data['completed_orders'] = completed_orders
-            
-            overdue_orders = Order.query.filter(
-                and_(
-                    Order.client_id == current_user.id,
-                    Order.status.in_(['active', 'pending']),
-                    Order.due_date < current_time
-                )
-            ).order_by(Order.due_date.asc()).all()
-            dashboard_data['overdue_orders'] = overdue_orders
-            
-            next_week = current_time + timedelta(days=7)
-            upcoming_deadlines = Order.query.filter(
-                and_(
-                    Order.client_id == current_user.id,
-                    Order.status.in_(['active', 'pending']),
-                    Order.due_date.between(current_time, next_week)
-                )
-            ).order_by(Order.due_date.asc()).limit(5).all()
-            dashboard_data['upcoming_deadlines'] = upcoming_deadlines
+            # Every order list comes from one query, partitioned in Python
+            dashboard_data.update(ClientOrderStats.dashboard_orders(current_user.id, current_time))
             
         except Exception as e:
             logging.error(f"Error fetching orders for user {current_user.id}: {str(e)}")
@@ -115,50 +77,11 @@ def dashboard():
             logging.error(f"Error fetching notifications for user {current_user.id}: {str(e)}")
         
         try:
-            total_orders = Order.query.filter_by(client_id=current_user.id).count()
-            dashboard_data['total_orders'] = total_orders
-            
-            total_spent_result = db.session.query(func.sum(Order.total_price))\
-                                         .filter_by(client_id=current_user.id, paid=True)\
-                                         .scalar()
-            total_spent = float(total_spent_result) if total_spent_result else 0.0
-            dashboard_data['total_spent'] = total_spent
-            
-            if total_orders > 0:
-                avg_order_value = total_spent / max(1, Order.query.filter_by(client_id=current_user.id, paid=True).count())
-                dashboard_data['avg_order_value'] = avg_order_value
-            
-            completed_count = Order.query.filter_by(client_id=current_user.id, status='completed').count()
-            if total_orders > 0:
-                completion_rate = (completed_count / total_orders) * 100
-                dashboard_data['completion_rate'] = completion_rate
-            
-            start_of_month = current_time.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            orders_this_month = Order.query.filter(
-                and_(
-                    Order.client_id == current_user.id,
-                    Order.created_at >= start_of_month
-                )
-            ).count()
-            dashboard_data['orders_this_month'] = orders_this_month
-            
-            spent_this_month_result = db.session.query(func.sum(Order.total_price))\
-                                               .filter(
-                                                   and_(
-                                                       Order.client_id == current_user.id,
-                                                       Order.paid == True,
-                                                       Order.created_at >= start_of_month
-                                                   )
-                                               ).scalar()
-            spent_this_month = float(spent_this_month_result) if spent_this_month_result else 0.0
-            dashboard_data['spent_this_month'] = spent_this_month
-            
-            status_counts = db.session.query(
-                Order.status, 
-                func.count(Order.id).label('count')
-            ).filter_by(client_id=current_user.id).group_by(Order.status).all()
-            
-            dashboard_data['order_status_counts'] = {status: count for status, count in status_counts}
+            # Totals, status counts and the monthly trend (cached per client)
+            stats = ClientOrderStats.get(current_user.id)
+            for key in ('total_orders', 'total_spent', 'avg_order_value', 'completion_rate',
+                        'orders_this_month', 'spent_this_month', 'order_status_counts', 'monthly_order_trend'):
+                dashboard_data[key] = stats[key]
             
         except Exception as e:
             logging.error(f"Error calculating statistics for user {current_user.id}: {str(e)}")
@@ -168,30 +91,6 @@ def dashboard():
         except Exception as e:
             logging.error(f"Error fetching reward points for user {current_user.id}: {str(e)}")
         
-        try:
-            monthly_trend = []
-            for i in range(6):
-                month_start = (current_time.replace(day=1) - timedelta(days=32*i)).replace(day=1)
-                month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-                
-                month_orders = Order.query.filter(
-                    and_(
-                        Order.client_id == current_user.id,
-                        Order.created_at.between(month_start, month_end)
-                    )
-                ).count()
-                
-                monthly_trend.append({
-                    'month': month_start.strftime('%b %Y'),
-                    'orders': month_orders
-                })
-            
-            dashboard_data['monthly_order_trend'] = list(reversed(monthly_trend))
-            
-        except Exception as e:
-            logging.error(f"Error calculating monthly trend for user {current_user.id}: {str(e)}")
-            
-        _auto_complete_orders()
         return render_template('client/dashboard.html', **dashboard_data)
         
     except Exception as e:
@@ -167,12 +167,9 @@ def create_order():
                                 pass
                         raise Exception(f"File upload failed for {file.filename}: {str(file_error)}")
 
+                # Notifications go out from the outbox once this commit lands
+                handle_new_order_creation(new_order.id)
                 db.session.commit()
-                
-                try:
-                    handle_new_order_creation(new_order.id)
-                except Exception as notification_error:
-                    current_app.logger.warning(f'Notification error: {str(notification_error)}')
                 if request.headers.get("X-Requested-With") == "XMLHttpRequest" or request.is_json:
                     return jsonify({
                         "success": True,
@@ -15,7 +15,6 @@ import logging
 import requests
 
 from app.client import client_bp
-from app.client.routes.orders.utils import _update_overdue_orders
 
 # from app.routes.main import notify
 # from app.routes.api import calculate_price
@@ -75,8 +74,6 @@ def list_orders():
         per_page=per_page,
         error_out=False
     )
-
-    _update_overdue_orders()
     
     return render_template(
         'client/orders.html',
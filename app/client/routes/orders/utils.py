@@ -1,8 +1,3 @@
-from app.models.order import Order
-from flask import current_app
-from datetime import datetime, timedelta
-from sqlalchemy import and_
-from app.extensions import db
 from flask import request
 import os
 from app.utils.file_upload import allowed_file
@@ -10,61 +5,6 @@ import mimetypes
 
 
 
-def _update_overdue_orders():
-    """Helper function to update orders that have passed their due date"""
-    
-    try:
-        overdue_orders = Order.query.filter(
-            and_(
-                Order.due_date < datetime.now(),
-                ~Order.status.in_(['completed', 'completed pending review', 'canceled', 'overdue'])
-            )
-        ).all()
-        
-        for order in overdue_orders:
-            order.status = 'overdue'
-            order.updated_at = datetime.now()
-        
-        if overdue_orders:
-            db.session.commit()
-            order_ids = [order.id for order in overdue_orders]
-            current_app.logger.info(
-                f"Marked {len(overdue_orders)} orders as overdue. IDs: {order_ids}"
-            )
-            
-    except Exception as e:
-        db.session.rollback()
-        current_app.logger.error(f"Error updating overdue orders: {e}")
-
-def _auto_complete_orders():
-    """Helper function to auto-complete orders stuck in 'completed pending review' for more than 3 days"""
-    
-    try:
-        three_days_ago = datetime.now() - timedelta(days=3)
-
-        pending_orders = Order.query.filter(
-            and_(
-                Order.status == 'completed pending review',
-                Order.updated_at < three_days_ago
-            )
-        ).all()
-
-        for order in pending_orders:
-            order.status = 'completed'
-            order.updated_at = datetime.now()
-
-        if pending_orders:
-            db.session.commit()
-            order_ids = [order.id for order in pending_orders]
-            current_app.logger.info(
-                f"Auto-completed {len(pending_orders)} orders stuck in 'completed pending review'. IDs: {order_ids}"
-            )
-
-    except Exception as e:
-        db.session.rollback()
-        current_app.logger.error(f"Error auto-completing pending review orders: {e}")
-
-
 def detect_file_type(file):
     """
     Detect if uploaded file is a picture or regular file
@@ -7,6 +7,9 @@ class ClientChatModal {
         this.selectedOrderId = null;
         this.isOpen = false;
         this.chats = [];
+        this.chatsCursor = null;
+        this.hasMoreChats = false;
+        this.isLoadingChats = false;
         this.orders = [];
         
         this.initializeElements();
@@ -48,6 +51,13 @@ class ClientChatModal {
     }
 
     bindEvents() {
+        // Load the next page of chats when the list is scrolled near its end
+        this.chatList.addEventListener('scroll', () => {
+            if (this.chatList.scrollTop + this.chatList.clientHeight >= this.chatList.scrollHeight - 50) {
+                this.loadMoreChats();
+            }
+        });
+        
         // Toggle modal
         this.chatFab.addEventListener('click', () => this.toggleModal());
         this.messageFab.addEventListener('click', () => this.toggleModal());
@@ -118,15 +128,24 @@ class ClientChatModal {
         }
     }
 
-    async loadChats() {
+    async loadChats(cursor = null) {
+        if (this.isLoadingChats) return;
+        this.isLoadingChats = true;
+        
         try {
-            const response = await fetch(`${API_BASE_URL}/client/chat/list`, {
+            const url = cursor
+                ? `${API_BASE_URL}/client/chat/list?cursor=${encodeURIComponent(cursor)}`
+                : `${API_BASE_URL}/client/chat/list`;
+            const response = await fetch(url, {
                 credentials: "include"
             });
             const data = await response.json();
             
             if (data.success) {
-                this.chats = data.chats;
+                // A request without a cursor starts over; later pages are appended
+                this.chats = cursor ? this.chats.concat(data.chats) : data.chats;
+                this.chatsCursor = data.next_cursor;
+                this.hasMoreChats = data.has_more;
                 this.renderChatList();
             } else {
                 this.showError('Failed to load chats: ' + data.error);
@@ -134,6 +153,14 @@ class ClientChatModal {
         } catch (error) {
             console.error('Error loading chats:', error);
             this.showError('Failed to load chats');
+        } finally {
+            this.isLoadingChats = false;
+        }
+    }
+
+    loadMoreChats() {
+        if (this.hasMoreChats && this.chatsCursor) {
+            this.loadChats(this.chatsCursor);
         }
     }
 
@@ -49,10 +49,93 @@ class Config:
     MAIL_DEFAULT_SENDER = os.environ.get("MAIL_DEFAULT_SENDER")
     
     # Cache configuration
-    CACHE_TYPE = os.environ.get("CACHE_TYPE", "simple")
+    CACHE_TYPE = os.environ.get("CACHE_TYPE", "SimpleCache")
     CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
     CACHE_DEFAULT_TIMEOUT = int(os.environ.get('CACHE_DEFAULT_TIMEOUT', 300))
+    # Seconds a rendered fragment (e.g. the blog sidebar) is kept; commits to
+    # its models switch to new keys immediately, so this only bounds memory
+    FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', 3600))
     
+    # Pricing index (seconds a worker may serve its compiled price matrix
+    # before reloading; edits made in the same worker apply immediately)
+    PRICING_INDEX_TTL = int(os.environ.get('PRICING_INDEX_TTL', 300))
+    # Same bound for the reference-data snapshot and cached service categories
+    REFERENCE_DATA_TTL = int(os.environ.get('REFERENCE_DATA_TTL', 300))
+
+    # Socket presence: 'memory' (single worker) or 'redis' (shared by all workers).
+    # Sessions not heartbeated within PRESENCE_TTL seconds expire.
+    PRESENCE_BACKEND = os.environ.get('PRESENCE_BACKEND', 'memory').lower()
+    PRESENCE_REDIS_URL = os.environ.get('PRESENCE_REDIS_URL', CACHE_REDIS_URL)
+    PRESENCE_TTL = int(os.environ.get('PRESENCE_TTL', 90))
+    # Seconds between unread-counter drift checks in each socket worker (0 disables)
+    UNREAD_RECONCILE_INTERVAL = int(os.environ.get('UNREAD_RECONCILE_INTERVAL', 600))
+    # unread_counts emits per user are coalesced into one per window (0 = emit immediately)
+    UNREAD_COUNTS_DEBOUNCE_MS = int(os.environ.get('UNREAD_COUNTS_DEBOUNCE_MS', 250))
+    # Most ids a bulk mark-read returns for *_marked_read emits (the count is always exact)
+    MARK_READ_MAX_IDS = int(os.environ.get('MARK_READ_MAX_IDS', 500))
+
+    # Outbound mail queue: emails are stored in outbound_email and delivered by
+    # MAIL_QUEUE_WORKERS green threads per process (0 = only `flask mail-queue-worker`)
+    MAIL_QUEUE_ENABLED = os.environ.get('MAIL_QUEUE_ENABLED', 'True').lower() in ['true', '1']
+    MAIL_QUEUE_WORKERS = int(os.environ.get('MAIL_QUEUE_WORKERS', 2))
+    MAIL_QUEUE_BATCH_SIZE = int(os.environ.get('MAIL_QUEUE_BATCH_SIZE', 20))
+    MAIL_QUEUE_POLL_INTERVAL = float(os.environ.get('MAIL_QUEUE_POLL_INTERVAL', 2))
+    # Seconds an idle worker keeps its SMTP connection open
+    MAIL_QUEUE_IDLE_TIMEOUT = int(os.environ.get('MAIL_QUEUE_IDLE_TIMEOUT', 30))
+    MAIL_QUEUE_MAX_ATTEMPTS = int(os.environ.get('MAIL_QUEUE_MAX_ATTEMPTS', 5))
+    # Base retry delay in seconds, doubled per failed attempt
+    MAIL_QUEUE_RETRY_BACKOFF = int(os.environ.get('MAIL_QUEUE_RETRY_BACKOFF', 30))
+    MAIL_QUEUE_LOCK_TIMEOUT = int(os.environ.get('MAIL_QUEUE_LOCK_TIMEOUT', 300))
+
+    # Trigger outbox: events committed with the domain change and dispatched by
+    # OUTBOX_DISPATCHERS green threads per process (0 = only `flask outbox-dispatch`)
+    OUTBOX_DISPATCHERS = int(os.environ.get('OUTBOX_DISPATCHERS', 1))
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 50))
+    OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', 5))
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 8))
+    OUTBOX_RETRY_BACKOFF = int(os.environ.get('OUTBOX_RETRY_BACKOFF', 15))
+    OUTBOX_LOCK_TIMEOUT = int(os.environ.get('OUTBOX_LOCK_TIMEOUT', 300))
+
+    # Seconds between order lifecycle sweeps (overdue / auto-complete) in each
+    # process (0 = only `flask sweep-orders`)
+    ORDER_SWEEP_INTERVAL = int(os.environ.get('ORDER_SWEEP_INTERVAL', 300))
+    # Days an order stays in 'completed pending review' before it is auto-completed
+    ORDER_AUTO_COMPLETE_DAYS = int(os.environ.get('ORDER_AUTO_COMPLETE_DAYS', 3))
+
+    # Deadline reminders: hours before due_date to remind at, and the longest a
+    # reminder green thread sleeps between ticks (0 = only `flask deadline-reminders`)
+    DEADLINE_REMINDER_HOURS = os.environ.get('DEADLINE_REMINDER_HOURS', '24,6')
+    DEADLINE_REMINDER_INTERVAL = int(os.environ.get('DEADLINE_REMINDER_INTERVAL', 60))
+    # Seconds of upcoming reminders held in memory per threshold
+    DEADLINE_REMINDER_LOOKAHEAD = int(os.environ.get('DEADLINE_REMINDER_LOOKAHEAD', 3600))
+    # Seconds between full reloads from the watermarks (picks up other processes' orders)
+    DEADLINE_REMINDER_RELOAD = int(os.environ.get('DEADLINE_REMINDER_RELOAD', 900))
+
+    # Seconds the admin dashboard stats snapshot is served between full rebuilds
+    # (order/payment writes patch it in place meanwhile)
+    DASHBOARD_STATS_TTL = int(os.environ.get('DASHBOARD_STATS_TTL', 60))
+    # Per-client dashboard stats: seconds cached per client (dropped sooner when
+    # that client's orders change) and the most clients kept per worker
+    CLIENT_STATS_TTL = int(os.environ.get('CLIENT_STATS_TTL', 300))
+    CLIENT_STATS_CACHE_SIZE = int(os.environ.get('CLIENT_STATS_CACHE_SIZE', 2000))
+
+    # Rows fetched and encoded per chunk by streaming admin exports
+    EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 1000))
+
+    # Most ranked hits a site search returns
+    SEARCH_RESULT_LIMIT = int(os.environ.get('SEARCH_RESULT_LIMIT', 100))
+
+    # Public site URL used in sitemaps; URLs per sitemap shard (protocol maximum
+    # 50,000) and seconds a generated shard is cached (new content changes its key)
+    SITEMAP_BASE_URL = os.environ.get('SITEMAP_BASE_URL', 'https://tunedessays.com')
+    SITEMAP_MAX_URLS = int(os.environ.get('SITEMAP_MAX_URLS', 50000))
+    SITEMAP_CACHE_TIMEOUT = int(os.environ.get('SITEMAP_CACHE_TIMEOUT', 86400))
+
+    # Full-page cache for anonymous visitors: seconds a page is served as fresh,
+    # then how much longer it may be served stale while one request re-renders it
+    PAGE_CACHE_TTL = int(os.environ.get('PAGE_CACHE_TTL', 300))
+    PAGE_CACHE_STALE_TTL = int(os.environ.get('PAGE_CACHE_STALE_TTL', 3600))
+
     # Rate limiting
     RATELIMIT_ENABLED = os.environ.get("RATELIMIT_ENABLED", "False").lower() in ['true', '1']
     
@@ -123,6 +206,8 @@ class ProductionConfig(Config):
     
     CACHE_TYPE = "RedisCache"
     
+    PRESENCE_BACKEND = os.environ.get('PRESENCE_BACKEND', 'redis').lower()
+    
     ASSETS_DEBUG = False
     ASSETS_AUTO_BUILD = False
     
@@ -155,6 +240,12 @@ class TestingConfig(Config):
     CACHE_TYPE = "NullCache"
     
     RATELIMIT_ENABLED = False
+    
+    # Leave queued emails and outbox events in their tables for inspection
+    MAIL_QUEUE_WORKERS = 0
+    OUTBOX_DISPATCHERS = 0
+    ORDER_SWEEP_INTERVAL = 0
+    DEADLINE_REMINDER_INTERVAL = 0
 
 
 config = {
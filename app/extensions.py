@@ -8,6 +8,7 @@ from itsdangerous import URLSafeTimedSerializer
 from flask_wtf.csrf import CSRFProtect
 from flask_cors import CORS
 from flask_socketio import SocketIO
+from flask_caching import Cache
 # from flask_alembic import Alembic
 
 # Initialize extensions
@@ -18,6 +19,7 @@ mail = Mail()
 csrf = CSRFProtect()
 cors = CORS()
 socketio = SocketIO(cors_allowed_origins=[])
+cache = Cache()
 
 # Rate limiter
 limiter = Limiter(
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for, Response
+from flask import Blueprint, render_template, request, redirect, url_for, Response, jsonify, current_app
 from app.main import main_bp
 from app.extensions import db
 from app.models.blog import BlogPost, BlogCategory
@@ -7,11 +7,15 @@ from app.models.content import Sample, Testimonial, FAQ
 from app.models.communication import ChatMessage, NewsletterSubscriber, Notification
 from app.models.service import AcademicLevel, Deadline
 from app.models.price import PriceRate, PricingCategory
+from app.services.search import SearchIndex
+from app.services import public_pages  # noqa: F401  (registers the page cache tags)
+from app.utils.page_cache import cached_page
 import datetime
 from bs4 import BeautifulSoup
 
 
 @main_bp.route('/')
+@cached_page('services', 'samples', 'testimonials')
 def home():
     services = Service.query.all()
     categories = ServiceCategory.query.all()
@@ -26,6 +30,7 @@ def home():
                             title="Academic Writing Services")
 
 @main_bp.route('/testimonails')
+@cached_page('testimonials')
 def testimonials():
     testimonials = Testimonial.query.filter_by(is_approved=True).all()
 
@@ -34,6 +39,7 @@ def testimonials():
                           title="Client Testimonials")
 
 @main_bp.route('/faqs')
+@cached_page('faq')
 def faq():
     faqs = FAQ.query.order_by(FAQ.category, FAQ.order).all()
     faq_categories = {}
@@ -52,38 +58,58 @@ def search():
     if not query:
         return redirect(url_for('main.home'))
     
-    services = Service.query.filter(Service.name.ilike(f'%{query}%')).all()
-    
-    categories = ServiceCategory.query.filter(ServiceCategory.name.ilike(f'%{query}%')).all()
-    blogs = BlogPost.query.filter(BlogPost.title.ilike(f'%{query}%')).all()
-    blog_categories = BlogCategory.query.filter(BlogCategory.name.ilike(f'%{query}%')).all()
+    # Ranked hits from the search index, grouped by type
+    results = SearchIndex.load(SearchIndex.search(query, limit=current_app.config.get('SEARCH_RESULT_LIMIT', 100)))
     
     return render_template('main/search_results.html',
-                          services=services,
-                          categories=categories,
-                          blogs=blogs,
-                          blog_categories=blog_categories,
+                          services=results['service'],
+                          categories=results['service_category'],
+                          blogs=results['blog'],
+                          blog_categories=results['blog_category'],
+                          samples=results['sample'],
                           query=query,
                           title=f"Search Results for '{query}'")
+
+@main_bp.route('/search/suggest')
+def search_suggest():
+    """Autocomplete suggestions for a partially typed query"""
+    suggestions = []
+    for hit in SearchIndex.suggest(request.args.get('q', ''), limit=8):
+        if hit['type'] == 'blog':
+            url = url_for('main.post', slug=hit['slug'])
+        elif hit['type'] == 'sample':
+            url = url_for('main.sample_detail', slug=hit['slug'])
+        elif hit['type'] == 'blog_category':
+            url = url_for('main.category', slug=hit['slug'])
+        elif hit['type'] == 'service_category':
+            url = url_for('main.services') + f"#category-{hit['id']}"
+        else:
+            url = url_for('main.services') + f"#service-{hit['id']}"
+        suggestions.append({'title': hit['title'], 'type': hit['type'], 'url': url})
+    return jsonify({'suggestions': suggestions})
 @main_bp.route('/newsletter/subscribe', methods=['POST'])
 def newsletter_subscribe():
     return render_template('main/newsletter/subscribe.html', title="Subscribe to Newsletter")
 
 # Legals Routes
 @main_bp.route('/privacy')
+@cached_page()
 def privacy():
     return render_template('main/legals/privacy.html')
 
 @main_bp.route('/refund')
+@cached_page()
 def refund():
     return render_template('main/legals/refund.html')
 
 @main_bp.route('/terms')
+@cached_page()
 def terms():
     return render_template('main/legals/terms.html')
 
 
 @main_bp.route('/contact')
+@cached_page()
 def contact():
     return render_template('main/legals/contact.html', title="Contact Us")
 
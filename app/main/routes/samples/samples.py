@@ -2,8 +2,10 @@ from app.main import main_bp
 from flask import render_template, request
 from app.models.content import Sample
 from app.models.service import Service
+from app.utils.page_cache import cached_page
 
 @main_bp.route('/samples')
+@cached_page('samples', 'services')
 def samples():
     samples = Sample.query.all()
     services = Service.query.all()
@@ -14,6 +16,7 @@ def samples():
                           title="Sample Papers")
 
 @main_bp.route('/samples/<slug>')
+@cached_page('samples', 'services')
 def sample_detail(slug: str) -> str:
     # sample = Sample.query.get_or_404(sample_id)
     sample = Sample.query.filter_by(slug=slug).first_or_404()
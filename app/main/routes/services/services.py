@@ -3,8 +3,10 @@ from flask import render_template, request
 from app.models.service import Service, ServiceCategory
 from app.models.content import Sample
 from app.models.service import AcademicLevel
+from app.utils.page_cache import cached_page
 
 @main_bp.route('/services')
+@cached_page('services', 'samples', query_args=('service_category_id',))
 def services():
     service_category_id = request.args.get('service_category_id', type=int)
     selected_category = None
@@ -21,6 +23,7 @@ def services():
                           selected_category=selected_category)
 
 @main_bp.route('/service/<slug>')
+@cached_page('services', 'academic_levels')
 def service_detail(slug):
     # service = Service.query.get_or_404(service_id)
     service = Service.query.filter_by(slug=slug).first_or_404()
@@ -2,9 +2,11 @@ from .user import User, GenderEnum
 from .service import Service, ServiceCategory, AcademicLevel, Deadline
 from .content import Sample, FAQ, Testimonial
 from .blog import BlogCategory, BlogPost, BlogComment
-from .order import Order, OrderComment, OrderFile
+from .order import Order, OrderComment, OrderFile, DeadlineReminderWatermark
 from .price  import PricingCategory, PriceRate
-from .payment import Payment, Invoice, Transaction, Refund, Discount
+from .payment import Payment, Invoice, Transaction, Refund, Discount, DailyRevenue
 from .order_delivery import OrderDelivery, OrderDeliveryFile
 from .referral import Referral 
-from .communication import Notification, Chat, ChatMessage, NewsletterSubscriber
\ No newline at end of file
+from .communication import Notification, Chat, ChatMessage, NewsletterSubscriber, UnreadCounter, OutboundEmail
+from .outbox import OutboxEvent
+from .search import SearchDocument, SearchPosting, SearchTerm
\ No newline at end of file
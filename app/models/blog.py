@@ -6,6 +6,7 @@ class BlogCategory(db.Model):
     name = db.Column(db.String(100), nullable=False)
     slug = db.Column(db.String(120), unique=True, nullable=False)
     description = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
     
     # Relationships
     posts = db.relationship('BlogPost', backref='category', lazy=True)
@@ -27,6 +28,14 @@ class BlogPost(db.Model):
     is_published = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.now)
     published_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+
+    # Derived from content on save (app.services.content_derivation)
+    content_html = db.Column(db.Text)  # content with anchors on its headings
+    plain_excerpt = db.Column(db.Text)
+    word_count = db.Column(db.Integer, default=0)
+    reading_time = db.Column(db.Integer, default=0)  # minutes
+    toc = db.Column(db.JSON)  # [{'level': 2, 'text': ..., 'anchor': ...}]
     
     def __repr__(self):
         return f'<BlogPost {self.title}>'
@@ -1,5 +1,6 @@
 from app.extensions import db
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 
 class Notification(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -11,10 +12,34 @@ class Notification(db.Model):
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.now)
 
+    __table_args__ = (
+        # Keyset pagination of a user's feed on (created_at, id)
+        db.Index('ix_notification_user_created', 'user_id', 'created_at', 'id'),
+    )
+
     def mark_as_read(self):
-        self.is_read = True
-        from app.extensions import db
+        if not self.is_read:
+            self.is_read = True
+            # Flush first: a counter seeded by adjust() must already see this one as read
+            db.session.flush()
+            UnreadCounter.adjust(self.user_id, notifications=-1)
         db.session.commit()
+
+    @classmethod
+    def mark_read_for_user(cls, user_id, notification_ids=None, max_ids=None):
+        """
+        Mark a user's unread notifications (all, or only ``notification_ids``)
+        as read with one UPDATE and adjust the counter. Returns a ``BulkReadResult``;
+        the caller commits.
+        """
+        criteria = [cls.user_id == user_id, cls.is_read == False]
+        if notification_ids is not None:
+            if not notification_ids:
+                return BulkReadResult(0, [])
+            criteria.append(cls.id.in_(notification_ids))
+        result = bulk_mark_read(cls, criteria, max_ids=max_ids)
+        UnreadCounter.adjust(user_id, notifications=-result.count)
+        return result
     
     def to_dict(self):
         return {
@@ -40,6 +65,36 @@ class NewsletterSubscriber(db.Model):
     def __repr__(self):
         return f'<NewsletterSubscriber {self.email}>'
     
+class OutboundEmail(db.Model):
+    """
+    Durable outbound mail queue, drained by ``app.utils.mail_queue`` workers.
+    Status moves pending -> sending -> sent, or back to pending with a later
+    ``next_attempt_at`` after a failure, and finally failed.
+    """
+    __tablename__ = 'outbound_email'
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False, default='')
+    sender = db.Column(db.String(255))
+    recipients = db.Column(db.JSON, nullable=False)  # {'to': [...], 'cc': [...], 'bcc': [...]}
+    reply_to = db.Column(db.String(255))
+    body = db.Column(db.Text)
+    html = db.Column(db.Text)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    locked_by = db.Column(db.String(64))
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_outbound_email_status_next', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f'<OutboundEmail {self.id} {self.status}>'
+
 class Chat(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
@@ -68,6 +123,235 @@ class ChatMessage(db.Model):
     
     # Relationships
     user = db.relationship('User', backref='chat_messages')
+
+    __table_args__ = (
+        # Per-chat last-message / unread aggregation for the chat list
+        db.Index('ix_chat_message_chat_read', 'chat_id', 'is_read', 'user_id'),
+    )
+
+    @classmethod
+    def mark_chat_read(cls, chat_id, user_id, max_ids=None):
+        """
+        Mark the messages other participants sent to ``user_id`` in a chat as
+        read with one UPDATE and adjust the counter. Returns a ``BulkReadResult``;
+        the caller commits.
+        """
+        result = bulk_mark_read(cls, [
+            cls.chat_id == chat_id,
+            cls.user_id != user_id,
+            cls.is_read == False
+        ], max_ids=max_ids)
+        UnreadCounter.adjust(user_id, messages=-result.count)
+        return result
     
     def __repr__(self):
-        return f'<ChatMessage {self.id} by {"AI" if self.is_ai else "User"}>'
\ No newline at end of file
+        return f'<ChatMessage {self.id} by {"AI" if self.is_ai else "User"}>'
+
+
+class BulkReadResult:
+    """Outcome of a bulk mark-read: rows updated and (up to ``max_ids``) their ids"""
+
+    def __init__(self, count, ids):
+        self.count = count
+        self.ids = ids
+
+    @property
+    def truncated(self):
+        return self.count > len(self.ids)
+
+
+def bulk_mark_read(model, criteria, max_ids=None):
+    """
+    Set ``is_read`` on every ``model`` row matching ``criteria`` with a single
+    UPDATE. Where the database supports ``UPDATE ... RETURNING`` (PostgreSQL)
+    the affected ids come back from that statement; elsewhere the ids are read
+    with a capped projection first and the UPDATE count is taken from rowcount.
+    At most ``max_ids`` ids (``MARK_READ_MAX_IDS``) are kept for emit payloads.
+    """
+    if max_ids is None:
+        from flask import current_app
+        max_ids = current_app.config.get('MARK_READ_MAX_IDS', 500)
+
+    stmt = db.update(model).where(*criteria).values(is_read=True).execution_options(
+        synchronize_session=False
+    )
+    dialect = db.session.get_bind(mapper=db.inspect(model)).dialect
+
+    if dialect.name == 'postgresql' and dialect.update_returning:
+        count, ids = 0, []
+        for (row_id,) in db.session.execute(stmt.returning(model.id)):
+            count += 1
+            if len(ids) < max_ids:
+                ids.append(row_id)
+        return BulkReadResult(count, sorted(ids))
+
+    ids = [row_id for (row_id,) in db.session.query(model.id).filter(*criteria).order_by(model.id).limit(max_ids)]
+    if not ids:
+        return BulkReadResult(0, [])
+    count = db.session.execute(stmt).rowcount
+    return BulkReadResult(count, ids[:count])
+
+
+def _clamped_add(column, delta):
+    return db.case((column + delta < 0, 0), else_=column + delta)
+
+
+class UnreadCounter(db.Model):
+    """
+    Per-user unread message/notification counters.
+    Adjusted with ``UnreadCounter.adjust`` in the same transaction as the
+    change being counted; ``reconcile`` corrects any drift.
+    """
+    __tablename__ = 'unread_counter'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    messages = db.Column(db.Integer, nullable=False, default=0)
+    notifications = db.Column(db.Integer, nullable=False, default=0)
+    # All notifications (read or not); only used as an approximate feed total
+    notifications_total = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+
+    @staticmethod
+    def count_unread_messages(user_id):
+        return db.session.query(ChatMessage).join(Chat).filter(
+            ((Chat.user_id == user_id) | (Chat.admin_id == user_id)) &
+            (ChatMessage.user_id != user_id) &
+            (ChatMessage.is_read == False)
+        ).count()
+
+    @staticmethod
+    def count_unread_notifications(user_id):
+        return Notification.query.filter_by(user_id=user_id, is_read=False).count()
+
+    @staticmethod
+    def count_notifications(user_id):
+        return Notification.query.filter_by(user_id=user_id).count()
+
+    @classmethod
+    def _seed(cls, user_id):
+        """Create a counter row from real counts (pending changes are flushed first)"""
+        db.session.flush()
+        counter = cls(
+            user_id=user_id,
+            messages=cls.count_unread_messages(user_id),
+            notifications=cls.count_unread_notifications(user_id),
+            notifications_total=cls.count_notifications(user_id)
+        )
+        try:
+            with db.session.begin_nested():
+                db.session.add(counter)
+        except IntegrityError:
+            return None
+        return counter
+
+    @classmethod
+    def adjust(cls, user_id, messages=0, notifications=0, notifications_total=0):
+        """Add deltas to a user's counters inside the current transaction (does not commit)"""
+        if user_id is None or (not messages and not notifications and not notifications_total):
+            return
+        user_id = int(user_id)
+        for _ in range(2):
+            result = db.session.execute(
+                db.update(cls)
+                .where(cls.user_id == user_id)
+                .values(
+                    messages=_clamped_add(cls.messages, messages),
+                    notifications=_clamped_add(cls.notifications, notifications),
+                    notifications_total=_clamped_add(cls.notifications_total, notifications_total),
+                    updated_at=datetime.now()
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                return
+            # No row yet: seeding counts the already-flushed change itself.
+            # If a concurrent transaction seeded first, retry the UPDATE.
+            if cls._seed(user_id) is not None:
+                return
+
+    @classmethod
+    def adjust_many(cls, user_ids, messages=0, notifications=0, notifications_total=0):
+        """Add the same deltas to several users' counters with one UPDATE (does not commit)"""
+        user_ids = {int(user_id) for user_id in user_ids if user_id is not None}
+        if not user_ids or (not messages and not notifications and not notifications_total):
+            return
+        existing = {row.user_id for row in db.session.query(cls.user_id).filter(cls.user_id.in_(user_ids))}
+        if existing:
+            db.session.execute(
+                db.update(cls)
+                .where(cls.user_id.in_(existing))
+                .values(
+                    messages=_clamped_add(cls.messages, messages),
+                    notifications=_clamped_add(cls.notifications, notifications),
+                    notifications_total=_clamped_add(cls.notifications_total, notifications_total),
+                    updated_at=datetime.now()
+                )
+                .execution_options(synchronize_session=False)
+            )
+        # Users without a counter row yet are seeded one by one
+        for user_id in user_ids - existing:
+            cls.adjust(user_id, messages, notifications, notifications_total)
+
+    @classmethod
+    def get_counts(cls, user_id):
+        """Return ``(messages, notifications)`` for a user with a primary-key read"""
+        user_id = int(user_id)
+        row = db.session.query(cls.messages, cls.notifications).filter(cls.user_id == user_id).first()
+        if row is None:
+            counter = cls._seed(user_id)
+            db.session.commit()
+            if counter is None:
+                return cls.get_counts(user_id)
+            return counter.messages, counter.notifications
+        return row.messages, row.notifications
+
+    @classmethod
+    def get_notification_totals(cls, user_id):
+        """Return ``(unread, total)`` notification counts for a user with a primary-key read"""
+        user_id = int(user_id)
+        row = db.session.query(cls.notifications, cls.notifications_total).filter(cls.user_id == user_id).first()
+        if row is None:
+            cls.get_counts(user_id)
+            return cls.get_notification_totals(user_id)
+        return row.notifications, row.notifications_total
+
+    @classmethod
+    def reconcile(cls):
+        """
+        Recompute every counter from the real counts with one set-based
+        UPDATE and fix drift; returns rows fixed. Reading and writing in one
+        statement means no ``adjust()`` committed in between is overwritten.
+        Users without a row are left alone: their counters are seeded on first use.
+        """
+        messages = db.select(db.func.count(ChatMessage.id)).join(Chat, ChatMessage.chat_id == Chat.id).where(
+            (Chat.user_id == cls.user_id) | (Chat.admin_id == cls.user_id),
+            ChatMessage.user_id != cls.user_id,
+            ChatMessage.is_read == False
+        ).scalar_subquery()
+        notifications = db.select(db.func.count(Notification.id)).where(
+            Notification.user_id == cls.user_id,
+            Notification.is_read == False
+        ).scalar_subquery()
+        notifications_total = db.select(db.func.count(Notification.id)).where(
+            Notification.user_id == cls.user_id
+        ).scalar_subquery()
+
+        result = db.session.execute(
+            db.update(cls)
+            .where(
+                (cls.messages != messages) |
+                (cls.notifications != notifications) |
+                (cls.notifications_total != notifications_total)
+            )
+            .values(
+                messages=messages,
+                notifications=notifications,
+                notifications_total=notifications_total,
+                updated_at=datetime.now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
+
+    def __repr__(self):
+        return f'<UnreadCounter user={self.user_id} messages={self.messages} notifications={self.notifications}>'
@@ -13,7 +13,14 @@ class Sample(db.Model):
     tags = db.Column(db.String(255), nullable=True) 
     image = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.now)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
     slug = db.Column(db.String(200), unique=True, nullable=False)
+
+    # Derived from content on save (app.services.content_derivation)
+    content_html = db.Column(db.Text)  # content with anchors on its headings
+    plain_excerpt = db.Column(db.Text)
+    reading_time = db.Column(db.Integer, default=0)  # minutes
+    toc = db.Column(db.JSON)  # [{'level': 2, 'text': ..., 'anchor': ...}]
     
     def __init__(self, **kwargs):
         super(Sample, self).__init__(**kwargs)
@@ -32,6 +32,18 @@ class Order(db.Model):
     extension_requested = db.Column(db.Boolean, default=False)
     extension_requested_at = db.Column(db.DateTime)
     
+    __table_args__ = (
+        # Order lifecycle sweeper: overdue and auto-complete transitions
+        db.Index('ix_order_status_due_date', 'status', 'due_date'),
+        db.Index('ix_order_status_updated_at', 'status', 'updated_at'),
+        # Deadline reminder engine: keyset range loads by due date
+        db.Index('ix_order_due_date_id', 'due_date', 'id'),
+        # Admin order list: keyset pages on each sortable column
+        db.Index('ix_order_created_at_id', 'created_at', 'id'),
+        db.Index('ix_order_total_price_id', 'total_price', 'id'),
+        db.Index('ix_order_status_created_at_id', 'status', 'created_at', 'id'),
+    )
+    
     # Relationships
     testimonials = db.relationship('Testimonial', backref='order', lazy=True)
     files = db.relationship('OrderFile', backref='order', lazy=True)
@@ -117,6 +129,22 @@ class OrderComment(db.Model):
         return f'<OrderComment {self.id}>'
 
 
+class DeadlineReminderWatermark(db.Model):
+    """
+    Per-threshold progress of the deadline reminder engine: reminders have
+    been fired for every order up to ``(due_date, order_id)`` in due-date
+    order, so a restart resumes after it instead of re-sending.
+    """
+    __tablename__ = 'deadline_reminder_watermark'
+    threshold_hours = db.Column(db.Integer, primary_key=True)
+    due_date = db.Column(db.DateTime, nullable=False)
+    order_id = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f'<DeadlineReminderWatermark {self.threshold_hours}h {self.due_date}>'
+
+
 class SupportTicket(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
@@ -0,0 +1,31 @@
+from app.extensions import db
+from datetime import datetime
+
+
+class OutboxEvent(db.Model):
+    """
+    Transactional outbox: a domain event written in the same transaction as
+    the change it describes and dispatched afterwards by
+    ``app.services.triggers.outbox``. ``idempotency_key`` makes publishing the
+    same event twice a no-op.
+    """
+    __tablename__ = 'outbox_event'
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    idempotency_key = db.Column(db.String(191), unique=True, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, processing, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    locked_by = db.Column(db.String(64))
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    processed_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_outbox_event_status_next', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f'<OutboxEvent {self.id} {self.event_type} {self.status}>'
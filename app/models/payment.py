@@ -1,7 +1,8 @@
 from app.extensions import db
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
 from sqlalchemy.sql import func
+from sqlalchemy.exc import IntegrityError
 
 class Payment(db.Model):
     """Model for tracking payments"""
@@ -31,6 +32,11 @@ class Payment(db.Model):
     transactions = db.relationship('Transaction', backref='payment', lazy=True)
     invoice = db.relationship('Invoice', back_populates='payment', uselist=False)
     
+    __table_args__ = (
+        # Revenue totals and daily_revenue seeding/backfill
+        db.Index('ix_payment_status_created_at', 'status', 'created_at'),
+    )
+    
     def __init__(self, order_id, user_id, amount, method, status='pending', processor_id=None, processor_response=None, payer_id=None):
         self.payment_id = f"PAY-{uuid.uuid4().hex[:12].upper()}"
         self.order_id = order_id
@@ -158,4 +164,116 @@ class Refund(db.Model):
     admin = db.relationship('User', backref='processed_refunds')
     
     def __repr__(self):
-        return f'<Refund {self.id}>'
\ No newline at end of file
+        return f'<Refund {self.id}>'
+
+
+class DailyRevenue(db.Model):
+    """
+    Completed-payment totals per calendar day of ``Payment.created_at``.
+    Maintained with ``record_payment`` in the same transaction as the payment
+    change; ``backfill`` rebuilds it from ``Payment`` with one GROUP BY.
+    """
+    __tablename__ = 'daily_revenue'
+    day = db.Column(db.Date, primary_key=True)
+    amount = db.Column(db.Float, nullable=False, default=0)
+    payments = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+
+    @staticmethod
+    def _completed_between(start, end):
+        return db.session.query(
+            func.coalesce(func.sum(Payment.amount), 0), func.count(Payment.id)
+        ).filter(
+            Payment.status == 'completed',
+            Payment.created_at >= start,
+            Payment.created_at < end
+        ).one()
+
+    @classmethod
+    def _seed(cls, day):
+        """Create a day's row from the real payments (pending changes are flushed first)"""
+        db.session.flush()
+        start = datetime.combine(day, datetime.min.time())
+        amount, payments = cls._completed_between(start, start + timedelta(days=1))
+        row = cls(day=day, amount=float(amount), payments=payments)
+        try:
+            with db.session.begin_nested():
+                db.session.add(row)
+        except IntegrityError:
+            return None
+        return row
+
+    @classmethod
+    def adjust(cls, day, amount, payments):
+        """Add deltas to a day's totals inside the current transaction (does not commit)"""
+        for _ in range(2):
+            result = db.session.execute(
+                db.update(cls)
+                .where(cls.day == day)
+                .values(amount=cls.amount + amount, payments=cls.payments + payments, updated_at=datetime.now())
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                return
+            # No row yet: seeding counts the already-flushed change itself.
+            # If a concurrent transaction seeded first, retry the UPDATE.
+            if cls._seed(day) is not None:
+                return
+
+    @classmethod
+    def record_payment(cls, payment, previous_status=None, previous_amount=None):
+        """
+        Account for a payment that was created (``previous_status=None``) or
+        changed status/amount. Call before the commit; does not commit.
+        """
+        was_counted = previous_status == 'completed'
+        is_counted = payment.status == 'completed'
+        if previous_amount is None:
+            previous_amount = payment.amount
+        if not was_counted and not is_counted:
+            return
+        if payment.created_at is None:
+            db.session.flush()
+
+        amount = (payment.amount if is_counted else 0) - (previous_amount if was_counted else 0)
+        payments = int(is_counted) - int(was_counted)
+        if amount or payments:
+            cls.adjust(payment.created_at.date(), amount, payments)
+
+    @classmethod
+    def totals_between(cls, start, end):
+        """``{date: amount}`` for days in ``[start, end]`` that had revenue (one range read)"""
+        rows = db.session.query(cls.day, cls.amount).filter(cls.day >= start, cls.day <= end)
+        return {day: amount for day, amount in rows}
+
+    @classmethod
+    def backfill(cls, start=None, end=None):
+        """
+        Recompute the rows for ``[start, end]`` (all days when omitted) from
+        ``Payment`` with one GROUP BY; returns the number of days written.
+        """
+        day = func.date(Payment.created_at)
+        query = db.session.query(
+            day.label('day'), func.sum(Payment.amount), func.count(Payment.id)
+        ).filter(Payment.status == 'completed')
+        existing = cls.query
+        if start:
+            query = query.filter(Payment.created_at >= datetime.combine(start, datetime.min.time()))
+            existing = existing.filter(cls.day >= start)
+        if end:
+            query = query.filter(Payment.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+            existing = existing.filter(cls.day <= end)
+
+        rows = []
+        for value, amount, payments in query.group_by(day):
+            if isinstance(value, str):
+                value = datetime.strptime(value, '%Y-%m-%d').date()
+            rows.append(cls(day=value, amount=float(amount or 0), payments=payments))
+
+        existing.delete(synchronize_session=False)
+        db.session.add_all(rows)
+        db.session.commit()
+        return len(rows)
+
+    def __repr__(self):
+        return f'<DailyRevenue {self.day} {self.amount}>'
@@ -0,0 +1,51 @@
+from app.extensions import db
+from datetime import datetime
+
+
+class SearchDocument(db.Model):
+    """One indexed blog post, service, sample or category (see app.services.search)"""
+    __tablename__ = 'search_document'
+    __table_args__ = (
+        db.UniqueConstraint('doc_type', 'doc_id', name='uq_search_document_doc'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    doc_type = db.Column(db.String(20), nullable=False)
+    doc_id = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.String(255), nullable=False)
+    slug = db.Column(db.String(255))
+    length = db.Column(db.Integer, nullable=False, default=0)  # weighted token count
+    indexed_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+
+    postings = db.relationship('SearchPosting', backref='document', lazy=True,
+                               cascade='all, delete-orphan', passive_deletes=True)
+
+    def __repr__(self):
+        return f'<SearchDocument {self.doc_type}:{self.doc_id}>'
+
+
+class SearchPosting(db.Model):
+    """Inverted index entry: how often ``term`` occurs in a document"""
+    __tablename__ = 'search_posting'
+    __table_args__ = (
+        db.Index('ix_search_posting_document_id', 'document_id'),
+    )
+
+    # (term, document_id) primary key doubles as the term lookup index
+    term = db.Column(db.String(64), primary_key=True)
+    document_id = db.Column(db.Integer, db.ForeignKey('search_document.id', ondelete='CASCADE'), primary_key=True)
+    frequency = db.Column(db.Integer, nullable=False, default=1)
+
+    def __repr__(self):
+        return f'<SearchPosting {self.term}:{self.document_id}>'
+
+
+class SearchTerm(db.Model):
+    """Index dictionary: each term and how many documents contain it"""
+    __tablename__ = 'search_term'
+
+    term = db.Column(db.String(64), primary_key=True)
+    document_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<SearchTerm {self.term}:{self.document_count}>'
@@ -29,6 +29,8 @@ class Service(db.Model):
     tags = db.Column(db.String(255), nullable=True) 
     pricing_category_id = db.Column(db.Integer, db.ForeignKey('pricing_category.id'))
     slug = db.Column(db.String(200), unique=True, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    plain_excerpt = db.Column(db.Text)  # description without headings or tags, derived on save
     
     orders = db.relationship('Order', backref='service', lazy=True)
     samples = db.relationship('Sample', backref='service', lazy=True)
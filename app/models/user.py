@@ -3,7 +3,7 @@ from flask import url_for
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from app.extensions import db
-from app.models.communication import ChatMessage, Chat
+from app.models.communication import ChatMessage, Chat, UnreadCounter
 import enum
 
 class GenderEnum(enum.Enum):
@@ -48,6 +48,7 @@ class User(UserMixin, db.Model):
     referred_by = db.relationship('Referral', foreign_keys='Referral.referred_id', backref='referred', lazy=True)
     notifications = db.relationship('Notification', backref='user', lazy=True)
     testimonials = db.relationship('Testimonial', backref='author', lazy=True, cascade='all, delete-orphan')
+    unread_counter = db.relationship('UnreadCounter', uselist=False, cascade='all, delete-orphan')
     
     def set_password(self, password):
         """Set the password hash from the provided password."""
@@ -64,17 +65,10 @@ class User(UserMixin, db.Model):
         return self.username
     
     def get_unread_notification_count(self):
-        return self.notifications.filter_by(is_read=False).count()
+        return UnreadCounter.get_counts(self.id)[1]
     
     def get_unread_message_count(self):
-        from sqlalchemy import and_, or_
-        return db.session.query(ChatMessage).join(Chat).filter(
-            and_(
-                or_(Chat.user_id == self.id, Chat.admin_id == self.id),
-                ChatMessage.user_id != self.id,
-                ChatMessage.is_read == False
-            )
-        ).count()
+        return UnreadCounter.get_counts(self.id)[0]
     
     def get_profile_pic_url(self):
         filename = self.profile_pic if self.profile_pic and self.profile_pic != 'default.png' else 'default.png'
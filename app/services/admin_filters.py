@@ -0,0 +1,93 @@
+"""
+Filters shared by the admin list pages and their exports.
+
+Each function takes an ORM query or a ``select()`` and the raw filter values
+from the request (or the CLI), and returns the filtered statement. Keeping
+them in one place means an export always contains exactly the rows the list
+page shows. None of them add joins except ``filter_payments``, and it does so
+only when asked to (``joined=False``).
+"""
+from app.extensions import db
+from app.models.order import Order
+from app.models.payment import Payment
+from app.models.user import User
+from datetime import datetime, timedelta
+
+
+def like_pattern(value, prefix_only=False):
+    """LIKE pattern for ``value`` with its wildcards escaped (use ``escape='\\\\'``)"""
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'{escaped}%' if prefix_only else f'%{escaped}%'
+
+
+def _ilike(column, value, prefix_only=False):
+    return column.ilike(like_pattern(value, prefix_only), escape='\\')
+
+
+def parse_day(value):
+    """``'YYYY-MM-DD'`` -> datetime, or None for an empty or malformed value"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d') if value else None
+    except ValueError:
+        return None
+
+
+def filter_orders(query, status=None, search=None):
+    """Status and order number (prefix) / title search"""
+    if status:
+        query = query.filter(Order.status == status)
+    search = (search or '').strip()
+    if search:
+        query = query.filter(db.or_(
+            _ilike(Order.order_number, search, prefix_only=True),
+            _ilike(Order.title, search)
+        ))
+    return query
+
+
+def filter_payments(query, status=None, search=None, date_from=None, date_to=None, joined=False):
+    """
+    Status, created date range (inclusive days) and order number / user /
+    payment id search. The search needs Order and User outer-joined (as the
+    export does), so payments without an order or user are still found by
+    their payment id; pass ``joined=True`` if the caller has already joined them.
+    """
+    if status:
+        query = query.filter(Payment.status == status)
+
+    search = (search or '').strip()
+    if search:
+        if not joined:
+            query = query.outerjoin(Order, Payment.order_id == Order.id).outerjoin(User, Payment.user_id == User.id)
+        query = query.filter(
+            _ilike(Order.order_number, search) |
+            _ilike(User.username, search) |
+            _ilike(User.email, search) |
+            _ilike(Payment.payment_id, search)
+        )
+
+    start = parse_day(date_from)
+    if start:
+        query = query.filter(Payment.created_at >= start)
+    end = parse_day(date_to)
+    if end:
+        query = query.filter(Payment.created_at < end + timedelta(days=1))  # Include the entire day
+    return query
+
+
+def filter_users(query, admin=None, search=None):
+    """Admin flag (``'true'``/``'false'``) and name/email search"""
+    if admin == 'true':
+        query = query.filter(User.is_admin == True)
+    elif admin == 'false':
+        query = query.filter(User.is_admin == False)
+
+    search = (search or '').strip()
+    if search:
+        query = query.filter(
+            _ilike(User.username, search) |
+            _ilike(User.email, search) |
+            _ilike(User.first_name, search) |
+            _ilike(User.last_name, search)
+        )
+    return query
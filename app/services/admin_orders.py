@@ -0,0 +1,91 @@
+"""
+Admin order list backend.
+
+Pages are keyset-paginated on ``(sort column, id)``, and only whitelisted,
+indexed columns can be sorted on. The query loads the listed columns only,
+and it loads each order's client and service in the same statement. A page
+therefore costs one index range scan however large the orders table is.
+Cursors are scoped to the sort they were issued for. A cursor replayed under
+a different sort is rejected instead of being compared against the wrong
+column.
+"""
+from app.models.order import Order
+from app.models.user import User
+from app.models.service import Service
+from app.services.admin_filters import filter_orders
+from app.utils.pagination import keyset_paginate, InvalidCursor
+from sqlalchemy.orm import load_only, joinedload
+
+# Sortable columns; each has a (column, id) index on Order
+SORT_COLUMNS = {
+    'created_at': Order.created_at,
+    'due_date': Order.due_date,
+    'total_price': Order.total_price,
+    'order_number': Order.order_number,
+}
+DEFAULT_SORT = ('created_at', 'desc')
+
+LIST_COLUMNS = (
+    Order.id, Order.order_number, Order.title, Order.status, Order.paid,
+    Order.total_price, Order.due_date, Order.created_at, Order.client_id, Order.service_id
+)
+
+
+class AdminOrderList:
+    """Service class for the admin order data grid"""
+
+    @staticmethod
+    def normalize_sort(sort_by=None, sort_order=None):
+        """Whitelisted ``(sort_by, sort_order)``, falling back to newest first"""
+        if sort_by not in SORT_COLUMNS:
+            return DEFAULT_SORT
+        return sort_by, 'asc' if sort_order == 'asc' else 'desc'
+
+    @staticmethod
+    def query(status=None, search=None):
+        """Projection query for the list, filtered by status and order number/title"""
+        query = Order.query.options(
+            load_only(*LIST_COLUMNS),
+            joinedload(Order.client).load_only(User.id, User.username, User.email),
+            joinedload(Order.service).load_only(Service.id, Service.name),
+        )
+        return filter_orders(query, status, search)
+
+    @staticmethod
+    def page(status=None, search=None, sort_by=None, sort_order=None, cursor=None, limit=25):
+        """
+        One page of orders. Returns a ``KeysetPage``; raises ``InvalidCursor``
+        for a malformed cursor or one issued for a different sort.
+        """
+        sort_by, sort_order = AdminOrderList.normalize_sort(sort_by, sort_order)
+        scope = f'{sort_by}.{sort_order}.'
+        if cursor:
+            if not cursor.startswith(scope):
+                raise InvalidCursor('Cursor does not match the requested sort')
+            cursor = cursor[len(scope):]
+
+        page = keyset_paginate(
+            AdminOrderList.query(status, search),
+            (SORT_COLUMNS[sort_by], Order.id),
+            cursor=cursor,
+            limit=limit,
+            descending=sort_order == 'desc'
+        )
+        if page.next_cursor:
+            page.next_cursor = scope + page.next_cursor
+        return page
+
+    @staticmethod
+    def serialize(order):
+        return {
+            'id': order.id,
+            'order_number': order.order_number,
+            'title': order.title,
+            'status': order.status,
+            'paid': bool(order.paid),
+            'total_price': float(order.total_price or 0),
+            'due_date': order.due_date.isoformat() if order.due_date else None,
+            'created_at': order.created_at.isoformat() if order.created_at else None,
+            'client': {'id': order.client.id, 'username': order.client.username} if order.client else None,
+            'service': {'id': order.service.id, 'name': order.service.name} if order.service else None,
+        }
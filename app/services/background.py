@@ -0,0 +1,24 @@
+"""
+Background green threads started once per process at boot.
+
+The entrypoints (``wsgi.py``, ``app.py``) call ``start_background_services``
+after ``create_app``, so rows left pending by a deploy or a crash are picked
+up straight away. Each service keeps its own config switch (a worker count
+or interval of 0 leaves it to its ``flask`` command), and each starter is
+idempotent.
+"""
+from app.services.deadline_reminders import start_deadline_reminders
+from app.services.order_lifecycle import start_order_lifecycle_sweeper
+from app.services.triggers.outbox import start_outbox_dispatchers
+from app.sockets.utils import start_unread_reconciler
+from app.utils.mail_queue import start_mail_workers
+
+
+def start_background_services(app):
+    """Start every enabled background service for this process"""
+    if app.config.get('MAIL_QUEUE_ENABLED', True):
+        start_mail_workers(app)
+    start_outbox_dispatchers(app)
+    start_order_lifecycle_sweeper(app)
+    start_deadline_reminders(app)
+    start_unread_reconciler(app)
@@ -0,0 +1,60 @@
+"""
+Data for the blog's shared blocks: the featured post, recent posts and the
+category list with post counts.
+
+The blog pages render these blocks through ``cached_fragment`` in the 'blog'
+namespace. A commit that changes a post or category invalidates them, which
+covers publishing, unpublishing and editing in the admin. The views pass the
+queries below as ``Deferred`` values, so they only run on a cache miss.
+"""
+from app.extensions import db
+from app.models.blog import BlogPost, BlogCategory
+from app.utils.fragment_cache import Deferred, cached_value, register_namespace
+from sqlalchemy.orm import joinedload
+
+NAMESPACE = 'blog'
+RECENT_POSTS = 5
+
+register_namespace(NAMESPACE, (BlogPost, BlogCategory))
+
+
+class BlogSidebar:
+    """Service class for the blog sidebar and featured post"""
+
+    @staticmethod
+    def _published():
+        return BlogPost.query.filter_by(is_published=True).order_by(BlogPost.published_at.desc())
+
+    @staticmethod
+    def featured_post():
+        """Most recently published post"""
+        return BlogSidebar._published().options(joinedload(BlogPost.category)).first()
+
+    @staticmethod
+    def featured_post_id():
+        """Id of the featured post, cached with the fragments (0 when there is none)"""
+        return cached_value(NAMESPACE, 'featured-id', lambda: db.session.scalar(
+            db.select(BlogPost.id).filter_by(is_published=True).order_by(BlogPost.published_at.desc()).limit(1)
+        ) or 0)
+
+    @staticmethod
+    def recent_posts(limit=RECENT_POSTS):
+        return BlogSidebar._published().limit(limit).all()
+
+    @staticmethod
+    def categories():
+        """``(category, published post count)`` pairs in one query"""
+        return db.session.execute(
+            db.select(BlogCategory, db.func.count(BlogPost.id))
+            .outerjoin(BlogPost, (BlogPost.category_id == BlogCategory.id) & (BlogPost.is_published == True))
+            .group_by(BlogCategory.id)
+            .order_by(BlogCategory.id)
+        ).all()
+
+    @staticmethod
+    def context():
+        """Template variables for the sidebar blocks, loaded only on a cache miss"""
+        return {
+            'recent_posts': Deferred(BlogSidebar.recent_posts),
+            'categories': Deferred(BlogSidebar.categories),
+        }
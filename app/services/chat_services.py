@@ -1,5 +1,6 @@
-from app.models import Chat, ChatMessage, User
+from app.models import Chat, ChatMessage, User, UnreadCounter
 from app.extensions import db
+from app.utils.pagination import keyset_paginate
 # from app.sockets.utils import send_message_notification
 from datetime import datetime
 
@@ -39,11 +40,13 @@ class ChatService:
             is_read=False
         )
         
+        recipient_id = chat.user_id if from_admin else chat.admin_id
+        
         db.session.add(message)
+        UnreadCounter.adjust(recipient_id, messages=1)
         db.session.commit()
         
         # Send notification to other participant
-        recipient_id = chat.user_id if from_admin else chat.admin_id
         sender = User.query.get(sender_id)
         
         # send_message_notification(recipient_id, chat, message, sender)
@@ -60,6 +63,47 @@ class ChatService:
         
         return chats
     
+    @staticmethod
+    def get_chat_summaries(user_id, is_admin=False, cursor=None, limit=50):
+        """
+        One page of a user's chats with their last message and unread count,
+        most recently active first. Returns a ``KeysetPage`` of rows with
+        ``id``, ``subject``, ``status``, ``created_at``, ``last_message``,
+        ``unread_count`` and ``last_activity_at``.
+        """
+        owner = Chat.admin_id if is_admin else Chat.user_id
+        
+        # Per-chat aggregates over this user's chats only, in one grouped pass
+        stats = db.session.query(
+            ChatMessage.chat_id.label('chat_id'),
+            db.func.max(ChatMessage.id).label('last_message_id'),
+            db.func.sum(db.case(
+                ((ChatMessage.user_id != user_id) & (ChatMessage.is_read == False), 1),
+                else_=0
+            )).label('unread_count')
+        ).join(Chat, Chat.id == ChatMessage.chat_id).filter(
+            owner == user_id
+        ).group_by(ChatMessage.chat_id).subquery()
+        
+        last_message = db.aliased(ChatMessage)
+        last_activity_at = db.func.coalesce(last_message.created_at, Chat.created_at).label('last_activity_at')
+        
+        query = db.session.query(
+            Chat.id.label('id'),
+            Chat.subject.label('subject'),
+            Chat.status.label('status'),
+            Chat.created_at.label('created_at'),
+            last_message.content.label('last_message'),
+            db.func.coalesce(stats.c.unread_count, 0).label('unread_count'),
+            last_activity_at
+        ).outerjoin(
+            stats, stats.c.chat_id == Chat.id
+        ).outerjoin(
+            last_message, last_message.id == stats.c.last_message_id
+        ).filter(owner == user_id)
+        
+        return keyset_paginate(query, (last_activity_at, Chat.id), cursor=cursor, limit=limit)
+    
     @staticmethod
     def get_chat_with_messages(chat_id, user_id):
         """Get chat with messages if user has access"""
@@ -0,0 +1,195 @@
+"""
+Per-client order statistics for the client dashboard.
+
+``ClientOrderStats.get`` computes a client's totals, status counts and
+six-month trend in one query grouped by status (months are conditional sums)
+and caches the result per user for ``CLIENT_STATS_TTL`` seconds. A commit that
+changes one of the client's orders or payments drops that client's entry;
+bulk order UPDATE/DELETE statements drop every entry.
+"""
+from app.extensions import db
+from app.models.order import Order
+from app.models.payment import Payment
+from app.utils.model_events import after_commit, on_models_committed
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import threading
+import time
+
+# Statuses listed (and checked for overdue/upcoming deadlines) on the dashboard
+OPEN_STATUSES = ['pending', 'active']
+
+_ALL = object()
+
+
+def month_starts(now, months=6):
+    """First day of each of the last ``months`` months, oldest first"""
+    starts = [now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)]
+    for _ in range(months - 1):
+        starts.append((starts[-1] - timedelta(days=1)).replace(day=1))
+    return list(reversed(starts))
+
+
+def _next_month(start):
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+class ClientOrderStats:
+    """Service class for a client's order aggregate"""
+
+    @staticmethod
+    def compute(user_id, now=None):
+        now = now or datetime.now()
+        months = month_starts(now)
+        this_month = Order.created_at >= months[-1]
+        paid_price = db.case((Order.paid == True, Order.total_price), else_=0)
+
+        rows = db.session.query(
+            Order.status,
+            db.func.count(Order.id),
+            db.func.sum(paid_price),
+            db.func.sum(db.case((Order.paid == True, 1), else_=0)),
+            db.func.sum(db.case((this_month, 1), else_=0)),
+            db.func.sum(db.case((this_month, paid_price), else_=0)),
+            *[
+                db.func.sum(db.case(((Order.created_at >= start) & (Order.created_at < _next_month(start)), 1), else_=0))
+                for start in months
+            ]
+        ).filter(Order.client_id == user_id).group_by(Order.status).all()
+
+        stats = {
+            'total_orders': 0,
+            'total_spent': 0.0,
+            'paid_orders': 0,
+            'orders_this_month': 0,
+            'spent_this_month': 0.0,
+            'order_status_counts': {},
+            'monthly_order_trend': [{'month': start.strftime('%b %Y'), 'orders': 0} for start in months],
+            'month': months[-1],
+        }
+        for status, count, spent, paid, month_count, month_spent, *trend in rows:
+            stats['order_status_counts'][status] = count
+            stats['total_orders'] += count
+            stats['total_spent'] += float(spent or 0)
+            stats['paid_orders'] += int(paid or 0)
+            stats['orders_this_month'] += int(month_count or 0)
+            stats['spent_this_month'] += float(month_spent or 0)
+            for bucket, orders in zip(stats['monthly_order_trend'], trend):
+                bucket['orders'] += int(orders or 0)
+
+        total = stats['total_orders']
+        stats['avg_order_value'] = stats['total_spent'] / max(1, stats['paid_orders']) if total else 0.0
+        stats['completion_rate'] = (stats['order_status_counts'].get('completed', 0) / total) * 100 if total else 0.0
+        return stats
+
+    @staticmethod
+    def get(user_id):
+        """Return a client's cached stats, recomputing them if stale"""
+        return _cache.get(int(user_id))
+
+    @staticmethod
+    def invalidate(user_ids=None):
+        """Drop the cached stats of ``user_ids`` (every client when omitted)"""
+        _cache.drop(_ALL if user_ids is None else user_ids)
+
+    @staticmethod
+    def dashboard_orders(user_id, now=None, recent_limit=10, completed_limit=10, upcoming_limit=5):
+        """
+        Every order list on the dashboard from one query: the client's open
+        orders plus their most recent and most recently created completed
+        orders, partitioned here.
+        """
+        now = now or datetime.now()
+        recent_ids = db.select(Order.id).where(Order.client_id == user_id)\
+            .order_by(Order.created_at.desc(), Order.id.desc()).limit(recent_limit)
+        completed_ids = db.select(Order.id).where(Order.client_id == user_id, Order.status == 'completed')\
+            .order_by(Order.created_at.desc(), Order.id.desc()).limit(completed_limit)
+
+        orders = Order.query.filter(
+            Order.client_id == user_id,
+            db.or_(
+                Order.status.in_(OPEN_STATUSES),
+                Order.id.in_(recent_ids),
+                Order.id.in_(completed_ids)
+            )
+        ).all()
+
+        by_created = sorted(orders, key=lambda o: (o.created_at, o.id), reverse=True)
+        open_orders = sorted((o for o in orders if o.status in OPEN_STATUSES), key=lambda o: (o.due_date, o.id))
+        next_week = now + timedelta(days=7)
+
+        return {
+            'recent_orders': by_created[:recent_limit],
+            'pending_orders': [o for o in open_orders if o.status == 'pending'],
+            'active_orders': [o for o in open_orders if o.status == 'active'],
+            'completed_orders': [o for o in by_created if o.status == 'completed'][:completed_limit],
+            'overdue_orders': [o for o in open_orders if o.due_date < now],
+            'upcoming_deadlines': [o for o in open_orders if now <= o.due_date <= next_week][:upcoming_limit],
+        }
+
+
+class _ClientStatsCache:
+    """Per-worker LRU of client stats with a TTL"""
+
+    def __init__(self):
+        self._entries = OrderedDict()  # user_id -> (stats, built_at)
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get(self, user_id):
+        config = current_app.config
+        ttl = config.get('CLIENT_STATS_TTL', 300)
+        now = datetime.now()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and time.monotonic() - entry[1] < ttl and entry[0]['month'] == month_starts(now)[-1]:
+                self._entries.move_to_end(user_id)
+                return entry[0]
+            generation = self._generation
+
+        stats = ClientOrderStats.compute(user_id, now)
+        with self._lock:
+            # Skip storing if an invalidation raced with the computation
+            if generation == self._generation:
+                self._entries[user_id] = (stats, time.monotonic())
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > config.get('CLIENT_STATS_CACHE_SIZE', 2000):
+                    self._entries.popitem(last=False)
+        return stats
+
+    def drop(self, user_ids):
+        with self._lock:
+            self._generation += 1
+            if user_ids is _ALL:
+                self._entries.clear()
+                return
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+
+_cache = _ClientStatsCache()
+
+
+def _client_id(obj):
+    """Owning client of a changed order/payment, from loaded state only (None if unknown)"""
+    return vars(obj).get('client_id' if isinstance(obj, Order) else 'user_id')
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_clients(session, flush_context):
+    changed = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Order, Payment)):
+            client_id = _client_id(obj)
+            if client_id is None:
+                changed = _ALL
+                break
+            changed.add(client_id)
+    if changed:
+        after_commit(session, lambda: _cache.drop(changed))
+
+
+on_models_committed((Order,), lambda *args: _cache.drop(_ALL), bulk_only=True)
@@ -0,0 +1,159 @@
+"""
+Derived content for blog posts, samples and service descriptions.
+
+Pages used to derive display HTML at render time. For example, the
+``remove_headings`` filter parsed each card's HTML with BeautifulSoup on every
+request. Now the HTML is parsed once, when the object is saved. A
+``before_flush`` hook re-derives an object whenever it is new or its source
+column changed. It stores the content with anchors on its headings, a
+plain-text excerpt without the headings (what cards show), the word count,
+the reading time and a table of contents. Templates only read those columns.
+
+``derive()`` is a pure function of the source HTML. ``flask
+backfill-derived-content`` can therefore run it for existing rows in a pool
+of worker processes.
+"""
+from app.extensions import db
+from app.models.blog import BlogPost
+from app.models.content import Sample
+from app.models.service import Service
+from sqlalchemy import event
+from sqlalchemy.orm import Session, attributes
+from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+import re
+
+HEADINGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+EXCERPT_LENGTH = 200
+READING_WPM = 200
+
+DERIVED_FIELDS = ('content_html', 'plain_excerpt', 'word_count', 'reading_time', 'toc')
+
+# model -> (source column, derived columns, columns only filled when empty).
+# A sample's word count is entered by the admin and is only derived if missing.
+DERIVED = {
+    BlogPost: ('content', DERIVED_FIELDS, ()),
+    Sample: ('content', DERIVED_FIELDS, ('word_count',)),
+    Service: ('description', ('plain_excerpt',), ()),
+}
+
+
+def _anchor(text, used):
+    anchor = re.sub(r'[-\s]+', '-', re.sub(r'[^\w\s-]', '', text.lower())).strip('-') or 'section'
+    candidate, n = anchor, 1
+    while candidate in used:
+        n += 1
+        candidate = f'{anchor}-{n}'
+    used.add(candidate)
+    return candidate
+
+
+def _excerpt(text, length=EXCERPT_LENGTH):
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(' ', 1)[0]
+    return cut.rstrip(' ,.;:') + '...'
+
+
+def derive(html):
+    """Source HTML -> dict of every derived field"""
+    html = html or ''
+    soup = BeautifulSoup(html, 'html.parser')
+
+    toc = []
+    used = set()
+    for heading in soup.find_all(HEADINGS):
+        text = ' '.join(heading.get_text(' ').split())
+        if heading.get('id'):
+            used.add(heading['id'])
+        else:
+            heading['id'] = _anchor(text, used)
+        if text:
+            toc.append({'level': int(heading.name[1]), 'text': text, 'anchor': heading['id']})
+    content_html = str(soup)
+    word_count = len(soup.get_text(' ').split())
+
+    for heading in soup.find_all(HEADINGS):
+        heading.decompose()
+    plain = ' '.join(soup.get_text(' ').split())
+
+    return {
+        'content_html': content_html,
+        'plain_excerpt': _excerpt(plain),
+        'word_count': word_count,
+        'reading_time': math.ceil(word_count / READING_WPM),
+        'toc': toc,
+    }
+
+
+class ContentDerivation:
+    """Service class for content derived from blog, sample and service HTML"""
+
+    @staticmethod
+    def apply(obj):
+        """Re-derive ``obj``'s columns from its source HTML"""
+        source, fields, fill_only = DERIVED[type(obj)]
+        derived = derive(getattr(obj, source))
+        for field in fields:
+            if field in fill_only and getattr(obj, field):
+                continue
+            setattr(obj, field, derived[field])
+
+    @staticmethod
+    def backfill(model, batch_size=200, workers=None):
+        """
+        Derive the columns of every ``model`` row. Rows are read in id order
+        in batches; each batch is derived in a pool of ``workers`` processes
+        (one per CPU by default) and written back with a bulk UPDATE that
+        keeps each row's ``updated_at``. Returns the number of rows updated.
+        """
+        source, fields, fill_only = DERIVED[model]
+        columns = [model.id, getattr(model, source), model.updated_at] + [
+            getattr(model, field) for field in fill_only
+        ]
+
+        workers = workers or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        updated = 0
+        last_id = 0
+        try:
+            while True:
+                rows = db.session.execute(
+                    db.select(*columns).where(model.id > last_id).order_by(model.id).limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+
+                sources = [row[1] for row in rows]
+                if pool is None:
+                    results = map(derive, sources)
+                else:
+                    results = pool.map(derive, sources, chunksize=max(1, len(sources) // (workers * 4)))
+
+                values = []
+                for row, derived in zip(rows, results):
+                    kept = dict(zip(fill_only, row[3:]))
+                    # Passing updated_at stops its onupdate from dating every row to now
+                    values.append({'id': row[0], 'updated_at': row[2], **{
+                        field: derived[field] for field in fields if not kept.get(field)
+                    }})
+                db.session.execute(db.update(model), values)
+                db.session.commit()
+                updated += len(values)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return updated
+
+
+@event.listens_for(Session, 'before_flush')
+def _derive_changed_content(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty):
+        spec = DERIVED.get(type(obj))
+        if spec is None:
+            continue
+        if obj in session.new or attributes.get_history(obj, spec[0]).has_changes():
+            ContentDerivation.apply(obj)
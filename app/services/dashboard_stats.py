@@ -0,0 +1,197 @@
+"""
+Admin dashboard statistics snapshot.
+
+All dashboard figures come from two conditional-aggregation queries and are
+cached per worker for ``DASHBOARD_STATS_TTL`` seconds. Between rebuilds the
+hot counters (order totals per status, revenue) are patched in place from
+order and payment changes as their transactions commit, so the snapshot does
+not have to be rebuilt on every write. Bulk UPDATE/DELETE statements on orders
+or payments cannot be turned into deltas and mark the snapshot stale instead.
+The remaining figures (users, unread messages, testimonials, overdue and
+returning clients) are refreshed by the TTL.
+"""
+from app.extensions import db
+from app.models.order import Order
+from app.models.payment import Payment
+from app.models.user import User
+from app.models.communication import ChatMessage
+from app.models.content import Testimonial
+from app.utils.model_events import after_commit, on_models_committed
+from app.utils.worker_cache import WorkerCache
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from collections import Counter
+from datetime import datetime
+
+# Statuses shown on the dashboard and the orders-by-status chart
+CHART_STATUSES = ['pending', 'active', 'completed', 'cancelled', 'revision']
+CHART_COLORS = ['#FFC107', '#2196F3', '#4CAF50', '#F44336', '#9C27B0']
+
+def _build(version=0):
+    now = datetime.now()
+
+    by_status = db.session.query(
+        Order.status,
+        db.func.count(Order.id),
+        db.func.sum(db.case((Order.due_date < now, 1), else_=0))
+    ).group_by(Order.status).all()
+
+    returning = db.session.query(Order.client_id).group_by(Order.client_id).having(
+        db.func.count(Order.id) > 1
+    ).subquery()
+    totals = db.session.query(
+        db.select(db.func.count(User.id)).where(User.is_admin == False).scalar_subquery(),
+        db.select(db.func.count(ChatMessage.id)).where(ChatMessage.is_read == False).scalar_subquery(),
+        db.select(db.func.count(Testimonial.id)).where(Testimonial.is_approved == False).scalar_subquery(),
+        db.select(db.func.coalesce(db.func.sum(Payment.amount), 0)).where(Payment.status == 'completed').scalar_subquery(),
+        db.select(db.func.count()).select_from(returning).scalar_subquery(),
+    ).one()
+
+    return {
+        'orders_by_status': {status: count for status, count, _ in by_status},
+        'overdue_count': sum(int(overdue or 0) for _, _, overdue in by_status),
+        'users_count': totals[0],
+        'unread_messages_count': totals[1],
+        'pending_testimonials_count': totals[2],
+        'total_revenue': float(totals[3] or 0),
+        'returning_clients': totals[4],
+        'built_at': now,
+    }
+
+
+_stats_cache = WorkerCache('dashboard stats', _build, ttl_config='DASHBOARD_STATS_TTL', default_ttl=60)
+
+
+class DashboardStats:
+    """Service class for the admin dashboard figures"""
+
+    @staticmethod
+    def snapshot():
+        """Return a copy of this worker's snapshot, rebuilding it if stale"""
+        stats = _stats_cache.get()
+        stats = dict(stats, orders_by_status=dict(stats['orders_by_status']))
+        stats['orders_count'] = sum(stats['orders_by_status'].values())
+        return stats
+
+    @staticmethod
+    def status_count(stats, status):
+        return max(stats['orders_by_status'].get(status, 0), 0)
+
+    @staticmethod
+    def dashboard_context():
+        """Template variables for the admin dashboard"""
+        stats = DashboardStats.snapshot()
+        count = lambda status: DashboardStats.status_count(stats, status)
+
+        # Percentage of completed orders (every completed order counts as satisfied)
+        completed = count('completed')
+        satisfaction_rate = int((completed / (completed or 1)) * 100)
+
+        total_clients = stats['users_count']
+        returning = stats['returning_clients']
+
+        return {
+            'users_count': stats['users_count'],
+            'orders_count': stats['orders_count'],
+            'unread_messages_count': stats['unread_messages_count'],
+            'pending_testimonials_count': stats['pending_testimonials_count'],
+            'total_revenue': stats['total_revenue'],
+            'satisfaction_rate': satisfaction_rate,
+            'pending_count': count('pending'),
+            'in_progress_count': count('active'),
+            'completed_count': completed,
+            'cancelled_count': count('cancelled'),
+            'revision_count': count('revision'),
+            'overdue_count': stats['overdue_count'],
+            'new_clients': total_clients - returning,
+            'returning_rate': int((returning / total_clients) * 100) if total_clients > 0 else 0,
+        }
+
+    @staticmethod
+    def orders_by_status():
+        """Data for the orders-by-status chart"""
+        stats = DashboardStats.snapshot()
+        return {
+            'labels': CHART_STATUSES,
+            'data': [DashboardStats.status_count(stats, status) for status in CHART_STATUSES],
+            'colors': CHART_COLORS
+        }
+
+    @staticmethod
+    def invalidate(*args):
+        """Mark this worker's snapshot as stale"""
+        _stats_cache.invalidate()
+
+
+def _apply_deltas(deltas):
+    def patch(stats):
+        by_status = stats['orders_by_status']
+        for status, delta in deltas['statuses'].items():
+            by_status[status] = by_status.get(status, 0) + delta
+        stats['total_revenue'] += deltas['revenue']
+    _stats_cache.patch(patch)
+
+
+def _counted_revenue(status, amount):
+    return (amount or 0) if status == 'completed' else 0
+
+
+class _Unknown(Exception):
+    """An attribute needed for a delta was never loaded"""
+
+
+def _values(obj, attr):
+    """``(before, after)`` values of ``attr`` in this flush, without touching the database"""
+    history = db.inspect(obj).attrs[attr].history
+    if history.unchanged:
+        return history.unchanged[0], history.unchanged[0]
+    if history.deleted or history.added:
+        if not history.deleted:
+            # Assigned while expired: the old value was never read
+            raise _Unknown(attr)
+        return history.deleted[0], history.added[0] if history.added else None
+    raise _Unknown(attr)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_deltas(session, flush_context):
+    statuses = Counter()
+    revenue = 0.0
+
+    try:
+        for obj in session.new:
+            if isinstance(obj, Order):
+                statuses[obj.status] += 1
+            elif isinstance(obj, Payment):
+                revenue += _counted_revenue(obj.status, obj.amount)
+
+        for obj in session.dirty:
+            if isinstance(obj, Order):
+                if db.inspect(obj).attrs.status.history.has_changes():
+                    before, after = _values(obj, 'status')
+                    statuses[before] -= 1
+                    statuses[after] += 1
+            elif isinstance(obj, Payment):
+                state = db.inspect(obj).attrs
+                if state.status.history.has_changes() or state.amount.history.has_changes():
+                    status_before, status_after = _values(obj, 'status')
+                    amount_before, amount_after = _values(obj, 'amount')
+                    revenue += _counted_revenue(status_after, amount_after)
+                    revenue -= _counted_revenue(status_before, amount_before)
+
+        for obj in session.deleted:
+            if isinstance(obj, Order):
+                statuses[_values(obj, 'status')[0]] -= 1
+            elif isinstance(obj, Payment):
+                revenue -= _counted_revenue(_values(obj, 'status')[0], _values(obj, 'amount')[0])
+    except _Unknown:
+        after_commit(session, DashboardStats.invalidate)
+        return
+
+    statuses = {status: delta for status, delta in statuses.items() if delta}
+    if statuses or revenue:
+        deltas = {'statuses': statuses, 'revenue': revenue}
+        after_commit(session, lambda: _apply_deltas(deltas))
+
+
+on_models_committed((Order, Payment), DashboardStats.invalidate, bulk_only=True)
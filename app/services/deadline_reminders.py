@@ -0,0 +1,196 @@
+"""
+Deadline reminder engine.
+
+Each reminder threshold (``DEADLINE_REMINDER_HOURS``, e.g. 24h and 6h before
+``due_date``) has a persisted watermark: the ``(due_date, order_id)`` of the
+last order reminded at that threshold. The engine keeps a min-heap of upcoming
+``(fire_at, order)`` entries for orders past the watermark and due within the
+threshold plus ``DEADLINE_REMINDER_LOOKAHEAD``, loaded with keyset range
+queries on the ``(due_date, id)`` index. Each tick pops only the entries that
+are due, so nothing scans all active orders, and the heap is extended as time
+moves forward. It is rebuilt from the watermarks on startup, after local order
+commits and every ``DEADLINE_REMINDER_RELOAD`` seconds (to see other
+processes' orders).
+
+Reminders are published to the trigger outbox with a key per order, threshold
+and due date, and the watermark moves in the same transaction, so each
+threshold fires once per deadline even with several engines running. A
+changed due date counts as a new deadline.
+"""
+from app.extensions import db, socketio
+from app.models.order import Order, DeadlineReminderWatermark
+from app.services.order_lifecycle import CLOSED_STATUSES
+from app.services.triggers.triggers import handle_deadline_approaching
+from app.utils.model_events import on_models_committed
+from datetime import datetime, timedelta
+import heapq
+import threading
+import time
+
+
+def parse_thresholds(value):
+    """``'24,6'`` -> ``[24, 6]`` (hours before the due date, largest first)"""
+    if isinstance(value, str):
+        value = [v for v in value.split(',') if v.strip()]
+    return sorted({int(v) for v in value if int(v) > 0}, reverse=True)
+
+
+class DeadlineReminderEngine:
+    """Min-heap of upcoming reminder thresholds, fired against persisted watermarks"""
+
+    def __init__(self, app):
+        self.app = app
+        config = app.config
+        self.thresholds = parse_thresholds(config.get('DEADLINE_REMINDER_HOURS', '24,6'))
+        self.interval = config.get('DEADLINE_REMINDER_INTERVAL', 60)
+        self.lookahead = timedelta(seconds=config.get('DEADLINE_REMINDER_LOOKAHEAD', 3600))
+        self.reload_interval = config.get('DEADLINE_REMINDER_RELOAD', 900)
+        self.batch_size = config.get('DEADLINE_REMINDER_BATCH_SIZE', 500)
+        self._heap = []        # (fire_at, order_id, hours, due_date)
+        self._loaded = {}      # hours -> ((due_date, order_id) loaded up to, horizon)
+        self._built_at = None
+
+    def _watermark(self, hours, now):
+        row = db.session.get(DeadlineReminderWatermark, hours)
+        # Never remind about deadlines that have already passed
+        if row is None or row.due_date < now:
+            return (now, 0)
+        return (row.due_date, row.order_id)
+
+    def _load(self, hours, after, horizon):
+        """Push entries for open orders with ``after < (due_date, id)`` and ``due_date <= horizon``"""
+        query = db.session.query(Order.id, Order.due_date).filter(
+            Order.due_date <= horizon,
+            Order.status.notin_(CLOSED_STATUSES)
+        ).order_by(Order.due_date, Order.id)
+
+        while True:
+            rows = query.filter(
+                db.tuple_(Order.due_date, Order.id) > db.tuple_(*after)
+            ).limit(self.batch_size).all()
+            for order_id, due_date in rows:
+                heapq.heappush(self._heap, (due_date - timedelta(hours=hours), order_id, hours, due_date))
+            if rows:
+                after = (rows[-1].due_date, rows[-1].id)
+            if len(rows) < self.batch_size:
+                return after
+
+    def rebuild(self, now):
+        """Reload the heap from the persisted watermarks"""
+        _orders_changed.clear()
+        self._heap = []
+        for hours in self.thresholds:
+            horizon = now + timedelta(hours=hours) + self.lookahead
+            self._loaded[hours] = (self._load(hours, self._watermark(hours, now), horizon), horizon)
+        self._built_at = time.monotonic()
+
+    def extend(self, now):
+        """Load the next slice of each threshold once half the lookahead is used up"""
+        for hours in self.thresholds:
+            after, horizon = self._loaded[hours]
+            if now + timedelta(hours=hours) + self.lookahead / 2 < horizon:
+                continue
+            horizon = now + timedelta(hours=hours) + self.lookahead
+            self._loaded[hours] = (self._load(hours, after, horizon), horizon)
+
+    def _needs_rebuild(self):
+        return (
+            self._built_at is None
+            or _orders_changed.is_set()
+            or time.monotonic() - self._built_at >= self.reload_interval
+        )
+
+    def _advance_watermark(self, hours, key):
+        row = db.session.get(DeadlineReminderWatermark, hours)
+        if row is None:
+            db.session.add(DeadlineReminderWatermark(threshold_hours=hours, due_date=key[0], order_id=key[1]))
+        elif key > (row.due_date, row.order_id):
+            row.due_date, row.order_id = key
+
+    def fire(self, now):
+        """Publish a reminder for every heap entry that is due; returns how many were sent"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap))
+        if not due:
+            return 0
+
+        current = dict(
+            db.session.query(Order.id, Order.due_date).filter(
+                Order.id.in_({order_id for _, order_id, _, _ in due}),
+                Order.status.notin_(CLOSED_STATUSES)
+            ).all()
+        )
+
+        sent = 0
+        watermarks = {}
+        try:
+            for _, order_id, hours, due_date in due:
+                watermarks[hours] = max(watermarks.get(hours, (due_date, order_id)), (due_date, order_id))
+                # Closed since it was loaded, or rescheduled (picked up again by its new due date)
+                if current.get(order_id) != due_date or due_date <= now:
+                    continue
+                hours_remaining = max(1, round((due_date - now).total_seconds() / 3600))
+                if handle_deadline_approaching(order_id, hours_remaining, hours, due_date):
+                    sent += 1
+            for hours, key in watermarks.items():
+                self._advance_watermark(hours, key)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Put the batch back so the next tick retries it
+            for entry in due:
+                heapq.heappush(self._heap, entry)
+            raise
+        return sent
+
+    def run_once(self, now=None):
+        now = now or datetime.now()
+        if self._needs_rebuild():
+            self.rebuild(now)
+        else:
+            self.extend(now)
+        return self.fire(now)
+
+    def seconds_until_next(self, now=None):
+        """Sleep until the next heap entry is due, but at most DEADLINE_REMINDER_INTERVAL"""
+        if not self._heap:
+            return self.interval
+        now = now or datetime.now()
+        return max(0.0, min(self.interval, (self._heap[0][0] - now).total_seconds()))
+
+    def run_forever(self, sleep=time.sleep):
+        """Fire reminders as they fall due until the process exits"""
+        while True:
+            with self.app.app_context():
+                try:
+                    sent = self.run_once()
+                    if sent:
+                        self.app.logger.info(f"Sent {sent} deadline reminders")
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.error(f"Error sending deadline reminders: {e}")
+                finally:
+                    db.session.remove()
+            sleep(self.seconds_until_next() or 1)
+
+
+# Set after local commits that touch orders so the next tick rebuilds the heap
+_orders_changed = threading.Event()
+on_models_committed((Order,), lambda *args: _orders_changed.set())
+
+_engine_started = False
+_engine_lock = threading.Lock()
+
+
+def start_deadline_reminders(app):
+    """Start this process's deadline reminder green thread (once)"""
+    global _engine_started
+    if _engine_started or app.config.get('DEADLINE_REMINDER_INTERVAL', 60) <= 0:
+        return
+    with _engine_lock:
+        if _engine_started:
+            return
+        _engine_started = True
+
+    socketio.start_background_task(DeadlineReminderEngine(app).run_forever, socketio.sleep)
@@ -0,0 +1,250 @@
+"""
+Streaming exports of admin lists (orders, payments, users).
+
+An export selects a fixed set of columns rather than ORM entities, applies
+the same filters as the matching list page, and reads the rows with
+``yield_per`` (a server-side cursor on PostgreSQL). Each chunk of
+``EXPORT_CHUNK_SIZE`` rows is encoded (CSV, NDJSON or a Parquet row group)
+and yielded before the next one is fetched. Memory therefore stays bounded
+by one chunk however many rows are exported. Parquet needs the optional
+``pyarrow`` package.
+"""
+from app.extensions import db
+from app.models.order import Order
+from app.models.payment import Payment
+from app.models.service import Service
+from app.models.user import User
+from app.services.admin_filters import filter_orders, filter_payments, filter_users
+from flask import current_app
+from datetime import date, datetime
+from functools import lru_cache
+import csv
+import io
+import json
+
+# format -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+# dataset -> filter names accepted from the list page's query string
+EXPORT_FILTERS = {
+    'orders': ('status', 'search'),
+    'payments': ('status', 'search', 'date_from', 'date_to'),
+    'users': ('admin', 'search'),
+}
+
+
+class ExportError(ValueError):
+    """Raised for an unknown dataset/format or a missing optional dependency"""
+
+
+def _orders_statement(filters):
+    columns = [
+        ('id', Order.id, 'int'),
+        ('order_number', Order.order_number, 'str'),
+        ('title', Order.title, 'str'),
+        ('status', Order.status, 'str'),
+        ('paid', Order.paid, 'bool'),
+        ('total_price', Order.total_price, 'float'),
+        ('due_date', Order.due_date, 'datetime'),
+        ('created_at', Order.created_at, 'datetime'),
+        ('client', User.username, 'str'),
+        ('client_email', User.email, 'str'),
+        ('service', Service.name, 'str'),
+    ]
+    stmt = db.select(*[column for _, column, _ in columns]).select_from(Order)\
+        .outerjoin(User, Order.client_id == User.id)\
+        .outerjoin(Service, Order.service_id == Service.id)
+    return columns, filter_orders(stmt, **filters).order_by(Order.id)
+
+
+def _payments_statement(filters):
+    columns = [
+        ('id', Payment.id, 'int'),
+        ('payment_id', Payment.payment_id, 'str'),
+        ('order_number', Order.order_number, 'str'),
+        ('username', User.username, 'str'),
+        ('email', User.email, 'str'),
+        ('amount', Payment.amount, 'float'),
+        ('currency', Payment.currency, 'str'),
+        ('method', Payment.method, 'str'),
+        ('status', Payment.status, 'str'),
+        ('created_at', Payment.created_at, 'datetime'),
+    ]
+    stmt = db.select(*[column for _, column, _ in columns]).select_from(Payment)\
+        .outerjoin(Order, Payment.order_id == Order.id)\
+        .outerjoin(User, Payment.user_id == User.id)
+    return columns, filter_payments(stmt, joined=True, **filters).order_by(Payment.id)
+
+
+def _users_statement(filters):
+    columns = [
+        ('id', User.id, 'int'),
+        ('username', User.username, 'str'),
+        ('email', User.email, 'str'),
+        ('first_name', User.first_name, 'str'),
+        ('last_name', User.last_name, 'str'),
+        ('phone_number', User.phone_number, 'str'),
+        ('is_admin', User.is_admin, 'bool'),
+        ('email_verified', User.email_verified, 'bool'),
+        ('created_at', User.created_at, 'datetime'),
+    ]
+    stmt = db.select(*[column for _, column, _ in columns])
+    return columns, filter_users(stmt, **filters).order_by(User.id)
+
+
+EXPORT_DATASETS = {
+    'orders': _orders_statement,
+    'payments': _payments_statement,
+    'users': _users_statement,
+}
+
+
+def _text(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunks(names, kinds, partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    yield buffer.getvalue().encode('utf-8')
+    for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_text(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _ndjson_chunks(names, kinds, partitions):
+    for rows in partitions:
+        yield ''.join(
+            json.dumps(dict(zip(names, map(_text, row))), separators=(',', ':')) + '\n'
+            for row in rows
+        ).encode('utf-8')
+
+
+def _load_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ExportError('Parquet export requires pyarrow. Install with: pip install pyarrow')
+    return pyarrow, pyarrow.parquet
+
+
+@lru_cache(maxsize=None)
+def _format_available(fmt):
+    if fmt != 'parquet':
+        return True
+    try:
+        _load_pyarrow()
+    except ExportError:
+        return False
+    return True
+
+
+class _ChunkSink:
+    """Write-only file that hands each written block back to the generator"""
+
+    def __init__(self):
+        self.blocks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.blocks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data, self.blocks = b''.join(self.blocks), []
+        return data
+
+
+def _parquet_chunks(names, kinds, partitions):
+    pa, pq = _load_pyarrow()
+    types = {'int': pa.int64(), 'str': pa.string(), 'float': pa.float64(),
+             'bool': pa.bool_(), 'datetime': pa.timestamp('us')}
+    schema = pa.schema([(name, types[kind]) for name, kind in zip(names, kinds)])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema)
+    try:
+        for rows in partitions:
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+_WRITERS = {
+    'csv': _csv_chunks,
+    'ndjson': _ndjson_chunks,
+    'parquet': _parquet_chunks,
+}
+
+
+class ExportService:
+    """Service class for streaming admin list exports"""
+
+    @staticmethod
+    def filters_from(dataset, args):
+        """The list-page filters for ``dataset`` found in ``args`` (e.g. request.args)"""
+        return {name: args.get(name) for name in EXPORT_FILTERS.get(dataset, ()) if args.get(name)}
+
+    @staticmethod
+    def available_formats():
+        """The export formats whose optional dependencies are installed"""
+        return [fmt for fmt in EXPORT_FORMATS if _format_available(fmt)]
+
+    @staticmethod
+    def filename(dataset, fmt):
+        return f"{dataset}-{datetime.now():%Y%m%d-%H%M%S}.{EXPORT_FORMATS[fmt][1]}"
+
+    @staticmethod
+    def stream(dataset, fmt='csv', filters=None, chunk_size=None):
+        """
+        Return a generator of encoded chunks for ``dataset`` in format ``fmt``.
+        Everything that can fail up front (unknown dataset or format, missing
+        pyarrow) raises ``ExportError`` here, before any output is produced.
+        """
+        if dataset not in EXPORT_DATASETS:
+            raise ExportError(f"Unknown export dataset: {dataset}")
+        if fmt not in EXPORT_FORMATS:
+            raise ExportError(f"Unknown export format: {fmt}")
+        if fmt == 'parquet':
+            _load_pyarrow()
+
+        columns, stmt = EXPORT_DATASETS[dataset](filters or {})
+        chunk_size = chunk_size or current_app.config.get('EXPORT_CHUNK_SIZE', 1000)
+        names = [name for name, _, _ in columns]
+        kinds = [kind for _, _, kind in columns]
+
+        def generate():
+            result = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+            try:
+                yield from _WRITERS[fmt](names, kinds, result.partitions())
+            finally:
+                result.close()
+
+        return generate()
@@ -1,7 +1,8 @@
-from app.sockets.utils import send_system_notification, broadcast_to_admins
-from app.models import User, Order
+from app.sockets.utils import send_system_notification, send_bulk_notification, broadcast_to_admins, queue_unread_counts
+from app.models import User, Order, Invoice
 from app.extensions import db
-from app.utils.emails import send_order_confirmation, send_order_created, send_order_completed_email, send_payment_completion_email, send_payment_confirmation_email, send_revision_request_email, send_extension_request_email
+from app.utils.model_events import after_commit
+from app.utils.emails import send_order_confirmation, send_order_created_batch, send_order_completed_email, send_payment_completion_email, send_payment_confirmation_email, send_revision_request_email, send_extension_request_email
 
 class NotificationService:
     """Service class for managing notifications"""
@@ -22,11 +23,14 @@ class NotificationService:
             'delivered': 'Your completed assignment has been delivered.',
             'revision': 'Your revision request has been recieved and is being processed',
             'cancelled': 'Your assignment has been cancelled.',
+            'overdue': 'Your assignment has passed its due date. Our team has been alerted and will update you shortly.',
         }
         
         message = status_messages.get(status, f'Assignment status updated to: {status}')
         notification_type = 'success' if status in ['completed', 'delivered'] else 'info'
-        priority = 'high' if status in ['completed', 'delivered', 'cancelled'] else 'normal'
+        if status == 'overdue':
+            notification_type = 'warning'
+        priority = 'high' if status in ['completed', 'delivered', 'cancelled', 'overdue'] else 'normal'
         
         send_system_notification(
             user_id=target_user_id,
@@ -47,16 +51,15 @@ class NotificationService:
         # Send to all admin users
         admin_users = User.query.filter_by(is_admin=True).all()
         
-        for admin in admin_users:
-            send_system_notification(
-                user_id=admin.id,
-                title="New Order Received",
-                message=f"New assignment order #{order.id} from {order.client.username}",
-                notification_type='info',
-                link=f"/admin/orders/{order.id}",
-                priority='high'
-            )
-            send_order_created(admin, order)
+        NotificationService.notify_all_admins(
+            title="New Order Received",
+            message=f"New assignment order #{order.id} from {order.client.username}",
+            notification_type='info',
+            link=f"/admin/orders/{order.id}",
+            priority='high',
+            admin_ids=[admin.id for admin in admin_users]
+        )
+        send_order_created_batch(admin_users, order)
         
         # Also broadcast to admin room
         broadcast_to_admins('new_order_alert', {
@@ -112,17 +115,13 @@ class NotificationService:
             return
         
         # Send to all admin users
-        admin_users = User.query.filter_by(is_admin=True).all()
-        
-        for admin in admin_users:
-            send_system_notification(
-                user_id=admin.id,
-                title="New User Registration",
-                message=f"New user {user.username} ({user.email}) has registered on the platform.",
-                notification_type='info',
-                link=f"/admin/users/{user.id}",
-                priority='normal'
-            )
+        NotificationService.notify_all_admins(
+            title="New User Registration",
+            message=f"New user {user.username} ({user.email}) has registered on the platform.",
+            notification_type='info',
+            link=f"/admin/users/{user.id}",
+            priority='normal'
+        )
         
         # Broadcast to admin room
         broadcast_to_admins('new_user_registration', {
@@ -139,20 +138,16 @@ class NotificationService:
         if not order:
             return
         
-        admin_users = User.query.filter_by(is_admin=True).all()
-        
-        for admin in admin_users:
-            send_system_notification(
-                user_id=admin.id,
-                title="Payment Completed",
-                message=f"Client {order.client.username} has completed payment for order #{order.id}.",
-                notification_type='success',
-                link=f"/admin/orders/{order.id}",
-                priority='high'
-            )
+        NotificationService.notify_all_admins(
+            title="Payment Completed",
+            message=f"Client {order.client.username} has completed payment for order #{order.id}.",
+            notification_type='success',
+            link=f"/admin/orders/{order.id}",
+            priority='high'
+        )
             
         user = User.query.get(order.client_id)
-        invoice = invoice.query.filter_by(order_id=order.id).first()
+        invoice = Invoice.query.filter_by(order_id=order.id).first()
         send_payment_confirmation_email(invoice, user)
 
         broadcast_to_admins('payment_completed', {
@@ -169,23 +164,19 @@ class NotificationService:
         if not order:
             return
         
-        admin_users = User.query.filter_by(is_admin=True).all()
-        
-        for admin in admin_users:
-            send_system_notification(
-                user_id=admin.id,
-                title="Order Deadline Approaching",
-                message=f"Order #{order.id} from {order.client.username} is due in {hours_remaining} hours.",
-                notification_type='warning',
-                link=f"/admin/orders/{order.id}",
-                priority='high'
-            )
+        NotificationService.notify_all_admins(
+            title="Order Deadline Approaching",
+            message=f"Order #{order.id} from {order.client.username} is due in {hours_remaining} hours.",
+            notification_type='warning',
+            link=f"/admin/orders/{order.id}",
+            priority='high'
+        )
         
         broadcast_to_admins('deadline_approaching', {
             'order_id': order.id,
             'client_username': order.client.username,
             'hours_remaining': hours_remaining,
-            'deadline': order.deadline.isoformat() if hasattr(order, 'deadline') else None
+            'deadline': order.due_date.isoformat() if order.due_date else None
         })
 
     @staticmethod
@@ -195,17 +186,13 @@ class NotificationService:
         if not order:
             return
         
-        admin_users = User.query.filter_by(is_admin=True).all()
-        
-        for admin in admin_users:
-            send_system_notification(
-                user_id=admin.id,
-                title="Order Completed by Client",
-                message=f"Client {order.client.username} has accepted and marked order #{order.id} as complete.",
-                notification_type='success',
-                link=f"/admin/orders/{order.id}",
-                priority='normal'
-            )
+        NotificationService.notify_all_admins(
+            title="Order Completed by Client",
+            message=f"Client {order.client.username} has accepted and marked order #{order.id} as complete.",
+            notification_type='success',
+            link=f"/admin/orders/{order.id}",
+            priority='normal'
+        )
 
         broadcast_to_admins('order_completed_by_client', {
             'order_id': order.id,
@@ -220,8 +207,6 @@ class NotificationService:
         if not order:
             return
         
-        admin_users = User.query.filter_by(is_admin=True).all()
-        
         message = f"Client {order.client.username} has requested a revision for order #{order.id}."
         if revision_message:
             message += f" Message: {revision_message[:100]}..."
@@ -229,15 +214,13 @@ class NotificationService:
         user = User.query.get(order.client_id)
         send_revision_request_email(order, user)
 
-        for admin in admin_users:
-            send_system_notification(
-                user_id=admin.id,
-                title="Revision Requested",
-                message=message,
-                notification_type='warning',
-                link=f"/admin/orders/{order.id}",
-                priority='high'
-            )
+        NotificationService.notify_all_admins(
+            title="Revision Requested",
+            message=message,
+            notification_type='warning',
+            link=f"/admin/orders/{order.id}",
+            priority='high'
+        )
         
         broadcast_to_admins('revision_requested', {
             'order_id': order.id,
@@ -367,28 +350,34 @@ class NotificationService:
 
     @staticmethod
     def notify_multiple_users(user_ids, title, message, notification_type='info', link=None, priority='normal'):
-        """Send notification to multiple users"""
-        for user_id in user_ids:
-            send_system_notification(
-                user_id=user_id,
-                title=title,
-                message=message,
-                notification_type=notification_type,
-                link=link,
-                priority=priority
-            )
+        """Send notification to multiple users (one batched insert)"""
+        send_bulk_notification(
+            user_ids,
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            link=link,
+            priority=priority
+        )
 
     @staticmethod
-    def notify_all_admins(title, message, notification_type='info', link=None, priority='normal'):
-        """Send notification to all admin users"""
-        admin_users = User.query.filter_by(is_admin=True).all()
-        admin_ids = [admin.id for admin in admin_users]
+    def notify_all_admins(title, message, notification_type='info', link=None, priority='normal', admin_ids=None):
+        """Send notification to all admin users (one batched insert, one emit to admin_room)"""
+        if admin_ids is None:
+            admin_ids = [row.id for row in User.query.with_entities(User.id).filter_by(is_admin=True)]
         
-        NotificationService.notify_multiple_users(
-            user_ids=admin_ids,
+        notification_ids = send_bulk_notification(
+            admin_ids,
             title=title,
             message=message,
             notification_type=notification_type,
             link=link,
-            priority=priority
-        )
\ No newline at end of file
+            priority=priority,
+            room="admin_room"
+        )
+        
+        # The room emit carries no counts; refresh each admin's badges once it commits
+        def refresh_unread_counts():
+            for admin_id in notification_ids:
+                queue_unread_counts(admin_id)
+        after_commit(db.session, refresh_unread_counts)
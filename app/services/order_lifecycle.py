@@ -0,0 +1,131 @@
+"""
+Time-based order status transitions.
+
+Orders past their due date become 'overdue', and orders left in 'completed
+pending review' for ``ORDER_AUTO_COMPLETE_DAYS`` become 'completed'. Each
+transition is one set-based UPDATE (backed by the ``(status, due_date)`` and
+``(status, updated_at)`` indexes on ``order``) run by a green-thread sweeper
+every ``ORDER_SWEEP_INTERVAL`` seconds, or by ``flask sweep-orders``. Each order
+a sweep moved is published to the trigger outbox as its own event, in the
+same transaction, so the clients are notified off the sweep path and a
+failing notification for one order does not hold back the others.
+"""
+from app.extensions import db, socketio
+from app.models.order import Order
+from app.services.triggers.triggers import handle_order_transitioned
+from datetime import datetime, timedelta
+import threading
+import time
+
+# Statuses an order can no longer become overdue from
+CLOSED_STATUSES = ['completed', 'completed pending review', 'canceled', 'overdue']
+
+
+def _transition(criteria, status, now):
+    """Set ``status`` on every order matching ``criteria``; returns the sorted ids moved"""
+    stmt = db.update(Order).where(*criteria).values(status=status, updated_at=now).execution_options(
+        synchronize_session=False
+    )
+    dialect = db.session.get_bind(mapper=db.inspect(Order)).dialect
+
+    if dialect.update_returning:
+        return sorted(order_id for (order_id,) in db.session.execute(stmt.returning(Order.id)))
+
+    ids = [order_id for (order_id,) in db.session.query(Order.id).filter(*criteria).with_for_update()]
+    if ids:
+        db.session.execute(stmt.where(Order.id.in_(ids)))
+    return sorted(ids)
+
+
+class OrderLifecycleService:
+    """Service class for time-based order status transitions"""
+
+    @staticmethod
+    def mark_overdue(now=None):
+        """Mark open orders past their due date as overdue (the caller commits)"""
+        now = now or datetime.now()
+        return _transition(
+            (Order.due_date < now, Order.status.notin_(CLOSED_STATUSES)),
+            'overdue', now
+        )
+
+    @staticmethod
+    def auto_complete(now=None, days=3):
+        """Complete orders left in 'completed pending review' for ``days`` (the caller commits)"""
+        now = now or datetime.now()
+        return _transition(
+            (Order.status == 'completed pending review', Order.updated_at < now - timedelta(days=days)),
+            'completed', now
+        )
+
+    @staticmethod
+    def sweep(now=None, auto_complete_days=3):
+        """
+        Apply both transitions and commit them together with their outbox
+        events. Returns ``{'overdue': [ids], 'completed': [ids]}``.
+        """
+        now = now or datetime.now()
+        try:
+            moved = {
+                'overdue': OrderLifecycleService.mark_overdue(now),
+                'completed': OrderLifecycleService.auto_complete(now, auto_complete_days),
+            }
+            for status, order_ids in moved.items():
+                for order_id in order_ids:
+                    handle_order_transitioned(order_id, status, now)
+            db.session.commit()
+            return moved
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+class OrderLifecycleSweeper:
+    """Runs ``OrderLifecycleService.sweep`` on a fixed interval"""
+
+    def __init__(self, app):
+        self.app = app
+        self.interval = app.config.get('ORDER_SWEEP_INTERVAL', 300)
+        self.auto_complete_days = app.config.get('ORDER_AUTO_COMPLETE_DAYS', 3)
+
+    def run_once(self):
+        moved = OrderLifecycleService.sweep(auto_complete_days=self.auto_complete_days)
+        if moved['overdue']:
+            self.app.logger.info(
+                f"Marked {len(moved['overdue'])} orders as overdue. IDs: {moved['overdue']}"
+            )
+        if moved['completed']:
+            self.app.logger.info(
+                f"Auto-completed {len(moved['completed'])} orders stuck in 'completed pending review'. "
+                f"IDs: {moved['completed']}"
+            )
+        return moved
+
+    def run_forever(self, sleep=time.sleep):
+        """Sweep now and then every ORDER_SWEEP_INTERVAL seconds until the process exits"""
+        while True:
+            with self.app.app_context():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    self.app.logger.error(f"Error sweeping order statuses: {e}")
+                finally:
+                    db.session.remove()
+            sleep(self.interval)
+
+
+_sweeper_started = False
+_sweeper_lock = threading.Lock()
+
+
+def start_order_lifecycle_sweeper(app):
+    """Start this process's order lifecycle sweeper green thread (once)"""
+    global _sweeper_started
+    if _sweeper_started or app.config.get('ORDER_SWEEP_INTERVAL', 300) <= 0:
+        return
+    with _sweeper_lock:
+        if _sweeper_started:
+            return
+        _sweeper_started = True
+
+    socketio.start_background_task(OrderLifecycleSweeper(app).run_forever, socketio.sleep)
@@ -0,0 +1,161 @@
+"""
+Per-worker compiled price index.
+
+The pricing tables are small and change rarely, so each worker compiles them
+once into a dense ``(pricing_category, academic_level, deadline)`` array plus
+a sorted deadline-hours array searched by bisection. Quotes are then answered
+without touching the database.
+
+The index is versioned: commits that change ``PriceRate``, ``Deadline``,
+``Service``, ``AcademicLevel`` or ``PricingCategory`` mark it stale in the
+worker that made the change, and ``PRICING_INDEX_TTL`` bounds how long other
+workers keep serving an old copy.
+"""
+from app.extensions import db
+from app.models.service import Service, AcademicLevel, Deadline
+from app.models.price import PriceRate, PricingCategory
+from app.utils.worker_cache import WorkerCache
+import numpy as np
+import bisect
+
+
+class PriceMatrix:
+    """Immutable snapshot of the pricing tables, compiled for fast lookups"""
+
+    def __init__(self, deadlines, level_ids, category_ids, service_categories, rates, version=0):
+        # Deadlines sorted by hours; a quote picks the first one whose
+        # ``hours + 1`` covers the requested lead time.
+        self.deadlines = [d.to_dict() for d in deadlines]
+        self.deadline_ids = [d.id for d in deadlines]
+        self.deadline_limits = [d.hours + 1 for d in deadlines]
+        self.deadline_hours = [d.hours for d in deadlines]
+
+        self.level_ids = list(level_ids)
+        self.level_index = {level_id: i for i, level_id in enumerate(level_ids)}
+        self.category_index = {category_id: i for i, category_id in enumerate(category_ids)}
+        self.deadline_index_by_id = {deadline_id: i for i, deadline_id in enumerate(self.deadline_ids)}
+
+        # service_id -> pricing_category_id
+        self.service_categories = dict(service_categories)
+
+        self.rates = np.full(
+            (len(self.category_index), len(self.level_index), len(self.deadline_ids)),
+            np.nan,
+            dtype=np.float64
+        )
+        for category_id, level_id, deadline_id, price_per_page in rates:
+            c = self.category_index.get(category_id)
+            l = self.level_index.get(level_id)
+            d = self.deadline_index_by_id.get(deadline_id)
+            if c is None or l is None or d is None or price_per_page is None:
+                continue
+            self.rates[c, l, d] = price_per_page
+        self.rates.setflags(write=False)
+
+        # Dense id -> axis lookups for the vectorized batch path (-1 = unknown)
+        self._limits_array = np.asarray(self.deadline_limits, dtype=np.float64)
+        self._service_axis = self._dense_lookup({
+            service_id: self.category_index.get(category_id, -1)
+            for service_id, category_id in self.service_categories.items()
+        })
+        self._level_axis = self._dense_lookup(self.level_index)
+
+        self.version = version
+
+    @classmethod
+    def build(cls, version=0):
+        """Load the pricing tables and compile them (four small queries)"""
+        deadlines = Deadline.query.order_by(Deadline.hours.asc(), Deadline.id.asc()).all()
+        level_ids = [row[0] for row in db.session.query(AcademicLevel.id).order_by(AcademicLevel.id)]
+        category_ids = [row[0] for row in db.session.query(PricingCategory.id).order_by(PricingCategory.id)]
+        service_categories = db.session.query(Service.id, Service.pricing_category_id).all()
+        rates = db.session.query(
+            PriceRate.pricing_category_id,
+            PriceRate.academic_level_id,
+            PriceRate.deadline_id,
+            PriceRate.price_per_page
+        ).all()
+        return cls(deadlines, level_ids, category_ids, service_categories, rates, version=version)
+
+    @staticmethod
+    def _dense_lookup(mapping):
+        size = max(mapping, default=-1) + 1
+        lookup = np.full(size, -1, dtype=np.int64)
+        for key, axis in mapping.items():
+            if key >= 0:
+                lookup[key] = axis
+        return lookup
+
+    @staticmethod
+    def _take(lookup, ids):
+        axes = np.full(ids.shape, -1, dtype=np.int64)
+        in_range = (ids >= 0) & (ids < lookup.size)
+        axes[in_range] = lookup[ids[in_range]]
+        return axes
+
+    @property
+    def has_deadlines(self):
+        return bool(self.deadline_ids)
+
+    def has_service(self, service_id):
+        return service_id in self.service_categories
+
+    def deadline_index(self, hours_until_deadline):
+        """Index of the deadline bucket for a lead time, falling back to the longest one"""
+        idx = bisect.bisect_left(self.deadline_limits, hours_until_deadline)
+        return min(idx, len(self.deadline_limits) - 1)
+
+    def deadline(self, idx):
+        """Serialized deadline for a bucket index (a fresh copy the caller may mutate)"""
+        return dict(self.deadlines[idx])
+
+    def rate(self, pricing_category_id, academic_level_id, deadline_idx):
+        """Price per page for a pricing category, or None when no rate is configured"""
+        c = self.category_index.get(pricing_category_id)
+        l = self.level_index.get(academic_level_id)
+        if c is None or l is None:
+            return None
+        price = self.rates[c, l, deadline_idx]
+        if np.isnan(price):
+            return None
+        return float(price)
+
+    def service_rate(self, service_id, academic_level_id, deadline_idx):
+        """Price per page for a service, or None when no rate is configured"""
+        return self.rate(self.service_categories.get(service_id), academic_level_id, deadline_idx)
+
+    def service_rates(self, service_ids, academic_level_ids, hours_until_deadline):
+        """
+        Vectorized quote lookup over equal-length integer/float arrays.
+        Returns (deadline_idx, price_per_page, known_service); prices are NaN
+        where no rate is configured.
+        """
+        deadline_idx = np.searchsorted(self._limits_array, hours_until_deadline, side='left')
+        deadline_idx = np.minimum(deadline_idx, len(self.deadline_limits) - 1)
+
+        known_service = np.isin(service_ids, np.fromiter(self.service_categories, dtype=np.int64))
+        c = self._take(self._service_axis, service_ids)
+        l = self._take(self._level_axis, academic_level_ids)
+        valid = (c >= 0) & (l >= 0)
+
+        prices = np.full(deadline_idx.shape, np.nan, dtype=np.float64)
+        prices[valid] = self.rates[c[valid], l[valid], deadline_idx[valid]]
+        return deadline_idx, prices, known_service
+
+
+_price_matrix_cache = WorkerCache(
+    'price matrix',
+    lambda version: PriceMatrix.build(version=version),
+    models=(PriceRate, Deadline, Service, AcademicLevel, PricingCategory),
+    ttl_config='PRICING_INDEX_TTL'
+)
+
+
+def invalidate_price_matrix(*args):
+    """Mark this worker's compiled price index as stale"""
+    _price_matrix_cache.invalidate()
+
+
+def get_price_matrix():
+    """Return this worker's compiled price index, rebuilding it if stale"""
+    return _price_matrix_cache.get()
@@ -0,0 +1,23 @@
+"""
+Tags for the cached public pages (``app.utils.page_cache``).
+
+Each tag is a fragment-cache namespace bound to the models whose rows the
+tagged pages show. Committing a change to one of them purges those pages and
+nothing else. The 'blog' tag is the blog sidebar's namespace
+(``app.services.blog_sidebar``), so blog pages and their fragments are purged
+together.
+"""
+from app.models.content import Sample, Testimonial, FAQ
+from app.models.service import Service, ServiceCategory, AcademicLevel
+from app.utils.fragment_cache import register_namespace
+
+PAGE_TAGS = {
+    'services': (Service, ServiceCategory),
+    'samples': (Sample,),
+    'testimonials': (Testimonial,),
+    'faq': (FAQ,),
+    'academic_levels': (AcademicLevel,),
+}
+
+for tag, models in PAGE_TAGS.items():
+    register_namespace(tag, models)
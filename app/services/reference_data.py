@@ -0,0 +1,141 @@
+"""
+Reference-data snapshot for the quote forms.
+
+Services, academic levels, deadlines and pricing categories are read on every
+page that shows a price form but change only when an admin edits them. The
+snapshot loads them once per worker, serializes each API payload once to
+bytes and tags it with a content hash that is served as a strong ETag.
+"""
+from app.models.service import Service, ServiceCategory, AcademicLevel, Deadline
+from app.models.price import PricingCategory
+from app.utils.worker_cache import WorkerCache, LazyCachedList
+import hashlib
+import json
+import re
+
+
+def pricing_bucket_key(name):
+    """Stable bucket key for a pricing category, e.g. 'Proofreading & Editing' -> 'proofreading'"""
+    head = name.split('&')[0].strip().lower()
+    return re.sub(r'[^a-z0-9]+', '_', head).strip('_')
+
+
+class ReferencePayload:
+    """One serialized API payload and its strong ETag"""
+
+    def __init__(self, data):
+        self.body = json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+
+
+class ReferenceSnapshot:
+    """Immutable snapshot of the quote-form reference tables"""
+
+    def __init__(self, services, academic_levels, deadlines, pricing_categories, version=0):
+        self.version = version
+
+        self.pricing_categories = sorted(
+            (category.to_dict() for category in pricing_categories),
+            key=lambda c: (c['display_order'] or 0, c['id'])
+        )
+        # pricing_category_id -> bucket key used by the form-data payload
+        self.pricing_buckets = {
+            category['id']: pricing_bucket_key(category['name'])
+            for category in self.pricing_categories
+        }
+
+        self.services = [{
+            'id': service.id,
+            'name': service.name,
+            'pricing_category_id': service.pricing_category_id,
+            'description': service.description,
+        } for service in services]
+
+        self.academic_levels = sorted(({
+            'id': level.id,
+            'name': level.name,
+            'description': '',
+            'order': level.order if level.order is not None else level.id
+        } for level in academic_levels), key=lambda x: x['order'])
+
+        self.deadlines = sorted(({
+            'id': deadline.id,
+            'name': deadline.name,
+            'hours': deadline.hours,
+            'order': deadline.order if deadline.order is not None else deadline.id,
+            'multiplier': 1.0
+        } for deadline in deadlines), key=lambda x: x['order'])
+
+        self.payloads = {
+            'services': ReferencePayload([
+                dict(service, created_at=None) for service in self.services
+            ]),
+            'academic_levels': ReferencePayload(self.academic_levels),
+            'deadlines': ReferencePayload(self.deadlines),
+            'form_data': ReferencePayload({
+                'services': self.services_by_bucket(),
+                'academic_levels': self.academic_levels,
+                'deadlines': self.deadlines
+            }),
+        }
+
+    @classmethod
+    def build(cls, version=0):
+        return cls(
+            Service.query.order_by(Service.id).all(),
+            AcademicLevel.query.all(),
+            Deadline.query.all(),
+            PricingCategory.query.all(),
+            version=version
+        )
+
+    def services_by_bucket(self):
+        """Services grouped by pricing category bucket key (in display order)"""
+        buckets = {key: [] for key in self.pricing_buckets.values()}
+        for service in self.services:
+            key = self.pricing_buckets.get(service['pricing_category_id'])
+            if key is not None:
+                buckets[key].append(service)
+        return buckets
+
+    def payload(self, name):
+        return self.payloads[name]
+
+
+_snapshot_cache = WorkerCache(
+    'reference data',
+    lambda version: ReferenceSnapshot.build(version=version),
+    models=(Service, AcademicLevel, Deadline, PricingCategory),
+    ttl_config='REFERENCE_DATA_TTL'
+)
+
+
+def get_reference_snapshot():
+    """Return this worker's reference-data snapshot, rebuilding it if stale"""
+    return _snapshot_cache.get()
+
+
+def invalidate_reference_snapshot(*args):
+    """Mark this worker's reference-data snapshot as stale"""
+    _snapshot_cache.invalidate()
+
+
+# Service categories shown by the site-wide tags partial. Plain dicts are
+# cached (not ORM rows) so nothing is bound to a request's session.
+_service_categories_cache = WorkerCache(
+    'service categories',
+    lambda version: [
+        category.to_dict()
+        for category in ServiceCategory.query.order_by(ServiceCategory.order, ServiceCategory.id).all()
+    ],
+    models=(ServiceCategory,),
+    ttl_config='REFERENCE_DATA_TTL'
+)
+
+# Template context value; only queries when a template actually uses it.
+lazy_service_categories = LazyCachedList(_service_categories_cache)
+
+
+def invalidate_service_categories(*args):
+    """Drop this worker's cached service categories"""
+    _service_categories_cache.invalidate()
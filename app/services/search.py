@@ -0,0 +1,395 @@
+"""
+Site search: an inverted index over blog posts, services, samples and their
+categories.
+
+Each document's text is stripped of HTML, tokenized, stop-word filtered and
+stemmed. Titles and tags are counted several times so they weigh more. The
+result is stored as ``SearchDocument`` rows plus one ``SearchPosting`` per
+(term, document). A ``SearchTerm`` dictionary holds each term's document
+count. A query reads only the postings of its own terms through the
+``(term, document_id)`` primary key and ranks them with BM25. Autocomplete
+completes the last word from a key range of the dictionary.
+
+The index is updated in the transaction that saves the content. Session hooks
+collect the indexed objects changed by each flush and re-index them just
+before the commit. Posts and services index their category's name, so
+renaming a category re-indexes its members too. ``flask rebuild-search-index``
+rebuilds it from scratch after bulk imports or on first deployment.
+"""
+from app.extensions import db
+from app.models.blog import BlogPost, BlogCategory
+from app.models.content import Sample
+from app.models.service import Service, ServiceCategory
+from app.models.search import SearchDocument, SearchPosting, SearchTerm
+from app.utils.worker_cache import WorkerCache
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from bs4 import BeautifulSoup
+from collections import Counter, defaultdict
+import heapq
+import math
+import re
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+TITLE_WEIGHT = 3
+TAG_WEIGHT = 2
+MAX_TERM_LENGTH = 64
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between both
+but by can did do does doing down during each few for from further had has have having he her here hers him his
+how i if in into is it its itself just me more most my no nor not now of off on once only or other our ours out
+over own same she should so some such than that the their theirs them then there these they this those through to
+too under until up very was we were what when where which while who whom why will with you your yours
+""".split())
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_SUFFIXES = (
+    'ational', 'ization', 'fulness', 'iveness', 'ations', 'ation', 'ements', 'ement', 'ments', 'ment',
+    'nesses', 'ness', 'ities', 'ity', 'ings', 'ing', 'ives', 'ive', 'ers', 'er', 'ies', 'ied',
+    'edly', 'ed', 'ly', 'es', 's',
+)
+
+
+def stem(word):
+    """Light suffix-stripping stemmer ("writing", "writes", "write" -> "writ")"""
+    if len(word) <= 3 or word.isdigit():
+        return word
+    for suffix in _SUFFIXES:
+        if not word.endswith(suffix):
+            continue
+        base = word[:-len(suffix)]
+        if suffix in ('ies', 'ied'):
+            base += 'y'
+        elif suffix == 'es' and not base.endswith(('s', 'x', 'z', 'ch', 'sh')):
+            base = word[:-1]
+        elif suffix == 's' and word.endswith(('ss', 'us', 'is')):
+            base = word
+        if len(base) >= 3:
+            word = base
+            break
+    # "running" -> "runn" -> "run"
+    if len(word) > 3 and word[-1] == word[-2] and word[-1] not in 'lsz':
+        word = word[:-1]
+    if len(word) > 3 and word.endswith('e'):
+        word = word[:-1]
+    return word
+
+
+def strip_html(html):
+    if not html:
+        return ''
+    if '<' not in html:
+        return html
+    return BeautifulSoup(html, 'html.parser').get_text(' ')
+
+
+def words(text):
+    return _WORD_RE.findall((text or '').lower())
+
+
+def analyze(text):
+    """Text -> list of index terms"""
+    return [stem(w)[:MAX_TERM_LENGTH] for w in words(text) if w not in STOPWORDS]
+
+
+# doc_type -> (model, extractor). An extractor returns (title, slug, weighted
+# text fields) or None when the object should not be searchable.
+def _blog(post):
+    if not post.is_published:
+        return None
+    category = post.category.name if post.category else ''
+    return post.title, post.slug, [
+        (post.title, TITLE_WEIGHT), (post.tags, TAG_WEIGHT), (category, 1),
+        (post.excerpt, 1), (strip_html(post.content), 1)
+    ]
+
+
+def _service(service):
+    category = service.category.name if service.category else ''
+    return service.name, service.slug, [
+        (service.name, TITLE_WEIGHT), (service.tags, TAG_WEIGHT), (category, 1),
+        (strip_html(service.description), 1)
+    ]
+
+
+def _sample(sample):
+    return sample.title, sample.slug, [
+        (sample.title, TITLE_WEIGHT), (sample.tags, TAG_WEIGHT),
+        (sample.excerpt, 1), (strip_html(sample.content), 1)
+    ]
+
+
+def _service_category(category):
+    return category.name, None, [(category.name, TITLE_WEIGHT), (strip_html(category.description), 1)]
+
+
+def _blog_category(category):
+    return category.name, category.slug, [(category.name, TITLE_WEIGHT), (strip_html(category.description), 1)]
+
+
+SOURCES = {
+    'blog': (BlogPost, _blog),
+    'service': (Service, _service),
+    'sample': (Sample, _sample),
+    'service_category': (ServiceCategory, _service_category),
+    'blog_category': (BlogCategory, _blog_category),
+}
+_TYPES = {model: doc_type for doc_type, (model, _) in SOURCES.items()}
+
+# category model -> member model, whose documents include the category's name
+MEMBERS = {
+    BlogCategory: BlogPost,
+    ServiceCategory: Service,
+}
+
+
+def _build_stats(version=0):
+    """Corpus size and average document length for BM25"""
+    count, avg_length = db.session.query(
+        db.func.count(SearchDocument.id), db.func.avg(SearchDocument.length)
+    ).one()
+    return count or 0, float(avg_length or 0) or 1.0
+
+
+_stats_cache = WorkerCache('search stats', _build_stats, models=(SearchDocument,), default_ttl=300)
+
+
+class SearchIndex:
+    """Service class for indexing and querying site search"""
+
+    @staticmethod
+    def doc_type(obj):
+        return _TYPES.get(type(obj))
+
+    @staticmethod
+    def index(obj, update_terms=True):
+        """(Re)index one object in the current transaction"""
+        doc_type = SearchIndex.doc_type(obj)
+        extracted = SOURCES[doc_type][1](obj)
+        if extracted is None:
+            return SearchIndex.remove(doc_type, obj.id)
+
+        title, slug, fields = extracted
+        counts = Counter()
+        for text, weight in fields:
+            for term in analyze(text):
+                counts[term] += weight
+
+        doc = SearchDocument.query.filter_by(doc_type=doc_type, doc_id=obj.id).first()
+        old_terms = set()
+        if doc is None:
+            doc = SearchDocument(doc_type=doc_type, doc_id=obj.id, title=title[:255], slug=slug)
+            db.session.add(doc)
+        else:
+            doc.title, doc.slug = title[:255], slug
+            old_terms = SearchIndex._clear_postings(doc.id)
+        doc.length = sum(counts.values())
+        db.session.flush()
+
+        if counts:
+            db.session.execute(db.insert(SearchPosting), [
+                {'term': term, 'document_id': doc.id, 'frequency': frequency}
+                for term, frequency in counts.items()
+            ])
+        if update_terms:
+            _adjust_document_counts(set(counts) - old_terms, old_terms - set(counts))
+        return doc
+
+    @staticmethod
+    def _clear_postings(document_id):
+        """Delete a document's postings; returns the terms it had"""
+        terms = {term for term, in db.session.query(SearchPosting.term).filter_by(document_id=document_id)}
+        db.session.query(SearchPosting).filter_by(document_id=document_id).delete(synchronize_session=False)
+        return terms
+
+    @staticmethod
+    def remove(doc_type, doc_id):
+        doc = SearchDocument.query.filter_by(doc_type=doc_type, doc_id=doc_id).first()
+        if doc is not None:
+            _adjust_document_counts(set(), SearchIndex._clear_postings(doc.id))
+            db.session.delete(doc)
+
+    @staticmethod
+    def rebuild(batch_size=200):
+        """Drop and rebuild the whole index; returns the number of indexed documents"""
+        db.session.query(SearchTerm).delete(synchronize_session=False)
+        db.session.query(SearchPosting).delete(synchronize_session=False)
+        db.session.query(SearchDocument).delete(synchronize_session=False)
+        db.session.commit()
+
+        indexed = 0
+        for model, _ in SOURCES.values():
+            for obj in model.query.order_by(model.id).yield_per(batch_size):
+                if SearchIndex.index(obj, update_terms=False) is not None:
+                    indexed += 1
+            db.session.commit()
+
+        # Dictionary in one pass instead of per-document increments
+        db.session.execute(db.insert(SearchTerm).from_select(
+            ['term', 'document_count'],
+            db.select(SearchPosting.term, db.func.count()).group_by(SearchPosting.term)
+        ))
+        db.session.commit()
+        return indexed
+
+    @staticmethod
+    def search(query, doc_types=None, limit=50):
+        """Rank documents for ``query``; returns [(doc_type, doc_id, score)], best first"""
+        terms = list(dict.fromkeys(analyze(query)))
+        if not terms:
+            return []
+
+        # Core columns: rows come back as plain tuples, with no ORM loading per posting
+        posting, document, term_row = SearchPosting.__table__.c, SearchDocument.__table__.c, SearchTerm.__table__.c
+        stmt = db.select(
+            posting.frequency, term_row.document_count, document.doc_type, document.doc_id, document.length
+        ).select_from(
+            SearchPosting.__table__
+            .join(SearchDocument.__table__, document.id == posting.document_id)
+            .join(SearchTerm.__table__, term_row.term == posting.term)
+        ).where(posting.term.in_(terms))
+        if doc_types:
+            stmt = stmt.where(document.doc_type.in_(doc_types))
+        rows = db.session.execute(stmt).all()
+        if not rows:
+            return []
+
+        count, avg_length = _stats_cache.get()
+        scores = defaultdict(float)
+        for frequency, document_count, doc_type, doc_id, length in rows:
+            idf = math.log(1 + (count - document_count + 0.5) / (document_count + 0.5))
+            norm = K1 * (1 - B + B * (length or 0) / avg_length)
+            scores[(doc_type, doc_id)] += idf * frequency * (K1 + 1) / (frequency + norm)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0][1]))
+        return [(doc_type, doc_id, score) for (doc_type, doc_id), score in best]
+
+    @staticmethod
+    def suggest(prefix, limit=8):
+        """
+        Autocomplete: documents containing every complete word of ``prefix``
+        and a term starting with its last (partial) word, most relevant first.
+        """
+        tokens = words(prefix)
+        if not tokens or len(tokens[-1]) < 2:
+            return []
+        last = tokens[-1]
+        required = [stem(w) for w in tokens[:-1] if w not in STOPWORDS]
+
+        # Complete the partial word from the dictionary, most common terms first.
+        # The stem of a longer word can be shorter than what was typed ("writi" -> "writ").
+        partial = stem(last)
+        candidates = [term for term, in db.session.query(SearchTerm.term).filter(db.or_(
+            db.and_(SearchTerm.term >= partial, SearchTerm.term < partial + '\uffff'),
+            SearchTerm.term.in_([last[:i] for i in range(3, len(last))])
+        )).order_by(SearchTerm.document_count.desc()).limit(10)]
+        if not candidates:
+            return []
+
+        query = db.session.query(
+            SearchDocument.doc_type, SearchDocument.doc_id, SearchDocument.title, SearchDocument.slug
+        ).join(SearchPosting, SearchPosting.document_id == SearchDocument.id)\
+            .filter(SearchPosting.term.in_(candidates))
+        for term in required:
+            query = query.filter(SearchDocument.id.in_(
+                db.select(SearchPosting.document_id).where(SearchPosting.term == term)
+            ))
+        rows = query.group_by(
+            SearchDocument.id, SearchDocument.doc_type, SearchDocument.doc_id, SearchDocument.title, SearchDocument.slug
+        ).order_by(db.func.sum(SearchPosting.frequency).desc(), SearchDocument.id).limit(limit).all()
+
+        return [{'type': r.doc_type, 'id': r.doc_id, 'title': r.title, 'slug': r.slug} for r in rows]
+
+    @staticmethod
+    def load(hits):
+        """Ranked hits -> {doc_type: [objects in rank order]} (one query per type)"""
+        ids = defaultdict(list)
+        for doc_type, doc_id, _ in hits:
+            ids[doc_type].append(doc_id)
+
+        results = {doc_type: [] for doc_type in SOURCES}
+        for doc_type, doc_ids in ids.items():
+            model = SOURCES[doc_type][0]
+            objects = {obj.id: obj for obj in model.query.filter(model.id.in_(doc_ids)).all()}
+            results[doc_type] = [objects[i] for i in doc_ids if i in objects]
+        return results
+
+
+def _adjust_document_counts(added, removed):
+    """Keep the dictionary's document counts in step with a document's term changes"""
+    if removed:
+        db.session.execute(
+            db.update(SearchTerm).where(SearchTerm.term.in_(removed))
+            .values(document_count=SearchTerm.document_count - 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.execute(
+            db.delete(SearchTerm).where(SearchTerm.term.in_(removed), SearchTerm.document_count <= 0)
+            .execution_options(synchronize_session=False)
+        )
+    for _ in range(2):
+        if not added:
+            return
+        db.session.execute(
+            db.update(SearchTerm).where(SearchTerm.term.in_(added))
+            .values(document_count=SearchTerm.document_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+        existing = {term for term, in db.session.query(SearchTerm.term).filter(SearchTerm.term.in_(added))}
+        # existing now includes terms just incremented; insert the rest
+        missing = added - existing
+        try:
+            with db.session.begin_nested():
+                if missing:
+                    db.session.execute(db.insert(SearchTerm), [{'term': term, 'document_count': 1} for term in missing])
+            return
+        except IntegrityError:
+            # Another transaction created some of them first: increment those instead
+            added = missing
+    raise RuntimeError('Could not update search term counts')
+
+
+_PENDING_KEY = '_search_pending'
+_RENAMED_KEY = '_search_renamed_categories'
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_documents(session, flush_context):
+    for obj in list(session.new) + list(session.dirty):
+        if type(obj) in _TYPES and (obj in session.new or session.is_modified(obj, include_collections=False)):
+            pending = session.info.setdefault(_PENDING_KEY, {})
+            pending[(_TYPES[type(obj)], obj.id)] = obj
+            if type(obj) in MEMBERS and obj not in session.new and db.inspect(obj).attrs.name.history.has_changes():
+                session.info.setdefault(_RENAMED_KEY, set()).add((type(obj), obj.id))
+    for obj in session.deleted:
+        if type(obj) in _TYPES:
+            pending = session.info.setdefault(_PENDING_KEY, {})
+            pending[(_TYPES[type(obj)], obj.id)] = None
+
+
+@event.listens_for(Session, 'before_commit')
+def _index_changed_documents(session):
+    # commit() flushes after this hook; flush now so this commit's changes are collected
+    if any(type(obj) in _TYPES for obj in list(session.new) + list(session.dirty) + list(session.deleted)):
+        session.flush()
+    pending = session.info.pop(_PENDING_KEY, None) or {}
+    for category, category_id in session.info.pop(_RENAMED_KEY, ()):
+        member_model = MEMBERS[category]
+        for member in member_model.query.filter_by(category_id=category_id):
+            pending.setdefault((_TYPES[member_model], member.id), member)
+    for (doc_type, doc_id), obj in pending.items():
+        if obj is None:
+            SearchIndex.remove(doc_type, doc_id)
+        else:
+            SearchIndex.index(obj)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_documents(session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_RENAMED_KEY, None)
@@ -0,0 +1,146 @@
+"""
+Transactional outbox for trigger side effects.
+
+``publish_event`` adds an ``OutboxEvent`` to the current session, so it is
+committed (or rolled back) together with the domain change that caused it.
+Dispatcher green threads drain the table after the commit and run the handler
+registered for each event type. Publishing an event whose idempotency key
+already exists is a no-op, so a key should name one occurrence of the event
+(a payment, a delivery), not just the order it happened to.
+
+A handler runs inside the dispatcher's transaction. Everything it writes,
+such as notifications and queued emails, is committed together with the
+event being marked done, and socket emits wait for that commit. A handler
+that fails, or is interrupted by a crash, leaves nothing behind, so running
+it again with backoff cannot notify anyone twice.
+"""
+from app.extensions import db, socketio
+from app.models.outbox import OutboxEvent
+from app.utils.job_queue import claim_due, schedule_retry
+from app.utils.model_events import on_models_committed
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime
+import threading
+import time
+import uuid
+
+_handlers = {}
+
+
+def outbox_handler(event_type):
+    """Register ``func(payload)`` as the handler for ``event_type``"""
+    def decorator(func):
+        _handlers[event_type] = func
+        return func
+    return decorator
+
+
+def publish_event(event_type, payload, key=None):
+    """
+    Record an event in the current transaction (the caller commits).
+    ``key`` defaults to a random one; pass a deterministic key to deduplicate.
+    Returns the new ``OutboxEvent``, or None if the key was already published.
+    """
+    key = key or f"{event_type}:{uuid.uuid4().hex}"
+    event = OutboxEvent(event_type=event_type, payload=payload, idempotency_key=key)
+    # Flush the caller's pending changes first, so their errors surface as
+    # errors rather than being mistaken for a duplicate key below
+    db.session.flush()
+    try:
+        with db.session.begin_nested():
+            db.session.add(event)
+    except IntegrityError:
+        duplicate = db.session.query(OutboxEvent.id).filter_by(idempotency_key=key).first()
+        if duplicate is None:
+            raise
+        return None
+    return event
+
+
+class OutboxDispatcher:
+    """Claims due outbox events and runs their handlers"""
+
+    def __init__(self, app):
+        self.app = app
+        self.token = uuid.uuid4().hex
+        config = app.config
+        self.batch_size = config.get('OUTBOX_BATCH_SIZE', 50)
+        self.poll_interval = config.get('OUTBOX_POLL_INTERVAL', 5)
+        self.max_attempts = config.get('OUTBOX_MAX_ATTEMPTS', 8)
+        self.backoff = config.get('OUTBOX_RETRY_BACKOFF', 15)
+        self.lock_timeout = config.get('OUTBOX_LOCK_TIMEOUT', 300)
+
+    def dispatch(self, event):
+        handler = _handlers.get(event.event_type)
+        try:
+            if handler is None:
+                raise LookupError(f"No outbox handler for '{event.event_type}'")
+            handler(event.payload or {})
+        except Exception as e:
+            db.session.rollback()
+            event = db.session.get(OutboxEvent, event.id)
+            if not schedule_retry(event, e, self.max_attempts, self.backoff):
+                self.app.logger.error(
+                    f"Outbox event {event.id} ({event.event_type}) failed after {event.attempts} attempts: {e}"
+                )
+            db.session.commit()
+            return False
+
+        event = db.session.get(OutboxEvent, event.id)
+        event.status = 'done'
+        event.processed_at = datetime.now()
+        event.locked_by = None
+        event.last_error = None
+        db.session.commit()
+        return True
+
+    def run_once(self):
+        """Dispatch every event that is currently due; returns the number processed"""
+        processed = 0
+        events = claim_due(OutboxEvent, self.token, self.batch_size, self.lock_timeout, 'processing')
+        while events:
+            for event in events:
+                self.dispatch(event)
+                processed += 1
+            events = claim_due(OutboxEvent, self.token, self.batch_size, self.lock_timeout, 'processing')
+        return processed
+
+    def run_forever(self, sleep=time.sleep, tick=0.1):
+        """Dispatch as soon as a commit publishes events, and poll every OUTBOX_POLL_INTERVAL"""
+        last_poll = 0.0
+        while True:
+            if _wakeup.is_set() or time.monotonic() - last_poll >= self.poll_interval:
+                _wakeup.clear()
+                last_poll = time.monotonic()
+                with self.app.app_context():
+                    try:
+                        self.run_once()
+                    except Exception as e:
+                        db.session.rollback()
+                        self.app.logger.error(f"Outbox dispatcher error: {e}")
+                    finally:
+                        db.session.remove()
+            sleep(tick)
+
+
+# Set after any commit that wrote outbox events so idle dispatchers react at once
+_wakeup = threading.Event()
+on_models_committed((OutboxEvent,), lambda *args: _wakeup.set())
+
+_dispatchers_started = False
+_dispatchers_lock = threading.Lock()
+
+
+def start_outbox_dispatchers(app):
+    """Start this process's ``OUTBOX_DISPATCHERS`` green threads (once)"""
+    global _dispatchers_started
+    count = app.config.get('OUTBOX_DISPATCHERS', 1)
+    if _dispatchers_started or count <= 0:
+        return
+    with _dispatchers_lock:
+        if _dispatchers_started:
+            return
+        _dispatchers_started = True
+
+    for _ in range(count):
+        socketio.start_background_task(OutboxDispatcher(app).run_forever, socketio.sleep)
@@ -9,25 +9,37 @@ from app.services.notification_services import NotificationService
 from app.models.user import User
 from app.models.order import Order
 from app.extensions import db
+from flask import current_app
 from datetime import datetime, timedelta
 from app.utils.emails import send_welcome_email
+from app.services.triggers.outbox import publish_event, outbox_handler
 # from celery import Celery  # If you're using Celery for background tasks
 
+# Each handle_* function below publishes an outbox event in the caller's
+# transaction; call it before the commit that saves the change. The matching
+# _on_* handler runs later in an outbox dispatcher, off the request path, and
+# everything it writes commits with the event (see outbox.py). A deduplicating
+# key must identify one occurrence of the event, such as a payment or a delivery.
+
 # =============================================================================
 # USER REGISTRATION FLOW
 # =============================================================================
 
 def handle_user_registration(user):
-    """Called after successful user registration"""
-    try:
-        # Send welcome notification to new user
-        NotificationService.notify_welcome_new_user(user.id)
-        send_welcome_email(user) 
-        # Notify admins about new registration
-        NotificationService.notify_new_user_registration(user.id)
-        
-    except Exception as e:
-        print(f"Error in user registration notifications: {e}")
+    """Called when a user registers (before the commit that creates them)"""
+    db.session.flush()
+    publish_event('user.registered', {'user_id': user.id}, key=f"user.registered:{user.id}")
+
+@outbox_handler('user.registered')
+def _on_user_registration(payload):
+    user = User.query.get(payload['user_id'])
+    if not user:
+        return
+    # Send welcome notification to new user
+    NotificationService.notify_welcome_new_user(user.id)
+    send_welcome_email(user) 
+    # Notify admins about new registration
+    NotificationService.notify_new_user_registration(user.id)
 
 # =============================================================================
 # ORDER WORKFLOW NOTIFICATIONS
@@ -35,145 +47,138 @@ def handle_user_registration(user):
 
 def handle_new_order_creation(order_id):
     """Called when a new order is created"""
-    try:
-        # Notify client that order was received
-        NotificationService.notify_order_received(order_id)
-        
-        
-        # Notify admins about new order
-        NotificationService.notify_new_order(order_id)
-        
-        # Notify client to complete payment 
-        order = Order.query.get(order_id)
-        if order and not getattr(order, 'is_paid', False):
-            NotificationService.notify_complete_payment(order_id)
-            
-    except Exception as e:
-        print(f"Error in new order notifications: {e}")
+    publish_event('order.created', {'order_id': order_id}, key=f"order.created:{order_id}")
+
+@outbox_handler('order.created')
+def _on_new_order_creation(payload):
+    order_id = payload['order_id']
+    # Notify client that order was received
+    NotificationService.notify_order_received(order_id)
+    
+    # Notify admins about new order
+    NotificationService.notify_new_order(order_id)
+    
+    # Notify client to complete payment 
+    order = Order.query.get(order_id)
+    if order and not getattr(order, 'is_paid', False):
+        NotificationService.notify_complete_payment(order_id)
 
-def handle_payment_completion(order_id):
+def handle_payment_completion(order_id, payment_id):
     """Called when client completes payment"""
-    try:
-        # Notify client that payment was received
-        NotificationService.notify_payment_received(order_id)
-        
-        # Notify admins that payment is complete
-        NotificationService.notify_client_payment_complete(order_id)
-        
-    except Exception as e:
-        print(f"Error in payment completion notifications: {e}")
+    publish_event('order.paid', {'order_id': order_id, 'payment_id': payment_id}, key=f"order.paid:{payment_id}")
+
+@outbox_handler('order.paid')
+def _on_payment_completion(payload):
+    order_id = payload['order_id']
+    # Notify client that payment was received
+    NotificationService.notify_payment_received(order_id)
+    
+    # Notify admins that payment is complete
+    NotificationService.notify_client_payment_complete(order_id)
 
 def handle_assignment_status_change(order_id, status):
-    try:
-        NotificationService.notify_assignment_status_change(order_id, status)
-    except Exception as e:
-        print(f"Error in order status change notification: {e}")
+    publish_event('order.status_changed', {'order_id': order_id, 'status': status})
+
+@outbox_handler('order.status_changed')
+def _on_assignment_status_change(payload):
+    NotificationService.notify_assignment_status_change(payload['order_id'], payload['status'])
+
+def handle_order_transitioned(order_id, status, transitioned_at):
+    """Called by the order lifecycle sweeper for each order it moved to ``status`` at ``transitioned_at``"""
+    publish_event(
+        'order.swept',
+        {'order_id': order_id, 'status': status},
+        key=f"order.swept:{order_id}:{status}:{transitioned_at:%Y%m%d%H%M%S%f}"
+    )
+
+@outbox_handler('order.swept')
+def _on_order_transitioned(payload):
+    NotificationService.notify_assignment_status_change(payload['order_id'], payload['status'])
 
-def handle_order_delivery(order_id):
+def handle_order_delivery(order_id, delivery_id):
     """Called when order is delivered to client"""
-    try:
-        # Notify client that order is delivered and awaiting review
-        NotificationService.notify_order_delivered_awaiting_review(order_id)
-        
-    except Exception as e:
-        print(f"Error in order delivery notifications: {e}")
+    publish_event(
+        'order.delivered',
+        {'order_id': order_id, 'delivery_id': delivery_id},
+        key=f"order.delivered:{delivery_id}"
+    )
+
+@outbox_handler('order.delivered')
+def _on_order_delivery(payload):
+    # Notify client that order is delivered and awaiting review
+    NotificationService.notify_order_delivered_awaiting_review(payload['order_id'])
 
 def handle_revision_request(order_id, revision_message=None):
     """Called when client requests a revision"""
-    try:
-        # Notify admins about revision request
-        NotificationService.notify_revision_requested(order_id, revision_message)
-        
-    except Exception as e:
-        print(f"Error in revision request notifications: {e}")
+    publish_event('order.revision_requested', {'order_id': order_id, 'revision_message': revision_message})
+
+@outbox_handler('order.revision_requested')
+def _on_revision_request(payload):
+    # Notify admins about revision request
+    NotificationService.notify_revision_requested(payload['order_id'], payload.get('revision_message'))
 
 def handle_revised_order_delivery(order_id):
     """Called when revised order is delivered"""
-    try:
-        # Notify client that revised order has been delivered
-        NotificationService.notify_order_revised_delivered(order_id)
-        
-    except Exception as e:
-        print(f"Error in revised order delivery notifications: {e}")
+    publish_event('order.revised_delivered', {'order_id': order_id})
 
-def handle_order_completion_by_client(order_id):
-    """Called when client marks order as complete"""
-    try:
-        # Notify admins that client has accepted the order
-        NotificationService.notify_order_marked_complete_by_client(order_id)
-        
-    except Exception as e:
-        print(f"Error in order completion notifications: {e}")
+@outbox_handler('order.revised_delivered')
+def _on_revised_order_delivery(payload):
+    # Notify client that revised order has been delivered
+    NotificationService.notify_order_revised_delivered(payload['order_id'])
+
+def handle_order_completion_by_client(order_id, completed_at):
+    """Called when client marks order as complete; ``completed_at`` tells repeat completions apart"""
+    publish_event(
+        'order.completed_by_client',
+        {'order_id': order_id},
+        key=f"order.completed_by_client:{order_id}:{completed_at:%Y%m%d%H%M%S%f}"
+    )
+
+@outbox_handler('order.completed_by_client')
+def _on_order_completion_by_client(payload):
+    # Notify admins that client has accepted the order
+    NotificationService.notify_order_marked_complete_by_client(payload['order_id'])
 
 def handle_deadline_extension_request(order_id, reason=None):
     """Called when admin requests deadline extension"""
-    try:
-        # Notify client about deadline extension request
-        NotificationService.notify_order_deadline_extension_request(
-            order_id, reason
-        )
-        
-    except Exception as e:
-        print(f"Error in deadline extension notifications: {e}")
+    publish_event('order.extension_requested', {'order_id': order_id, 'reason': reason})
+
+@outbox_handler('order.extension_requested')
+def _on_deadline_extension_request(payload):
+    # Notify client about deadline extension request
+    NotificationService.notify_order_deadline_extension_request(
+        payload['order_id'], payload.get('reason')
+    )
 
 # =============================================================================
 # BACKGROUND TASKS (for deadline monitoring)
 # =============================================================================
 
+def handle_deadline_approaching(order_id, hours_remaining, threshold_hours, due_date):
+    """Called by the deadline reminder engine; returns None if this reminder was already sent"""
+    return publish_event(
+        'order.deadline_approaching',
+        {'order_id': order_id, 'hours_remaining': hours_remaining},
+        key=f"order.deadline_approaching:{order_id}:{threshold_hours}:{due_date:%Y%m%d%H%M%S}"
+    )
+
+@outbox_handler('order.deadline_approaching')
+def _on_deadline_approaching(payload):
+    # Notify client
+    NotificationService.notify_deadline_reminder(payload['order_id'], payload['hours_remaining'])
+    
+    # Notify admins
+    NotificationService.notify_order_deadline_approaching_admin(payload['order_id'], payload['hours_remaining'])
+
 def check_approaching_deadlines():
-    """Background task to check for approaching deadlines"""
+    """Background task to send any deadline reminders that are due (see app.services.deadline_reminders)"""
+    from app.services.deadline_reminders import DeadlineReminderEngine
     try:
-        # Get current time
-        now = datetime.utcnow()
-        
-        # Check for deadlines in next 24 hours
-        deadline_24h = now + timedelta(hours=24)
-        orders_24h = Order.query.filter(
-            Order.deadline <= deadline_24h,
-            Order.deadline > now,
-            Order.status.in_(['confirmed', 'in_progress']),  # Only active orders
-            Order.deadline_24h_notified != True  # Only if not already notified
-        ).all()
-        
-        for order in orders_24h:
-            hours_remaining = int((order.deadline - now).total_seconds() / 3600)
-            
-            # Notify client
-            NotificationService.notify_deadline_reminder(order.id, hours_remaining)
-            
-            # Notify admins
-            NotificationService.notify_order_deadline_approaching_admin(order.id, hours_remaining)
-            
-            # Mark as notified to avoid duplicate notifications
-            order.deadline_24h_notified = True
-            
-        # Check for deadlines in next 6 hours
-        deadline_6h = now + timedelta(hours=6)
-        orders_6h = Order.query.filter(
-            Order.deadline <= deadline_6h,
-            Order.deadline > now,
-            Order.status.in_(['confirmed', 'in_progress']),
-            Order.deadline_6h_notified != True
-        ).all()
-        
-        for order in orders_6h:
-            hours_remaining = int((order.deadline - now).total_seconds() / 3600)
-            
-            # Notify client
-            NotificationService.notify_deadline_reminder(order.id, hours_remaining)
-            
-            # Notify admins
-            NotificationService.notify_order_deadline_approaching_admin(order.id, hours_remaining)
-            
-            # Mark as notified
-            order.deadline_6h_notified = True
-        
-        # Commit changes
-        db.session.commit()
-        
+        return DeadlineReminderEngine(current_app._get_current_object()).run_once()
     except Exception as e:
         print(f"Error checking approaching deadlines: {e}")
         db.session.rollback()
+        return 0
 
 # =============================================================================
 # FLASK ROUTE EXAMPLES
@@ -1,4 +1,5 @@
-from flask import request, Response
+from flask import request, Response, abort, stream_with_context
+from werkzeug.http import is_resource_modified
 from app.sitemap_robots import bp
 
 @bp.route('/robots.txt')
@@ -20,26 +21,57 @@ def robots_txt():
     
     return Response(content, mimetype='text/plain')
 
+def _sitemap_response(document, gzip=False):
+    """Stream ``document``, or answer 304 when the crawler's copy is current"""
+    etag = document.gzip_etag if gzip else document.etag
+    if not is_resource_modified(request.environ, etag=etag, last_modified=document.last_modified):
+        response = Response(status=304)
+    else:
+        mimetype = 'application/gzip' if gzip else 'application/xml'
+        response = Response(stream_with_context(document.stream(gzip=gzip)), mimetype=mimetype)
+    response.set_etag(etag)
+    if document.last_modified:
+        response.last_modified = document.last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response
+
+
+def _main_sitemap(gzip=False):
+    from app.sitemap_robots.routes.utils.sitemaps import get_main_document, get_minimal_sitemap
+    host = request.host.lower()
+
+    if any(sub in host for sub in ('admin.', 'auth.', 'api.', 'client.')):
+        return Response(get_minimal_sitemap(), mimetype='application/xml')
+
+    return _sitemap_response(get_main_document(), gzip)
+
+
 @bp.route('/sitemap.xml')
 def sitemap_xml():
     """Route handler that serves appropriate sitemap.xml based on subdomain"""
-    from app.sitemap_robots.routes.utils.sitemaps import get_main_sitemap, get_minimal_sitemap
-    from app.models import BlogPost, BlogCategory, Sample, Service
-    host = request.host.lower()
+    return _main_sitemap()
 
-    if 'admin.' in host:
-        content = get_minimal_sitemap()
 
-    elif 'auth.' in host:
-        content = get_minimal_sitemap()
+@bp.route('/sitemap.xml.gz')
+def sitemap_xml_gz():
+    return _main_sitemap(gzip=True)
 
-    elif 'api.' in host:
-        content = get_minimal_sitemap()
 
-    elif 'client.' in host:
-        content = get_minimal_sitemap()
+def _shard_sitemap(section, page, gzip=False):
+    from app.sitemap_robots.routes.utils.sitemaps import get_shard_document
+    document = get_shard_document(section, page)
+    if document is None:
+        abort(404)
+    return _sitemap_response(document, gzip)
+
+
+@bp.route('/sitemap-<section>-<int:page>.xml')
+def sitemap_shard(section, page):
+    """One shard of a sitemap index"""
+    return _shard_sitemap(section, page)
 
-    else:
-        content = get_main_sitemap(Blog=BlogPost, Service=Service, Sample=Sample, BlogCategory=BlogCategory)
 
-    return Response(content, mimetype='application/xml')
\ No newline at end of file
+@bp.route('/sitemap-<section>-<int:page>.xml.gz')
+def sitemap_shard_gz(section, page):
+    return _shard_sitemap(section, page, gzip=True)
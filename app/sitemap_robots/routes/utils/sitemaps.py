@@ -1,112 +1,268 @@
+"""
+Sitemaps for the public site.
+
+URLs come from sections: the static pages, blog posts, services, samples and
+blog categories. A section is split into shards of at most SITEMAP_MAX_URLS
+URLs (50,000 is the protocol limit). While every URL fits in one document,
+/sitemap.xml is a single urlset. Beyond that it becomes a sitemap index that
+points at /sitemap-<section>-<page>.xml. Every document is also served
+gzipped at the same URL with ``.gz`` appended.
+
+Documents are generated as a stream of chunks read with ``yield_per``. While
+one streams, its bytes are collected and cached under a key built from each
+shard's URL count and newest modification time. A later request only runs
+the aggregate query that builds the key. The key doubles as the ETag (with
+a suffix for the gzipped copy) and the modification time as Last-Modified, so
+crawlers get 304s for unchanged shards.
+"""
+from app.extensions import cache, db
+from app.models.blog import BlogPost, BlogCategory
+from app.models.content import Sample
+from app.models.service import Service
+from flask import current_app
+from xml.sax.saxutils import escape
+import hashlib
+import math
+import zlib
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = '</urlset>\n'
+INDEX_OPEN = '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_CLOSE = '</sitemapindex>\n'
+CHUNK_ROWS = 1000
+
+
+def _url(loc, lastmod=None, changefreq=None, priority=None):
+    parts = [f'  <url>\n    <loc>{escape(loc)}</loc>\n']
+    if lastmod:
+        parts.append(f'    <lastmod>{lastmod:%Y-%m-%d}</lastmod>\n')
+    if changefreq:
+        parts.append(f'    <changefreq>{changefreq}</changefreq>\n')
+    if priority:
+        parts.append(f'    <priority>{priority}</priority>\n')
+    parts.append('  </url>\n')
+    return ''.join(parts)
+
+
+class StaticSection:
+    """Fixed marketing pages"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        # Part of the cache key, so editing the list invalidates cached shards
+        self.fingerprint = hashlib.sha1(repr(pages).encode()).hexdigest()[:8]
+
+    def stats(self):
+        return len(self.pages), None
+
+    def shard_stats(self, page, limit):
+        return len(self.pages[(page - 1) * limit:page * limit]), None
+
+    def entries(self, page, limit, base_url):
+        yield ''.join(
+            _url(base_url + path, changefreq=changefreq, priority=priority)
+            for path, changefreq, priority in self.pages[(page - 1) * limit:page * limit]
+        )
+
+
+class ModelSection:
+    """One URL per row of ``model`` matching ``where``"""
+
+    def __init__(self, model, path, lastmod=None, where=None, changefreq=None, priority=None):
+        self.model = model
+        self.path = path
+        self.lastmod = lastmod
+        self.where = where
+        self.changefreq = changefreq
+        self.priority = priority
+        self.fingerprint = path
+
+    def _select(self, *columns):
+        stmt = db.select(*columns)
+        if self.where is not None:
+            stmt = stmt.where(self.where)
+        return stmt
+
+    def _aggregate(self, source):
+        lastmod = db.func.max(source.c.lastmod) if self.lastmod is not None else db.null()
+        return tuple(db.session.execute(db.select(db.func.count(), lastmod).select_from(source)).one())
+
+    def _rows(self, page=None, limit=None):
+        columns = [self.model.id, self.model.slug]
+        if self.lastmod is not None:
+            columns.append(self.lastmod.label('lastmod'))
+        stmt = self._select(*columns).order_by(self.model.id)
+        if page is not None:
+            stmt = stmt.limit(limit).offset((page - 1) * limit)
+        return stmt
+
+    def stats(self):
+        """(URL count, newest modification time) of the whole section"""
+        return self._aggregate(self._rows().subquery())
+
+    def shard_stats(self, page, limit):
+        return self._aggregate(self._rows(page, limit).subquery())
+
+    def entries(self, page, limit, base_url):
+        result = db.session.execute(self._rows(page, limit).execution_options(yield_per=CHUNK_ROWS))
+        try:
+            for rows in result.partitions():
+                yield ''.join(
+                    _url(base_url + self.path.format(row.slug),
+                         getattr(row, 'lastmod', None), self.changefreq, self.priority)
+                    for row in rows
+                )
+        finally:
+            result.close()
+
+
+SECTIONS = {
+    'pages': StaticSection((
+        ('/', 'weekly', '1.0'),
+        ('/services', 'monthly', '0.9'),
+        ('/blogs', 'daily', '0.8'),
+        ('/samples', 'weekly', '0.7'),
+        ('/testimonails', 'monthly', '0.6'),
+        ('/faqs', 'monthly', '0.6'),
+        ('/contact', 'monthly', '0.6'),
+        ('/privacy', 'yearly', '0.3'),
+        ('/terms', 'yearly', '0.3'),
+        ('/refund', 'yearly', '0.3'),
+    )),
+    'blog': ModelSection(
+        BlogPost, '/blog/{}', db.func.coalesce(BlogPost.updated_at, BlogPost.published_at),
+        where=BlogPost.is_published == True, changefreq='monthly', priority='0.7'
+    ),
+    'services': ModelSection(Service, '/service/{}', Service.updated_at, changefreq='monthly', priority='0.8'),
+    'samples': ModelSection(
+        Sample, '/samples/{}', db.func.coalesce(Sample.updated_at, Sample.created_at),
+        changefreq='monthly', priority='0.6'
+    ),
+    'categories': ModelSection(
+        BlogCategory, '/blogs/category/{}', BlogCategory.updated_at, changefreq='weekly', priority='0.7'
+    ),
+}
+
+
+class SitemapDocument:
+    """
+    One sitemap document: a urlset of one or more shards, or the index.
+    ``etag`` and ``last_modified`` are known before anything is generated.
+    """
+
+    def __init__(self, kind, shards, base_url):
+        self.kind = kind  # 'urlset' or 'index'
+        self.shards = shards  # [(section, page, count, lastmod)]
+        self.base_url = base_url
+        key = '|'.join(
+            f'{name}:{page}:{count}:{lastmod}:{SECTIONS[name].fingerprint}'
+            for name, page, count, lastmod in shards
+        )
+        self.etag = hashlib.sha1(f'{kind}|{base_url}|{key}'.encode()).hexdigest()[:20]
+        # The gzipped copy is a different representation, so it needs its own tag
+        self.gzip_etag = f'{self.etag}-gz'
+        lastmods = [lastmod for _, _, _, lastmod in shards if lastmod]
+        self.last_modified = max(lastmods) if lastmods else None
+
+    def _chunks(self):
+        limit = current_app.config.get('SITEMAP_MAX_URLS', 50000)
+        if self.kind == 'index':
+            yield XML_HEADER + INDEX_OPEN
+            for name, page, _, lastmod in self.shards:
+                lastmod_tag = f'    <lastmod>{lastmod:%Y-%m-%d}</lastmod>\n' if lastmod else ''
+                yield (f'  <sitemap>\n    <loc>{escape(self.base_url)}/sitemap-{name}-{page}.xml.gz</loc>\n'
+                       f'{lastmod_tag}  </sitemap>\n')
+            yield INDEX_CLOSE
+            return
+
+        yield XML_HEADER + URLSET_OPEN
+        for name, page, _, _ in self.shards:
+            yield from SECTIONS[name].entries(page, limit, self.base_url)
+        yield URLSET_CLOSE
+
+    def stream(self, gzip=False):
+        """
+        Generator of the encoded document. A cached copy is replayed when
+        there is one; otherwise the output is cached once it completes.
+        """
+        key = f"sitemap:{self.etag}:{'gz' if gzip else 'xml'}"
+        try:
+            cached = cache.get(key)
+        except Exception as e:
+            current_app.logger.warning(f"Sitemap cache read failed: {str(e)}")
+            cached = None
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = (chunk.encode('utf-8') for chunk in self._chunks())
+        if gzip:
+            chunks = _gzip(chunks)
+        collected = []
+        for chunk in chunks:
+            collected.append(chunk)
+            yield chunk
+        try:
+            cache.set(key, b''.join(collected), timeout=current_app.config.get('SITEMAP_CACHE_TIMEOUT', 86400))
+        except Exception as e:
+            current_app.logger.warning(f"Sitemap cache write failed: {str(e)}")
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _base_url():
+    return current_app.config.get('SITEMAP_BASE_URL', 'https://tunedessays.com').rstrip('/')
+
+
+def get_main_document():
+    """/sitemap.xml: every URL when they fit in one document, else the sitemap index"""
+    limit = current_app.config.get('SITEMAP_MAX_URLS', 50000)
+    stats = {name: section.stats() for name, section in SECTIONS.items()}
+    if sum(count for count, _ in stats.values()) <= limit:
+        shards = [(name, 1, count, lastmod) for name, (count, lastmod) in stats.items()]
+        return SitemapDocument('urlset', shards, _base_url())
+
+    shards = []
+    for name, (count, lastmod) in stats.items():
+        pages = math.ceil(count / limit)
+        for page in range(1, pages + 1):
+            if pages == 1:
+                shards.append((name, page, count, lastmod))
+            else:
+                shards.append((name, page) + SECTIONS[name].shard_stats(page, limit))
+    return SitemapDocument('index', shards, _base_url())
+
+
+def get_shard_document(name, page):
+    """/sitemap-<name>-<page>.xml, or None when there is no such shard"""
+    section = SECTIONS.get(name)
+    if section is None or page < 1:
+        return None
+    count, lastmod = section.shard_stats(page, current_app.config.get('SITEMAP_MAX_URLS', 50000))
+    if not count:
+        return None
+    return SitemapDocument('urlset', [(name, page, count, lastmod)], _base_url())
+
+
 def get_minimal_sitemap():
     """Minimal sitemap for client subdomain when no public pages exist"""
     from datetime import datetime
-    
+
     current_time = datetime.now().strftime('%Y-%m-%dT%H:%M:%S+00:00')
-    
+
     # Empty sitemap - client portal has no public pages to index
     sitemap_xml = f'''<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
     <!-- Client portal contains only private, authenticated pages -->
     <!-- No public pages available for indexing -->
 </urlset>'''
-    
-    return sitemap_xml
 
-def get_main_sitemap(Blog=None, Service=None, Sample=None, BlogCategory=None):
-    """Generate sitemap"""
-    from datetime import datetime
-    
-    current_time = datetime.now().strftime('%Y-%m-%dT%H:%M:%S+00:00')
-    
-    sitemap_xml = '''<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'''
-    
-    # Static pages
-    static_pages = [
-        {'url': '/', 'priority': '1.0', 'changefreq': 'weekly'},
-        {'url': '/services', 'priority': '0.9', 'changefreq': 'monthly'},
-        {'url': '/blogs', 'priority': '0.8', 'changefreq': 'daily'},
-        {'url': '/samples', 'priority': '0.7', 'changefreq': 'weekly'},
-        {'url': '/testimonials', 'priority': '0.6', 'changefreq': 'monthly'},
-        {'url': '/faqs', 'priority': '0.6', 'changefreq': 'monthly'},
-        {'url': '/contact', 'priority': '0.6', 'changefreq': 'monthly'},
-        {'url': '/privacy', 'priority': '0.3', 'changefreq': 'yearly'},
-        {'url': '/terms', 'priority': '0.3', 'changefreq': 'yearly'},
-        {'url': '/refund', 'priority': '0.3', 'changefreq': 'yearly'},
-    ]
-    
-    for page in static_pages:
-        full_url = f"https://tunedessays.com{page['url']}"
-        sitemap_xml += f'''
-    <url>
-        <loc>{full_url}</loc>
-        <lastmod>{current_time}</lastmod>
-        <changefreq>{page['changefreq']}</changefreq>
-        <priority>{page['priority']}</priority>
-    </url>'''
-    
-    # Dynamic content
-    if Blog:
-        try:
-            blogs = Blog.query.filter_by(is_published=True).all()
-            for blog in blogs:
-                last_mod = blog.published_at.strftime('%Y-%m-%dT%H:%M:%S+00:00') if hasattr(blog, 'published_at') and blog.published_at else current_time
-                sitemap_xml += f'''
-    <url>
-        <loc>https://yourdomain.com/blog/{blog.slug}</loc>
-        <lastmod>{last_mod}</lastmod>
-        <changefreq>monthly</changefreq>
-        <priority>0.7</priority>
-    </url>'''
-        except Exception:
-            pass
-    
-    if Service:
-        try:
-            services = Service.query.filter_by(active=True).all()
-            for service in services:
-                last_mod = current_time
-                sitemap_xml += f'''
-    <url>
-        <loc>https://yourdomain.com/service/{service.slug}</loc>
-        <lastmod>{last_mod}</lastmod>
-        <changefreq>monthly</changefreq>
-        <priority>0.8</priority>
-    </url>'''
-        except Exception:
-            pass
-    
-    if Sample:
-        try:
-            samples = Sample.query.all()
-            for sample in samples:
-                last_mod = sample.created_at.strftime('%Y-%m-%dT%H:%M:%S+00:00') if hasattr(sample, 'created_at') and sample.created_at else current_time
-                sitemap_xml += f'''
-    <url>
-        <loc>https://yourdomain.com/samples/{sample.slug}</loc>
-        <lastmod>{last_mod}</lastmod>
-        <changefreq>monthly</changefreq>
-        <priority>0.6</priority>
-    </url>'''
-        except Exception:
-            pass
-    
-    if BlogCategory:
-        try:
-            categories = BlogCategory.query.all()
-            for category in categories:
-                sitemap_xml += f'''
-    <url>
-        <loc>https://yourdomain.com/blogs/category/{category.slug}</loc>
-        <lastmod>{current_time}</lastmod>
-        <changefreq>weekly</changefreq>
-        <priority>0.7</priority>
-    </url>'''
-        except Exception:
-            pass
-    
-    sitemap_xml += '''
-</urlset>'''
-    
-    return sitemap_xml
\ No newline at end of file
+    return sitemap_xml
@@ -2,13 +2,12 @@ from flask_socketio import emit, join_room, leave_room, disconnect
 from flask_login import current_user
 from flask import request
 from app.extensions import db, socketio
-from app.models import Chat, ChatMessage, Notification, User
+from app.utils.pagination import InvalidCursor
+from app.models import Chat, ChatMessage, Notification, User, UnreadCounter
 from datetime import datetime
-from app.sockets.utils import send_unread_counts, mark_chat_messages_as_read, send_message_notification
+from app.sockets.utils import send_unread_counts, queue_unread_counts, mark_chat_messages_as_read, mark_notifications_as_read, get_notifications_page, send_message_notification, get_presence
 import json
 
-from .utils import online_users
-
 def init_socketio_events(socketio):
     """Initialize all socket event handlers"""
     
@@ -23,9 +22,10 @@ def init_socketio_events(socketio):
         session_id = request.sid
         
         # Track online user
-        if user_id not in online_users:
-            online_users[user_id] = []
-        online_users[user_id].append(session_id)
+        try:
+            get_presence().join(user_id, session_id)
+        except Exception as e:
+            print(f"Error tracking presence for user {user_id}: {e}")
         
         # Join user to their personal room for notifications
         join_room(f"user_{user_id}")
@@ -56,11 +56,10 @@ def init_socketio_events(socketio):
         session_id = sid
         
         # Remove user from tracking
-        if user_id in online_users:
-            if session_id in online_users[user_id]:
-                online_users[user_id].remove(session_id)
-            if not online_users[user_id]:
-                del online_users[user_id]
+        try:
+            get_presence().leave(user_id, session_id)
+        except Exception as e:
+            print(f"Error clearing presence for user {user_id}: {e}")
         
         print(f"User {current_user.username} disconnected")
     
@@ -84,11 +83,15 @@ def init_socketio_events(socketio):
         join_room(f"chat_{chat_id}")
         
         # Mark messages as read
-        message_ids = mark_chat_messages_as_read(chat_id, current_user.id)
+        result = mark_chat_messages_as_read(chat_id, current_user.id)
+        if result.count:
+            queue_unread_counts(current_user.id)
         
         emit('messages_marked_read', {
             'chat_id': chat_id,
-            'message_ids': message_ids,
+            'message_ids': result.ids,
+            'count': result.count,
+            'truncated': result.truncated,
             'user_id': current_user.id
         }, room=f"chat_{chat_id}")
         
@@ -133,7 +136,11 @@ def init_socketio_events(socketio):
             is_read=False
         )
         
+        # Other participant gets one more unread message (same transaction)
+        other_user_id = chat.admin_id if chat.user_id == current_user.id else chat.user_id
+        
         db.session.add(message)
+        UnreadCounter.adjust(other_user_id, messages=1)
         db.session.commit()
         
         # Prepare message data
@@ -152,11 +159,10 @@ def init_socketio_events(socketio):
         socketio.emit('new_message', message_data, room=f"chat_{chat_id}")
         
         # Send notification to other participant
-        other_user_id = chat.admin_id if chat.user_id == current_user.id else chat.user_id
         # send_message_notification(other_user_id, chat, message, current_user)
         
-        # Update unread counts
-        send_unread_counts(str(other_user_id))
+        # Update unread counts (coalesced across bursts of messages)
+        queue_unread_counts(other_user_id)
     
     @socketio.on('mark_messages_read')
     def handle_mark_messages_read(data):
@@ -168,12 +174,24 @@ def init_socketio_events(socketio):
         if not chat_id:
             return
         
-        message_ids = mark_chat_messages_as_read(chat_id, current_user.id)
+        # Verify user has access to this chat
+        chat = Chat.query.get(chat_id)
+        if not chat or (chat.user_id != current_user.id and chat.admin_id != current_user.id):
+            emit('error', {'message': 'Access denied to this chat'})
+            return
+        
+        result = mark_chat_messages_as_read(chat_id, current_user.id)
         
         # Update unread counts
-        send_unread_counts(str(current_user.id))
+        queue_unread_counts(current_user.id)
         
-        emit('messages_marked_read', {'chat_id': chat_id, 'message_ids': message_ids, 'user_id': current_user.id}, room=f"chat_{chat_id}")
+        emit('messages_marked_read', {
+            'chat_id': chat_id,
+            'message_ids': result.ids,
+            'count': result.count,
+            'truncated': result.truncated,
+            'user_id': current_user.id
+        }, room=f"chat_{chat_id}")
     
     @socketio.on('mark_notification_read')
     def handle_mark_notification_read(data):
@@ -185,39 +203,58 @@ def init_socketio_events(socketio):
         if not notification_id:
             return
         
-        notification = Notification.query.filter_by(
-            id=notification_id, 
-            user_id=current_user.id
-        ).first()
+        result = mark_notifications_as_read(current_user.id, [notification_id])
         
-        if notification:
-            notification.mark_as_read()
-            send_unread_counts(str(current_user.id))
+        if result.count:
+            queue_unread_counts(current_user.id)
             emit('notification_marked_read', {'notification_id': notification_id})
     
+    @socketio.on('mark_notifications_read')
+    def handle_mark_notifications_read(data):
+        """Mark several (or, with 'all', every) notifications as read in one UPDATE"""
+        if not current_user.is_authenticated:
+            return
+        
+        data = data or {}
+        notification_ids = None
+        if not data.get('all'):
+            try:
+                notification_ids = [int(i) for i in data.get('notification_ids') or []]
+            except (TypeError, ValueError):
+                emit('error', {'message': 'Invalid notification IDs'})
+                return
+            if not notification_ids:
+                return
+        
+        result = mark_notifications_as_read(current_user.id, notification_ids)
+        
+        if result.count:
+            queue_unread_counts(current_user.id)
+        emit('notifications_marked_read', {
+            'notification_ids': result.ids,
+            'count': result.count,
+            'truncated': result.truncated,
+            'all': notification_ids is None
+        })
+    
     @socketio.on('get_notifications')
     def handle_get_notifications(data):
-        """Get user notifications"""
+        """Get user notifications (one keyset page; pass back 'next_cursor' as 'cursor')"""
         if not current_user.is_authenticated:
             return
         
-        limit = data.get('limit', 20)
-        offset = data.get('offset', 0)
-        
-        notifications = Notification.query.filter_by(
-            user_id=current_user.id
-        ).order_by(
-            Notification.created_at.desc()
-        ).offset(offset).limit(limit).all()
-        
-        notifications_data = [notif.to_dict() for notif in notifications]
+        data = data or {}
+        try:
+            page = get_notifications_page(
+                current_user.id,
+                cursor=data.get('cursor'),
+                limit=data.get('limit', 20)
+            )
+        except InvalidCursor:
+            emit('error', {'message': 'Invalid notifications cursor'})
+            return
         
-        emit('notifications_loaded', {
-            'notifications': notifications_data,
-            'offset': offset,   
-            'limit': limit,
-            'total_count': Notification.query.filter_by(user_id=current_user.id).count()
-        })
+        emit('notifications_loaded', page)
     
     @socketio.on('get_all_notifications')
     def handle_get_all_notifications(data):
@@ -225,53 +262,24 @@ def init_socketio_events(socketio):
         if not current_user.is_authenticated:
             return
         
-        limit = data.get('limit', 100)  # Higher limit for modal
-        offset = data.get('offset', 0)
-        
+        data = data or {}
         try:
-            # Build query with optional filters
-            query = Notification.query.filter_by(user_id=current_user.id)
-            
-            # Apply filters if provided
-            notification_type = data.get('type')
-            if notification_type:
-                query = query.filter_by(type=notification_type)
-            
-            status = data.get('status')
-            if status == 'read':
-                query = query.filter_by(is_read=True)
-            elif status == 'unread':
-                query = query.filter_by(is_read=False)
-            
-            # Search functionality
-            search_term = data.get('search')
-            if search_term:
-                search_pattern = f"%{search_term}%"
-                query = query.filter(
-                    db.or_(
-                        Notification.title.ilike(search_pattern),
-                        Notification.message.ilike(search_pattern)
-                    )
-                )
-            
-            # Order by created_at descending and apply pagination
-            notifications = query.order_by(
-                Notification.created_at.desc()
-            ).offset(offset).limit(limit).all()
-            
-            # Get total count for pagination info
-            total_count = query.count()
-            
-            notifications_data = [notif.to_dict() for notif in notifications]
+            page = get_notifications_page(
+                current_user.id,
+                cursor=data.get('cursor'),
+                limit=data.get('limit', 100),  # Higher limit for modal
+                max_limit=200,
+                notification_type=data.get('type'),
+                status=data.get('status'),
+                search=data.get('search')
+            )
+            # Lets the modal drop answers to requests made before its filters changed
+            page['request_id'] = data.get('request_id')
             
-            emit('all_notifications_loaded', {
-                'notifications': notifications_data,
-                'offset': offset,   
-                'limit': limit,
-                'total_count': total_count,
-                'has_more': (offset + limit) < total_count
-            })
+            emit('all_notifications_loaded', page)
             
+        except InvalidCursor:
+            emit('error', {'message': 'Invalid notifications cursor'})
         except Exception as e:
             print(f"Error getting all notifications: {e}")
             emit('error', {'message': 'Failed to load notifications'})
@@ -0,0 +1,239 @@
+"""
+Online-presence registry for socket connections.
+
+Every worker records the socket sessions it owns and refreshes them with a
+periodic heartbeat. A session that is not refreshed within ``PRESENCE_TTL``
+seconds (for example because its worker died) expires on its own, so stale
+sids never leak.
+
+Two backends share the same interface:
+
+* ``MemoryPresence``  - process-local, for a single worker or development.
+* ``RedisPresence``   - any Redis-protocol server, shared by all workers.
+  Each user is one hash ``<prefix><user_id>`` of ``sid -> expiry``; the key's
+  own TTL is refreshed on join/heartbeat, so "is this user online" is a
+  single ``EXISTS`` and joins/leaves are O(1).
+"""
+from abc import ABC, abstractmethod
+import threading
+import time
+
+
+class PresenceBackend(ABC):
+    """Interface shared by the presence backends"""
+
+    def __init__(self, ttl=90):
+        self.ttl = ttl
+
+    @abstractmethod
+    def join(self, user_id, sid):
+        pass
+
+    @abstractmethod
+    def leave(self, user_id, sid):
+        pass
+
+    @abstractmethod
+    def heartbeat(self, sessions):
+        """Refresh ``{sid: user_id}`` sessions owned by this worker"""
+
+    @abstractmethod
+    def is_online(self, user_id):
+        pass
+
+    @abstractmethod
+    def online_among(self, user_ids):
+        """Return the subset of ``user_ids`` (as strings) that are online"""
+
+    @abstractmethod
+    def online_users(self):
+        pass
+
+
+class MemoryPresence(PresenceBackend):
+    """Process-local presence registry"""
+
+    def __init__(self, ttl=90):
+        super().__init__(ttl)
+        self._users = {}  # user_id -> {sid: expires_at}
+        self._lock = threading.Lock()
+
+    def _alive(self, user_id, now):
+        sessions = self._users.get(user_id)
+        if not sessions:
+            return False
+        if any(expires_at > now for expires_at in sessions.values()):
+            return True
+        del self._users[user_id]
+        return False
+
+    def join(self, user_id, sid):
+        with self._lock:
+            self._users.setdefault(str(user_id), {})[sid] = time.monotonic() + self.ttl
+
+    def leave(self, user_id, sid):
+        user_id = str(user_id)
+        with self._lock:
+            sessions = self._users.get(user_id)
+            if sessions is None:
+                return
+            sessions.pop(sid, None)
+            if not sessions:
+                del self._users[user_id]
+
+    def heartbeat(self, sessions):
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for sid, user_id in sessions.items():
+                self._users.setdefault(str(user_id), {})[sid] = expires_at
+            # Drop sessions that stopped heartbeating
+            now = time.monotonic()
+            for user_id in list(self._users):
+                live = {sid: exp for sid, exp in self._users[user_id].items() if exp > now}
+                if live:
+                    self._users[user_id] = live
+                else:
+                    del self._users[user_id]
+
+    def is_online(self, user_id):
+        with self._lock:
+            return self._alive(str(user_id), time.monotonic())
+
+    def online_among(self, user_ids):
+        now = time.monotonic()
+        with self._lock:
+            return {str(u) for u in user_ids if self._alive(str(u), now)}
+
+    def online_users(self):
+        now = time.monotonic()
+        with self._lock:
+            return [u for u in list(self._users) if self._alive(u, now)]
+
+
+class RedisPresence(PresenceBackend):
+    """Presence registry shared through a Redis-protocol server"""
+
+    def __init__(self, client, ttl=90, prefix='presence:user:'):
+        super().__init__(ttl)
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        import redis
+        return cls(redis.Redis.from_url(url, decode_responses=True), **kwargs)
+
+    def _key(self, user_id):
+        return f"{self.prefix}{user_id}"
+
+    def join(self, user_id, sid):
+        key = self._key(user_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(key, sid, time.time() + self.ttl)
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def leave(self, user_id, sid):
+        # Redis removes the key itself once its last field is deleted
+        self.client.hdel(self._key(user_id), sid)
+
+    def heartbeat(self, sessions):
+        if not sessions:
+            return
+        now = time.time()
+        by_user = {}
+        for sid, user_id in sessions.items():
+            by_user.setdefault(str(user_id), []).append(sid)
+
+        pipe = self.client.pipeline(transaction=False)
+        for user_id, sids in by_user.items():
+            key = self._key(user_id)
+            pipe.hset(key, mapping={sid: now + self.ttl for sid in sids})
+            pipe.expire(key, self.ttl)
+            pipe.hgetall(key)
+        results = pipe.execute()
+
+        # Prune sessions of this user that another (dead) worker stopped refreshing
+        stale = {}
+        for user_id, fields in zip(by_user, results[2::3]):
+            expired = [sid for sid, expires_at in fields.items() if float(expires_at) <= now]
+            if expired:
+                stale[self._key(user_id)] = expired
+        if stale:
+            pipe = self.client.pipeline(transaction=False)
+            for key, sids in stale.items():
+                pipe.hdel(key, *sids)
+            pipe.execute()
+
+    def is_online(self, user_id):
+        return bool(self.client.exists(self._key(user_id)))
+
+    def online_among(self, user_ids):
+        user_ids = [str(u) for u in user_ids]
+        if not user_ids:
+            return set()
+        pipe = self.client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.exists(self._key(user_id))
+        return {user_id for user_id, exists in zip(user_ids, pipe.execute()) if exists}
+
+    def online_users(self):
+        start = len(self.prefix)
+        return [key[start:] for key in self.client.scan_iter(match=f"{self.prefix}*", count=500)]
+
+
+class PresenceRegistry:
+    """
+    Presence facade used by the socket handlers. Tracks the sessions owned
+    by this worker and heartbeats them to the backend from a background task.
+    """
+
+    def __init__(self, backend, heartbeat_interval=None):
+        self.backend = backend
+        self.heartbeat_interval = heartbeat_interval or max(1, backend.ttl // 3)
+        self._local = {}  # sid -> user_id, sessions owned by this worker
+        self._heartbeat_started = False
+
+    def start_heartbeat(self, socketio):
+        if self._heartbeat_started:
+            return
+        self._heartbeat_started = True
+        socketio.start_background_task(self._heartbeat_loop, socketio)
+
+    def _heartbeat_loop(self, socketio):
+        while True:
+            socketio.sleep(self.heartbeat_interval)
+            try:
+                self.backend.heartbeat(dict(self._local))
+            except Exception as e:
+                print(f"Error sending presence heartbeat: {e}")
+
+    def join(self, user_id, sid):
+        self._local[sid] = str(user_id)
+        self.backend.join(user_id, sid)
+
+    def leave(self, user_id, sid):
+        self._local.pop(sid, None)
+        self.backend.leave(user_id, sid)
+
+    def is_online(self, user_id):
+        return self.backend.is_online(user_id)
+
+    def online_among(self, user_ids):
+        return self.backend.online_among(user_ids)
+
+    def online_users(self):
+        return self.backend.online_users()
+
+
+def create_presence_registry(config):
+    """Build the presence registry selected by ``PRESENCE_BACKEND``"""
+    ttl = config.get('PRESENCE_TTL', 90)
+    backend_name = config.get('PRESENCE_BACKEND', 'memory')
+    if backend_name == 'redis':
+        backend = RedisPresence.from_url(config.get('PRESENCE_REDIS_URL'), ttl=ttl)
+    elif backend_name == 'memory':
+        backend = MemoryPresence(ttl=ttl)
+    else:
+        raise ValueError(f"Unknown PRESENCE_BACKEND '{backend_name}'")
+    return PresenceRegistry(backend, config.get('PRESENCE_HEARTBEAT_INTERVAL'))
@@ -83,6 +83,10 @@ class SocketClient {
             this.handleNotificationMarkedRead(data.notification_id);
         });
         
+        this.socket.on('notifications_marked_read', (data) => {
+            data.notification_ids.forEach(id => this.handleNotificationMarkedRead(id));
+        });
+        
         this.socket.on('notifications_loaded', (data) => {
             this.handleNotificationsLoaded(data);
         });
@@ -301,15 +305,20 @@ class SocketClient {
         this.socket.emit('mark_notification_read', { notification_id: notificationId });
     }
     
+    markNotificationsRead(notificationIds) {
+        // One bulk UPDATE on the server instead of one event per notification
+        this.socket.emit('mark_notifications_read', { notification_ids: notificationIds });
+    }
+    
     markAllNotificationsRead() {
         // Get all unread notification IDs
         const unreadNotifications = document.querySelectorAll('.notification-item:not(.read)');
-        unreadNotifications.forEach(notif => {
-            const notificationId = notif.dataset.notificationId;
-            if (notificationId) {
-                this.markNotificationRead(parseInt(notificationId));
-            }
-        });
+        const notificationIds = Array.from(unreadNotifications)
+            .map(notif => parseInt(notif.dataset.notificationId))
+            .filter(id => !isNaN(id));
+        if (notificationIds.length > 0) {
+            this.markNotificationsRead(notificationIds);
+        }
     }
     
     handleNotificationMarkedRead(notificationId) {
@@ -320,16 +329,16 @@ class SocketClient {
         }
     }
     
-    loadNotifications(offset = 0, limit = 20) {
-        this.socket.emit('get_notifications', { offset, limit });
+    loadNotifications(cursor = null, limit = 20) {
+        this.socket.emit('get_notifications', { cursor, limit });
     }
     
     handleNotificationsLoaded(data) {
         const notificationsList = document.getElementById('notifications-list');
         if (!notificationsList) return;
         
-        // Clear existing notifications if offset is 0
-        if (data.offset === 0) {
+        // Clear existing notifications on the first page
+        if (!data.cursor) {
             notificationsList.innerHTML = '';
         }
         
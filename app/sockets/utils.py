@@ -1,27 +1,28 @@
 from app.extensions import db, socketio
-from app.models.communication import ChatMessage, Notification, Chat
+from app.models.communication import ChatMessage, Notification, Chat, UnreadCounter, BulkReadResult
 from app.models.user import User
+from app.sockets.presence import create_presence_registry
+from app.utils.model_events import after_commit
+from app.utils.pagination import keyset_paginate, clamp_limit
+from flask import current_app
 from datetime import datetime
+import threading
 
-online_users = {}
+_presence = None
+
+def get_presence():
+    """Return this worker's presence registry, creating it on first use"""
+    global _presence
+    if _presence is None:
+        _presence = create_presence_registry(current_app.config)
+        _presence.start_heartbeat(socketio)
+    return _presence
 
 def send_unread_counts(user_id):
     """Send unread counts to user"""
     try:
-        user_id_int = int(user_id)
-        
-        # Count unread messages
-        unread_messages = db.session.query(ChatMessage).join(Chat).filter(
-            ((Chat.user_id == user_id_int) | (Chat.admin_id == user_id_int)) &
-            (ChatMessage.user_id != user_id_int) &
-            (ChatMessage.is_read == False)
-        ).count()
-        
-        # Count unread notifications
-        unread_notifications = Notification.query.filter_by(
-            user_id=user_id_int,
-            is_read=False
-        ).count()
+        # O(1) read of the incrementally maintained counters
+        unread_messages, unread_notifications = UnreadCounter.get_counts(user_id)
         
         # Emit to user's personal room
         socketio.emit('unread_counts', {
@@ -33,6 +34,76 @@ def send_unread_counts(user_id):
     except Exception as e:
         print(f"Error sending unread counts: {e}")
 
+class UnreadCountsCoalescer:
+    """
+    Debounces unread_counts emits. Users are marked dirty and a green thread
+    flushes each dirty user once per window, so a burst of messages costs
+    one counter read and one emit per user instead of one per message.
+    """
+    
+    def __init__(self):
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._scheduled = False
+    
+    def mark_dirty(self, user_id, app, window):
+        with self._lock:
+            self._dirty.add(str(user_id))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        socketio.start_background_task(self._flush_after, app, window)
+    
+    def _flush_after(self, app, window):
+        socketio.sleep(window)
+        with self._lock:
+            user_ids, self._dirty = self._dirty, set()
+            self._scheduled = False
+        with app.app_context():
+            try:
+                for user_id in user_ids:
+                    send_unread_counts(user_id)
+            finally:
+                db.session.remove()
+
+_unread_coalescer = UnreadCountsCoalescer()
+
+def queue_unread_counts(user_id):
+    """Schedule an unread_counts emit for a user, coalesced per UNREAD_COUNTS_DEBOUNCE_MS"""
+    if user_id is None:
+        return
+    window = current_app.config.get('UNREAD_COUNTS_DEBOUNCE_MS', 250) / 1000.0
+    if window <= 0:
+        send_unread_counts(user_id)
+        return
+    _unread_coalescer.mark_dirty(user_id, current_app._get_current_object(), window)
+
+_reconciler_started = False
+
+def start_unread_reconciler(app):
+    """Start this worker's periodic unread-counter reconciler (once)"""
+    global _reconciler_started
+    interval = app.config.get('UNREAD_RECONCILE_INTERVAL', 600)
+    if _reconciler_started or interval <= 0:
+        return
+    _reconciler_started = True
+    
+    def reconcile_loop():
+        while True:
+            socketio.sleep(interval)
+            with app.app_context():
+                try:
+                    fixed = UnreadCounter.reconcile()
+                    if fixed:
+                        app.logger.info(f"Reconciled {fixed} drifted unread counters")
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.error(f"Error reconciling unread counters: {e}")
+                finally:
+                    db.session.remove()
+    
+    socketio.start_background_task(reconcile_loop)
+
 # def mark_chat_messages_as_read(chat_id, user_id):
 #     """Mark all messages in a chat as read for a user"""
 #     try:
@@ -48,32 +119,80 @@ def send_unread_counts(user_id):
 #         print(f"Error marking messages as read: {e}")
 #         db.session.rollback()
 def mark_chat_messages_as_read(chat_id, user_id):
-    """Mark all unread messages in a chat as read for a user and return their IDs"""
+    """Mark all unread messages in a chat as read for a user and return a BulkReadResult"""
     try:
-        # Fetch messages from other users that are unread
-        unread_messages = ChatMessage.query.filter(
-            ChatMessage.chat_id == chat_id,
-            ChatMessage.user_id != user_id,
-            ChatMessage.is_read == False
-        ).all()
-
-        message_ids = [msg.id for msg in unread_messages]
+        result = ChatMessage.mark_chat_read(chat_id, user_id)
+        db.session.commit()
+        return result
 
-        # Mark as read
-        for msg in unread_messages:
-            msg.is_read = True
+    except Exception as e:
+        print(f"Error marking messages as read: {e}")
+        db.session.rollback()
+        return BulkReadResult(0, [])
 
+def mark_notifications_as_read(user_id, notification_ids=None):
+    """Mark a user's notifications (all, or the given IDs) as read and return a BulkReadResult"""
+    try:
+        result = Notification.mark_read_for_user(user_id, notification_ids)
         db.session.commit()
-        return message_ids
+        return result
 
     except Exception as e:
-        print(f"Error marking messages as read: {e}")
+        print(f"Error marking notifications as read: {e}")
         db.session.rollback()
-        return []
+        return BulkReadResult(0, [])
+
+def get_notifications_page(user_id, cursor=None, limit=20, max_limit=100,
+                           notification_type=None, status=None, search=None):
+    """
+    Return one page of a user's notifications, newest first, keyed on
+    (created_at, id). Raises ``InvalidCursor`` for a malformed cursor.
+    ``total_count`` is approximate (from the counters) and only present when
+    no type/search filter is applied.
+    """
+    limit = clamp_limit(limit, default=min(20, max_limit), maximum=max_limit)
+    query = Notification.query.filter_by(user_id=user_id)
+    
+    if notification_type:
+        query = query.filter_by(type=notification_type)
+    
+    if status == 'read':
+        query = query.filter_by(is_read=True)
+    elif status == 'unread':
+        query = query.filter_by(is_read=False)
+    
+    if search:
+        search_pattern = f"%{search}%"
+        query = query.filter(
+            db.or_(
+                Notification.title.ilike(search_pattern),
+                Notification.message.ilike(search_pattern)
+            )
+        )
+    
+    page = keyset_paginate(query, (Notification.created_at, Notification.id), cursor=cursor, limit=limit)
+    
+    total_count = None
+    if not notification_type and not search:
+        unread, total = UnreadCounter.get_notification_totals(user_id)
+        total_count = {'unread': unread, 'read': max(total - unread, 0)}.get(status, total)
+    
+    return {
+        'notifications': [notif.to_dict() for notif in page.items],
+        'cursor': cursor,
+        'next_cursor': page.next_cursor,
+        'has_more': page.has_more,
+        'limit': limit,
+        'total_count': total_count
+    }
+
 
+def _emit_after_commit(event, data, room):
+    """Emit once the notification rows are committed (never for a rolled-back transaction)"""
+    after_commit(db.session, lambda: socketio.emit(event, data, room=room))
 
 def send_message_notification(user_id, chat, message, sender):
-    """Send notification for new message"""
+    """Send notification for new message (in the current transaction; the caller commits)"""
     try:
         # Create notification
         notification = Notification(
@@ -84,11 +203,12 @@ def send_message_notification(user_id, chat, message, sender):
             link=f"/chat/{chat.id}"
         )
         
-        db.session.add(notification)
-        db.session.commit()
+        with db.session.begin_nested():
+            db.session.add(notification)
+            UnreadCounter.adjust(user_id, notifications=1, notifications_total=1)
         
         # Send real-time notification
-        socketio.emit('new_notification', {
+        _emit_after_commit('new_notification', {
             'notification': notification.to_dict(),
             'sound_type': 'message',
             'priority': 'normal'
@@ -96,10 +216,21 @@ def send_message_notification(user_id, chat, message, sender):
         
     except Exception as e:
         print(f"Error sending message notification: {e}")
-        db.session.rollback()
+
+def notification_sound_type(notification_type):
+    """Sound the clients play for a notification type"""
+    if notification_type in ['error', 'warning']:
+        return 'alert'
+    if notification_type == 'success':
+        return 'success'
+    return 'notification'
 
 def send_system_notification(user_id, title, message, notification_type='info', link=None, priority='normal'):
-    """Send system notification to user"""
+    """
+    Send system notification to user. The row is written in the current
+    transaction (the caller commits) and the emit waits for that commit.
+    A failure only rolls back this notification.
+    """
     try:
         # Create notification
         notification = Notification(
@@ -110,20 +241,14 @@ def send_system_notification(user_id, title, message, notification_type='info',
             link=link
         )
         
-        db.session.add(notification)
-        db.session.commit()
-        
-        # Determine sound type
-        sound_type = 'notification'
-        if notification_type in ['error', 'warning']:
-            sound_type = 'alert'
-        elif notification_type == 'success':
-            sound_type = 'success'
+        with db.session.begin_nested():
+            db.session.add(notification)
+            UnreadCounter.adjust(user_id, notifications=1, notifications_total=1)
         
         # Send real-time notification
-        socketio.emit('new_notification', {
+        _emit_after_commit('new_notification', {
             'notification': notification.to_dict(),
-            'sound_type': sound_type,
+            'sound_type': notification_sound_type(notification_type),
             'priority': priority
         }, room=f"user_{user_id}")
         
@@ -131,17 +256,82 @@ def send_system_notification(user_id, title, message, notification_type='info',
         
     except Exception as e:
         print(f"Error sending system notification: {e}")
-        db.session.rollback()
         return None
 
+def send_bulk_notification(user_ids, title, message, notification_type='info', link=None, priority='normal', room=None):
+    """
+    Send the same notification to many users: one multi-row INSERT and one
+    counter UPDATE in the current transaction (the caller commits; emits wait
+    for the commit). With ``room`` (e.g. "admin_room")
+    a single emit carries every recipient's notification ID in
+    ``notification_ids``; otherwise each user's room gets its own emit.
+    Returns ``{user_id: notification_id}``.
+    """
+    user_ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+    if not user_ids:
+        return {}
+    try:
+        created_at = datetime.now()
+        rows = [{
+            'user_id': user_id,
+            'title': title,
+            'message': message,
+            'type': notification_type,
+            'link': link,
+            'is_read': False,
+            'created_at': created_at
+        } for user_id in user_ids]
+        
+        with db.session.begin_nested():
+            result = db.session.execute(
+                db.insert(Notification).returning(Notification.user_id, Notification.id),
+                rows
+            )
+            notification_ids = {row.user_id: row.id for row in result}
+            UnreadCounter.adjust_many(user_ids, notifications=1, notifications_total=1)
+        
+        payload = {
+            'title': title,
+            'message': message,
+            'type': notification_type,
+            'link': link,
+            'is_read': False,
+            'created_at': created_at.isoformat()
+        }
+        sound_type = notification_sound_type(notification_type)
+        if room:
+            _emit_after_commit('new_notification', {
+                'notification': dict(payload, id=None),
+                'notification_ids': {str(user_id): nid for user_id, nid in notification_ids.items()},
+                'sound_type': sound_type,
+                'priority': priority
+            }, room=room)
+        else:
+            for user_id, notification_id in notification_ids.items():
+                _emit_after_commit('new_notification', {
+                    'notification': dict(payload, id=notification_id),
+                    'sound_type': sound_type,
+                    'priority': priority
+                }, room=f"user_{user_id}")
+        
+        return notification_ids
+        
+    except Exception as e:
+        print(f"Error sending bulk notification: {e}")
+        return {}
+
 def broadcast_to_admins(event, data):
-    """Broadcast message to all admin users"""
-    socketio.emit(event, data, room="admin_room")
+    """Broadcast message to all admin users (after the current transaction commits)"""
+    _emit_after_commit(event, data, room="admin_room")
 
 def is_user_online(user_id):
     """Check if user is online"""
-    return str(user_id) in online_users
+    return get_presence().is_online(user_id)
 
 def get_online_users():
     """Get list of online user IDs"""
-    return list(online_users.keys())
\ No newline at end of file
+    return get_presence().online_users()
+
+def get_online_among(user_ids):
+    """Get the subset of the given user IDs that are online (one backend round trip)"""
+    return get_presence().online_among(user_ids)
\ No newline at end of file
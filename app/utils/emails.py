@@ -1,5 +1,6 @@
 from flask import render_template_string, url_for, current_app, render_template
 from app.extensions import mail, get_token_serializer
+from app.utils.mail_queue import queue_email, queue_emails
 from flask_mail import Message
 import logging
 import os
@@ -34,7 +35,7 @@ def send_verification_email(user):
     '''
     
     try:
-        mail.send(msg)
+        queue_email(msg)
         
         # Save token to user
         user.email_verification_token = token
@@ -64,7 +65,7 @@ def send_password_reset_email(user):
     '''
     
     try:
-        mail.send(msg)
+        queue_email(msg)
         logging.info(f'Password reset email sent to {user.email}')
     except Exception as e:
         logging.error(f'Failed to send password reset email: {str(e)}')
@@ -106,7 +107,7 @@ Academic Writing Team
 '''
     
     try:
-        mail.send(msg)
+        queue_email(msg)
         logging.info(f'Order confirmation email sent to {user.email} for order {order.order_number}')
     except Exception as e:
         logging.error(f'Failed to send order confirmation email: {str(e)}')
@@ -127,11 +128,40 @@ def send_order_created(user, order):
 
     
     try:
-        mail.send(msg)
+        queue_email(msg)
         logging.info(f'Order confirmation email sent to {user.email} for order {order.order_number}')
     except Exception as e:
         logging.error(f'Failed to send order confirmation email: {str(e)}')
 
+def send_batch(messages, description='batch'):
+    """Queue several messages in one transaction; returns how many were queued"""
+    try:
+        queued = queue_emails(messages)
+        logging.info(f'Queued {queued} {description} emails')
+        return queued
+    except Exception as e:
+        logging.error(f'Failed to queue {description} emails: {str(e)}')
+        return 0
+
+def send_order_created_batch(users, order):
+    """Send the new-order email to several admins at once"""
+    order_url = url_for('admin.view_order', order_id=order.id, _external=True)
+    base_url = os.environ.get('BASE_URL', 'https://tunedessays.com')
+    messages = []
+    for user in users:
+        msg = Message('Order Recieved',
+                      recipients=[user.email],
+                      sender="no-reply@tunedessays.com")
+        msg.html = render_template(
+            'emails/order_created.html',
+            user=user,
+            order=order,
+            order_url=order_url,
+            base_url=base_url
+        )
+        messages.append(msg)
+    return send_batch(messages, f'order {order.order_number} created')
+
 def send_welcome_email(user):
     """
     Send welcome email using external template file
@@ -160,7 +190,7 @@ def send_welcome_email(user):
             sender="no-reply@tunedessays.com"
         )
         
-        mail.send(msg)
+        queue_email(msg)
         print(f"Welcome email sent successfully to {user.email}")
         return True
         
@@ -199,7 +229,7 @@ def send_payment_completion_email(user, payment_url, order) -> bool:
             sender="no-reply@tunedessays.com"
         )
         
-        mail.send(msg)
+        queue_email(msg)
         print(f"Payment completion email sent successfully to {user.get('email')}")
         return True
         
@@ -241,7 +271,7 @@ def send_order_completed_email(order, user):
         )
         
         # Send email
-        mail.send(msg)
+        queue_email(msg)
         
         # Log successful email sending (optional)
         logging.info(f"Order completion email sent to {user.email} for order {order.id}")
@@ -297,7 +327,7 @@ def send_payment_confirmation_email(invoice, user):
         """
         
         # Send the email
-        mail.send(msg)
+        queue_email(msg)
         
         return True, "Email sent successfully"
         
@@ -350,7 +380,7 @@ def send_revision_request_email(order, user):
         """
         
         # Send the email
-        mail.send(msg)
+        queue_email(msg)
         
         # Log successful email send (optional)
         logging.info(f'Revision request email sent to {user.email} for order {order.id}')
@@ -407,7 +437,7 @@ def send_extension_request_email(order, user):
         """
         
         # Send the email
-        mail.send(msg)
+        queue_email(msg)
         
         # Log successful send (optional)
         logging.info(f'Extension request email sent successfully to {user.email} for order {order.id}')
@@ -442,7 +472,7 @@ def send_anything_else_email(user):
         )
         
         # Send the email
-        mail.send(msg)
+        queue_email(msg)
         
         print(f"Email sent successfully to {user.email}")
         return True
@@ -702,7 +732,7 @@ This is an automated notification from your order management system.
             html=html_body
         )
         
-        mail.send(msg)
+        queue_email(msg)
         
         return True
         
@@ -938,7 +968,7 @@ Thank you for your patience.
             html=html_body
         )
         
-        mail.send(msg)
+        queue_email(msg)
         return True
         
     except Exception as e:
@@ -0,0 +1,125 @@
+"""
+Versioned HTML fragment cache.
+
+Parts of a page that look the same for every visitor, such as the blog
+sidebar, are rendered once and stored in the Flask-Caching backend. That
+backend is Redis in production, so all workers share the stored HTML. Each
+key embeds the current version token of its namespace. A commit that changes
+one of the namespace's models replaces the token. Every worker then reads new
+keys at once, and the old entries simply expire.
+
+A template caches a block with a call block. Extra arguments vary the key:
+
+    {% call cached_fragment('blog', 'post-categories', post.category_id) %}
+        ...
+    {% endcall %}
+
+The block body only runs on a miss. The data it uses should therefore be
+passed as ``Deferred`` values, which the view does not query up front.
+"""
+from app.extensions import cache
+from app.utils.model_events import on_models_committed
+from flask import current_app, g, has_app_context
+from markupsafe import Markup
+import uuid
+
+_VERSION_KEY = 'fragment-version:{}'
+
+
+def _new_token():
+    return uuid.uuid4().hex[:12]
+
+
+def _cache_call(method, *args, **kwargs):
+    # A cache outage degrades to rendering uncached, never to an error page
+    try:
+        return getattr(cache, method)(*args, **kwargs)
+    except Exception as e:
+        current_app.logger.warning(f"Fragment cache {method} failed: {str(e)}")
+        return None
+
+
+def register_namespace(namespace, models):
+    """Invalidate ``namespace`` whenever a change to any of ``models`` is committed"""
+    on_models_committed(models, lambda *args: invalidate_namespace(namespace))
+
+
+def invalidate_namespace(namespace):
+    """Move every fragment of ``namespace`` to fresh keys"""
+    if not has_app_context():
+        return
+    _cache_call('set', _VERSION_KEY.format(namespace), _new_token(), timeout=0)
+    getattr(g, '_fragment_versions', {}).pop(namespace, None)
+
+
+def namespace_version(namespace):
+    """Current version token of ``namespace`` (read once per request)"""
+    versions = g.setdefault('_fragment_versions', {})
+    if namespace not in versions:
+        key = _VERSION_KEY.format(namespace)
+        token = _cache_call('get', key)
+        if token is None:
+            # First use: add() so concurrent workers settle on one token
+            _cache_call('add', key, _new_token(), timeout=0)
+            token = _cache_call('get', key) or _new_token()
+        versions[namespace] = token
+    return versions[namespace]
+
+
+def fragment_key(namespace, name, *vary):
+    return ':'.join(['fragment', namespace, namespace_version(namespace), name, *map(str, vary)])
+
+
+def cached_value(namespace, name, builder, *vary, timeout=None):
+    """Return the cached result of ``builder()``, building and storing it on a miss"""
+    key = fragment_key(namespace, name, *vary)
+    value = _cache_call('get', key)
+    if value is None:
+        value = builder()
+        if value is not None:
+            _cache_call('set', key, value, timeout=timeout or current_app.config.get('FRAGMENT_CACHE_TIMEOUT', 3600))
+    return value
+
+
+def cached_fragment(namespace, name, *vary, timeout=None, caller=None):
+    """Jinja call-block helper: the rendered body of the block, cached"""
+    return Markup(cached_value(namespace, name, lambda: str(caller()), *vary, timeout=timeout))
+
+
+class Deferred:
+    """
+    Proxy that runs ``loader()`` on first use and then behaves like its
+    result (iteration, truth value, indexing and attribute access). A view
+    can pass one to a template and pay nothing if a cached fragment hits.
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._loaded = False
+        self._value = None
+
+    def _get(self):
+        if not self._loaded:
+            self._value = self._loader()
+            self._loaded = True
+        return self._value
+
+    def __iter__(self):
+        return iter(self._get())
+
+    def __len__(self):
+        return len(self._get())
+
+    def __bool__(self):
+        return bool(self._get())
+
+    def __getitem__(self, index):
+        return self._get()[index]
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._get(), name)
+
+    def __repr__(self):
+        return f'<Deferred {self._loader!r}>'
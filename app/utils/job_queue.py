@@ -0,0 +1,62 @@
+"""
+Helpers shared by the table-backed work queues (outbound mail, trigger outbox).
+
+A queue table has ``status``, ``attempts``, ``next_attempt_at``,
+``locked_by``, ``locked_at`` and ``last_error`` columns. Workers claim due rows
+with ``claim_due`` and either finish them or hand them to ``schedule_retry``.
+"""
+from app.extensions import db
+from datetime import datetime, timedelta
+import random
+
+
+def retry_delay(attempts, base):
+    """Seconds to wait before attempt ``attempts + 1``: exponential with jitter"""
+    delay = base * (2 ** max(attempts - 1, 0))
+    return delay + random.uniform(0, delay / 4)
+
+
+def claim_due(model, token, batch_size, lock_timeout, claimed_status):
+    """
+    Lock up to ``batch_size`` due rows of ``model`` for worker ``token`` and
+    return them. Rows are due when pending and past ``next_attempt_at``, or
+    when a dead worker left them ``claimed_status`` for over ``lock_timeout``
+    seconds. Uses SKIP LOCKED where supported; the guarded UPDATE keeps the
+    claim exclusive everywhere else.
+    """
+    now = datetime.now()
+    due = db.or_(
+        db.and_(model.status == 'pending', model.next_attempt_at <= now),
+        db.and_(model.status == claimed_status,
+                model.locked_at < now - timedelta(seconds=lock_timeout))
+    )
+    ids = [row.id for row in db.session.query(model.id).filter(due).order_by(
+        model.next_attempt_at, model.id
+    ).limit(batch_size).with_for_update(skip_locked=True)]
+    if not ids:
+        db.session.commit()
+        return []
+
+    db.session.execute(
+        db.update(model)
+        .where(model.id.in_(ids), due)
+        .values(status=claimed_status, locked_by=token, locked_at=now,
+                attempts=model.attempts + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return model.query.filter(
+        model.id.in_(ids), model.locked_by == token, model.status == claimed_status
+    ).order_by(model.id).all()
+
+
+def schedule_retry(row, error, max_attempts, backoff):
+    """Put a claimed row back to pending with backoff, or mark it failed; returns True if it will retry"""
+    row.last_error = str(error)[:2000]
+    row.locked_by = None
+    if row.attempts >= max_attempts:
+        row.status = 'failed'
+        return False
+    row.status = 'pending'
+    row.next_attempt_at = datetime.now() + timedelta(seconds=retry_delay(row.attempts, backoff))
+    return True
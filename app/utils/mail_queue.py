@@ -0,0 +1,304 @@
+"""
+Durable outbound mail queue.
+
+``queue_email`` adds a Flask-Mail ``Message`` to the ``outbound_email``
+table in the caller's transaction, so no request waits on an SMTP handshake
+and nothing is sent unless the caller commits.
+Worker green threads (started at boot in each app process by
+``app.services.background``, or run standalone with ``flask mail-queue-worker``) claim due rows in batches and deliver them
+over a long-lived ``mail.connect()`` connection. Failed deliveries are retried
+with exponential backoff until ``MAIL_QUEUE_MAX_ATTEMPTS``.
+
+To try it against a local debugging SMTP server::
+
+    python -m aiosmtpd -n -l localhost:1025
+    EMAIL_HOST=localhost EMAIL_PORT=1025 flask mail-queue-worker --once
+"""
+from app.extensions import db, mail, socketio
+from app.models.communication import OutboundEmail
+from app.utils.job_queue import claim_due, schedule_retry
+from flask import current_app
+from flask_mail import Message
+from datetime import datetime, timedelta
+from collections import deque
+import smtplib
+import threading
+import time
+import uuid
+
+
+def _address(value):
+    if isinstance(value, (tuple, list)):
+        return f"{value[0]} <{value[1]}>"
+    return value
+
+
+def _addresses(values):
+    return [_address(value) for value in values or []]
+
+
+def message_to_row(msg):
+    """Column values for an ``OutboundEmail`` holding ``msg`` (attachments are not supported)"""
+    if msg.attachments:
+        raise ValueError('Queued emails cannot carry attachments')
+    return {
+        'subject': msg.subject or '',
+        'sender': _address(msg.sender),
+        'recipients': {
+            'to': _addresses(msg.recipients),
+            'cc': _addresses(msg.cc),
+            'bcc': _addresses(msg.bcc),
+        },
+        'reply_to': _address(msg.reply_to),
+        'body': msg.body,
+        'html': msg.html,
+    }
+
+
+def row_to_message(email):
+    recipients = email.recipients or {}
+    return Message(
+        subject=email.subject,
+        recipients=recipients.get('to') or [],
+        cc=recipients.get('cc') or [],
+        bcc=recipients.get('bcc') or [],
+        sender=email.sender,
+        reply_to=email.reply_to,
+        body=email.body,
+        html=email.html
+    )
+
+
+def queue_email(msg):
+    """
+    Queue ``msg`` for delivery in the current transaction (flushed; the
+    caller commits). Falls back to sending inline when ``MAIL_QUEUE_ENABLED``
+    is off. Returns the queued ``OutboundEmail`` (or None).
+    """
+    app = current_app._get_current_object()
+    if not app.config.get('MAIL_QUEUE_ENABLED', True):
+        mail.send(msg)
+        return None
+
+    email = OutboundEmail(**message_to_row(msg))
+    db.session.add(email)
+    db.session.flush()
+    return email
+
+
+def queue_emails(messages):
+    """Queue several messages in the current transaction (the caller commits); returns how many"""
+    app = current_app._get_current_object()
+    if not messages:
+        return 0
+    if not app.config.get('MAIL_QUEUE_ENABLED', True):
+        with mail.connect() as conn:
+            for msg in messages:
+                conn.send(msg)
+        return len(messages)
+
+    db.session.add_all([OutboundEmail(**message_to_row(msg)) for msg in messages])
+    db.session.flush()
+    return len(messages)
+
+
+class MailQueueMetrics:
+    """Per-minute sent/failed counts for this process (last hour)"""
+
+    def __init__(self, minutes=60):
+        self._minutes = deque(maxlen=minutes)  # [minute, sent, failed]
+        self._lock = threading.Lock()
+
+    def _bucket(self):
+        minute = int(time.time() // 60)
+        if not self._minutes or self._minutes[-1][0] != minute:
+            self._minutes.append([minute, 0, 0])
+        return self._minutes[-1]
+
+    def record(self, sent=0, failed=0):
+        with self._lock:
+            bucket = self._bucket()
+            bucket[1] += sent
+            bucket[2] += failed
+
+    def per_minute(self):
+        """``[(minute_start, sent, failed), ...]`` oldest first"""
+        with self._lock:
+            return [(datetime.fromtimestamp(m * 60), s, f) for m, s, f in self._minutes]
+
+
+metrics = MailQueueMetrics()
+
+
+def queue_stats():
+    """Queue depth by status plus deliveries in the last minute (from the table, all processes)"""
+    counts = dict(
+        db.session.query(OutboundEmail.status, db.func.count(OutboundEmail.id))
+        .group_by(OutboundEmail.status).all()
+    )
+    oldest_pending = db.session.query(db.func.min(OutboundEmail.created_at)).filter(
+        OutboundEmail.status == 'pending'
+    ).scalar()
+    now = datetime.now()
+    return {
+        'pending': counts.get('pending', 0),
+        'sending': counts.get('sending', 0),
+        'sent': counts.get('sent', 0),
+        'failed': counts.get('failed', 0),
+        'sent_last_minute': OutboundEmail.query.filter(
+            OutboundEmail.sent_at >= now - timedelta(minutes=1)
+        ).count(),
+        'oldest_pending_seconds': (now - oldest_pending).total_seconds() if oldest_pending else 0,
+    }
+
+
+def _is_connection_error(error):
+    """
+    True if ``error`` means the SMTP connection is unusable. Other SMTP errors
+    (a refused recipient, a rejected message) concern a single message;
+    ``SMTPException`` subclasses ``OSError``, so it is excluded explicitly.
+    """
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class MailQueueWorker:
+    """Claims due emails and delivers them over one reused SMTP connection"""
+
+    def __init__(self, app):
+        self.app = app
+        self.token = uuid.uuid4().hex
+        config = app.config
+        self.batch_size = config.get('MAIL_QUEUE_BATCH_SIZE', 20)
+        self.poll_interval = config.get('MAIL_QUEUE_POLL_INTERVAL', 2)
+        self.idle_timeout = config.get('MAIL_QUEUE_IDLE_TIMEOUT', 30)
+        self.max_attempts = config.get('MAIL_QUEUE_MAX_ATTEMPTS', 5)
+        self.backoff = config.get('MAIL_QUEUE_RETRY_BACKOFF', 30)
+        self.lock_timeout = config.get('MAIL_QUEUE_LOCK_TIMEOUT', 300)
+
+    def claim(self):
+        """Lock up to ``batch_size`` due emails for this worker and return them"""
+        return claim_due(OutboundEmail, self.token, self.batch_size, self.lock_timeout, 'sending')
+
+    def _mark_failed(self, email, error):
+        if not schedule_retry(email, error, self.max_attempts, self.backoff):
+            self.app.logger.error(f"Giving up on email {email.id} after {email.attempts} attempts: {error}")
+        metrics.record(failed=1)
+
+    def deliver(self, conn, emails):
+        """Send claimed emails over ``conn``; returns False if the connection broke"""
+        for index, email in enumerate(emails):
+            try:
+                conn.send(row_to_message(email))
+            except Exception as e:
+                if not _is_connection_error(e):
+                    self._mark_failed(email, e)
+                else:
+                    # Connection-level failure: requeue this and the rest, reconnect
+                    for pending in emails[index:]:
+                        self._mark_failed(pending, e)
+                    db.session.commit()
+                    return False
+            else:
+                email.status = 'sent'
+                email.sent_at = datetime.now()
+                email.locked_by = None
+                email.last_error = None
+                metrics.record(sent=1)
+            db.session.commit()
+        return True
+
+    def _release(self, error):
+        """Requeue every email this worker still holds after a connection failure"""
+        for email in OutboundEmail.query.filter_by(status='sending', locked_by=self.token).all():
+            self._mark_failed(email, error)
+        db.session.commit()
+
+    def _drain(self, emails, wait=None):
+        """
+        Deliver ``emails`` and whatever else becomes due over one connection.
+        With ``wait`` the connection stays open for ``MAIL_QUEUE_IDLE_TIMEOUT``
+        seconds of polling after the queue runs dry.
+        """
+        processed = 0
+        try:
+            with mail.connect() as conn:
+                idle_since = None
+                while True:
+                    if emails:
+                        idle_since = None
+                        processed += len(emails)
+                        if not self.deliver(conn, emails):
+                            break
+                    elif wait is None:
+                        break
+                    elif idle_since is None:
+                        idle_since = time.monotonic()
+                    elif time.monotonic() - idle_since >= self.idle_timeout:
+                        break
+                    else:
+                        wait(self.poll_interval)
+                    emails = self.claim()
+        except Exception as e:
+            db.session.rollback()
+            self.app.logger.error(f"Mail queue connection error: {e}")
+            self._release(e)
+        return processed
+
+    def run_once(self):
+        """Deliver every email that is currently due; returns the number processed"""
+        processed = 0
+        emails = self.claim()
+        while emails:
+            processed += self._drain(emails)
+            emails = self.claim()
+        return processed
+
+    def report(self):
+        """Log queue depth and this process's throughput for the last minute"""
+        stats = queue_stats()
+        recent = metrics.per_minute()[-1:] or [(None, 0, 0)]
+        self.app.logger.info(
+            f"Mail queue: {stats['pending']} pending, {stats['failed']} failed, "
+            f"oldest pending {stats['oldest_pending_seconds']:.0f}s; "
+            f"this process sent {recent[0][1]}, failed {recent[0][2]} in the current minute"
+        )
+
+    def run_forever(self, sleep=time.sleep):
+        """Poll for due emails until the process exits"""
+        last_report = time.monotonic()
+        while True:
+            with self.app.app_context():
+                try:
+                    emails = self.claim()
+                    if emails:
+                        self._drain(emails, wait=sleep)
+                    if time.monotonic() - last_report >= 60:
+                        last_report = time.monotonic()
+                        self.report()
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.error(f"Mail queue worker error: {e}")
+                finally:
+                    db.session.remove()
+            sleep(self.poll_interval)
+
+
+_workers_started = False
+_workers_lock = threading.Lock()
+
+
+def start_mail_workers(app):
+    """Start this process's ``MAIL_QUEUE_WORKERS`` green threads (once)"""
+    global _workers_started
+    count = app.config.get('MAIL_QUEUE_WORKERS', 2)
+    if _workers_started or count <= 0:
+        return
+    with _workers_lock:
+        if _workers_started:
+            return
+        _workers_started = True
+
+    for _ in range(count):
+        socketio.start_background_task(MailQueueWorker(app).run_forever, socketio.sleep)
@@ -0,0 +1,123 @@
+"""
+Commit-time change hooks for per-worker caches.
+
+A callback registered with ``on_models_committed`` runs once after any
+transaction that inserted, updated or deleted rows of the given models has
+committed. Bulk ``query.update()`` / ``query.delete()`` calls are tracked too;
+with ``bulk_only=True`` a callback only runs for those, for caches that patch
+themselves from individual changes but cannot follow a bulk statement.
+Callbacks run after the commit, so they must not touch the session; they are
+meant for cheap work such as bumping a cache version.
+
+``after_commit`` defers one callback, such as a socket emit or a cache patch
+computed in a flush, until the current transaction commits. It is dropped if
+the savepoint or transaction it was registered in rolls back.
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import Session, scoped_session
+import logging
+
+logger = logging.getLogger(__name__)
+
+_TOUCHED_KEY = '_touched_models'
+_BULK_KEY = '_bulk_touched_models'
+_AFTER_COMMIT_KEY = '_after_commit'
+_subscribers = []
+
+
+def on_models_committed(models, callback, bulk_only=False):
+    """Call ``callback(touched_models)`` after commits that change any of ``models``"""
+    if not isinstance(models, (list, tuple, set, frozenset)):
+        models = (models,)
+    _subscribers.append((tuple(models), callback, bulk_only))
+    return callback
+
+
+def after_commit(session, callback):
+    """
+    Call ``callback()`` once ``session``'s transaction commits, or now if no
+    transaction is in progress. Register it after the work it announces has
+    been flushed: a rollback of the transaction discards it.
+    """
+    if isinstance(session, scoped_session):
+        session = session()
+    if not session.in_transaction():
+        callback()
+        return
+    # Tagged with the innermost savepoint (or the root transaction) it belongs to
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    session.info.setdefault(_AFTER_COMMIT_KEY, []).append([transaction, callback])
+
+
+def _touched(session):
+    return session.info.setdefault(_TOUCHED_KEY, set())
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_flushed_models(session, flush_context):
+    touched = _touched(session)
+    for obj in session.new:
+        touched.add(type(obj))
+    for obj in session.deleted:
+        touched.add(type(obj))
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            touched.add(type(obj))
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_bulk_models(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        session = orm_execute_state.session
+        _touched(session).add(mapper.class_)
+        session.info.setdefault(_BULK_KEY, set()).add(mapper.class_)
+
+
+@event.listens_for(Session, 'after_commit')
+def _dispatch_committed_models(session):
+    # after_commit also fires when a savepoint is released: its callbacks now
+    # belong to the enclosing transaction. Everything else waits for the root.
+    savepoint = session.get_nested_transaction()
+    if savepoint is not None:
+        enclosing = savepoint.parent
+        while enclosing.parent is not None and not enclosing.nested:
+            enclosing = enclosing.parent
+        for entry in session.info.get(_AFTER_COMMIT_KEY, ()):
+            if entry[0] is savepoint:
+                entry[0] = enclosing
+        return
+
+    touched = session.info.pop(_TOUCHED_KEY, None) or ()
+    bulk = session.info.pop(_BULK_KEY, None) or ()
+    for models, callback, bulk_only in _subscribers:
+        hits = {cls for cls in (bulk if bulk_only else touched) if issubclass(cls, models)}
+        if not hits:
+            continue
+        try:
+            callback(hits)
+        except Exception as e:
+            logger.error(f"Error running commit hook {callback!r}: {e}")
+
+    for _, callback in session.info.pop(_AFTER_COMMIT_KEY, ()):
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Error running after-commit callback {callback!r}: {e}")
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _discard_uncommitted(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_TOUCHED_KEY, None)
+        session.info.pop(_BULK_KEY, None)
+        session.info.pop(_AFTER_COMMIT_KEY, None)
+    elif transaction.nested and _AFTER_COMMIT_KEY in session.info:
+        # A released savepoint has handed its callbacks on already, so any
+        # still tagged with it were registered in a savepoint that rolled back.
+        # Touched models are kept: invalidating a cache needlessly is harmless.
+        session.info[_AFTER_COMMIT_KEY] = [
+            entry for entry in session.info[_AFTER_COMMIT_KEY] if entry[0] is not transaction
+        ]
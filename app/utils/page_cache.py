@@ -0,0 +1,186 @@
+"""
+Full-page cache for anonymous visitors.
+
+``@cached_page(*tags)`` stores a view's rendered page in the shared cache,
+keyed on host, path and the query args the view declares. Only anonymous GETs
+with no pending flash messages and no undeclared query args are cached
+(tracking args such as utm_* are ignored). Logged-in users always get a
+freshly rendered page.
+
+Tags are fragment-cache namespaces (``app.utils.fragment_cache``). A page
+records each tag's version when it is rendered. A commit that touches a
+tagged model moves that tag to a new version, which purges exactly the pages
+carrying the tag. The tags are also sent as a ``Surrogate-Key`` header, so a
+CDN can purge by the same keys.
+
+Entries are stale-while-revalidate. A page is fresh for PAGE_CACHE_TTL
+seconds while its tags are current, and is kept for a further
+PAGE_CACHE_STALE_TTL seconds. Regeneration is single-flight: a cache ``add``
+lock lets one request re-render while concurrent ones get the stale copy. If
+the page has only expired, the lock holder also gets the stale copy, and the
+page is re-rendered after that response has been sent. If a tag purged it,
+the lock holder waits for the new page.
+
+Pages with a form get a placeholder instead of a CSRF token when rendered
+for the cache. Each visitor's own token is substituted when the page is
+served, and those responses are marked private so that no shared cache
+stores them.
+"""
+from app.extensions import cache
+from app.utils.fragment_cache import namespace_version
+from flask import current_app, g, request, session, make_response, copy_current_request_context
+from flask_login import current_user
+from flask_wtf.csrf import generate_csrf
+from functools import wraps
+from urllib.parse import urlencode
+import hashlib
+import time
+
+CSRF_PLACEHOLDER = '__page_cache_csrf_token__'
+LOCK_TIMEOUT = 30
+IGNORED_ARGS = ('gclid', 'fbclid', 'msclkid', 'ref')
+
+
+def _cache_call(method, *args, **kwargs):
+    try:
+        return getattr(cache, method)(*args, **kwargs)
+    except Exception as e:
+        current_app.logger.warning(f"Page cache {method} failed: {str(e)}")
+        return None
+
+
+def _csrf_token():
+    if g.get('_page_cache_rendering'):
+        return CSRF_PLACEHOLDER
+    return generate_csrf()
+
+
+def init_page_cache(app):
+    """Register the CSRF placeholder; call after ``csrf.init_app``"""
+    # Registered after Flask-WTF's context processor, so this csrf_token wins
+    app.context_processor(lambda: {'csrf_token': _csrf_token})
+
+
+def _page_key(query_args):
+    """Cache key for the current request, or None when it must not be cached"""
+    if request.method != 'GET' or current_user.is_authenticated or '_flashes' in session:
+        return None
+    args = []
+    for name in sorted(request.args):
+        if name in query_args:
+            args.extend((name, value) for value in request.args.getlist(name))
+        elif not (name.startswith('utm_') or name in IGNORED_ARGS):
+            return None
+    url = f'{request.scheme}://{request.host}{request.path}?{urlencode(args)}'
+    return 'page:' + hashlib.sha1(url.encode()).hexdigest()
+
+
+def _tags_current(versions):
+    return all(namespace_version(tag) == version for tag, version in versions.items())
+
+
+def _render(key, tags, view):
+    """Render the page for the cache; returns ``(entry, response)``, entry None if uncacheable"""
+    # Read versions first so a change committed mid-render leaves this copy stale
+    versions = {tag: namespace_version(tag) for tag in tags}
+    g._page_cache_rendering = True
+    try:
+        response = make_response(view())
+    finally:
+        g._page_cache_rendering = False
+
+    if (response.status_code != 200 or response.mimetype != 'text/html' or response.is_streamed
+            or session.modified or 'Set-Cookie' in response.headers):
+        if not response.is_streamed:
+            _fill_csrf(response)
+        return None, response
+
+    entry = {
+        'body': response.get_data(),
+        'mimetype': response.mimetype,
+        'tags': versions,
+        'created': time.time(),
+    }
+    config = current_app.config
+    timeout = config.get('PAGE_CACHE_TTL', 300) + config.get('PAGE_CACHE_STALE_TTL', 3600)
+    _cache_call('set', key, entry, timeout=timeout)
+    return entry, response
+
+
+def _refresh(key, tags, view):
+    try:
+        _render(key, tags, view)
+    except Exception as e:
+        current_app.logger.error(f"Error refreshing cached page {request.path}: {str(e)}")
+    finally:
+        _cache_call('delete', key + ':lock')
+
+
+def _fill_csrf(response):
+    """Put this visitor's CSRF token in place of the placeholder; True if there was one"""
+    body = response.get_data()
+    if CSRF_PLACEHOLDER.encode() not in body:
+        return False
+    response.set_data(body.replace(CSRF_PLACEHOLDER.encode(), generate_csrf().encode()))
+    return True
+
+
+def _respond(entry, tags, state):
+    response = make_response(entry['body'])
+    response.mimetype = entry['mimetype']
+    if _fill_csrf(response):
+        response.headers['Cache-Control'] = 'private, max-age=0'
+    else:
+        config = current_app.config
+        response.headers['Cache-Control'] = (
+            f"public, max-age=0, s-maxage={config.get('PAGE_CACHE_TTL', 300)}, "
+            f"stale-while-revalidate={config.get('PAGE_CACHE_STALE_TTL', 3600)}"
+        )
+    if tags:
+        response.headers['Surrogate-Key'] = ' '.join(tags)
+    response.headers['X-Cache'] = state
+    response.vary.add('Cookie')
+    return response
+
+
+def cached_page(*tags, query_args=()):
+    """
+    Cache the decorated view's page for anonymous visitors. ``tags`` name the
+    content it shows; ``query_args`` are the args that select different content.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = _page_key(query_args)
+            if key is None:
+                response = make_response(view(*args, **kwargs))
+                response.vary.add('Cookie')
+                return response
+
+            render = lambda: view(*args, **kwargs)
+            entry = _cache_call('get', key)
+            if entry is not None:
+                purged = not _tags_current(entry['tags'])
+                if not purged and time.time() - entry['created'] < current_app.config.get('PAGE_CACHE_TTL', 300):
+                    return _respond(entry, tags, 'HIT')
+                # Single flight: only the lock holder re-renders; everyone else gets the stale copy
+                if not _cache_call('add', key + ':lock', 1, timeout=LOCK_TIMEOUT):
+                    return _respond(entry, tags, 'STALE')
+                if purged:
+                    # Content changed: the lock holder waits for the new page
+                    try:
+                        entry, response = _render(key, tags, render)
+                    finally:
+                        _cache_call('delete', key + ':lock')
+                    return response if entry is None else _respond(entry, tags, 'MISS')
+                # Merely expired: serve it, re-render after the response is sent
+                response = _respond(entry, tags, 'STALE')
+                response.call_on_close(copy_current_request_context(lambda: _refresh(key, tags, render)))
+                return response
+
+            entry, response = _render(key, tags, render)
+            if entry is None:
+                return response
+            return _respond(entry, tags, 'MISS')
+        return wrapper
+    return decorator
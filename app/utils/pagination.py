@@ -0,0 +1,86 @@
+"""
+Keyset (cursor) pagination.
+
+A page is addressed by an opaque cursor that encodes the sort key of the last
+row already served, so every page is an index range scan that costs the same
+as the first one (no OFFSET scan). ``has_more`` is found by fetching one row
+more than the page size instead of running a COUNT.
+"""
+from app.extensions import db
+from datetime import datetime
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that cannot be decoded"""
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(values):
+    """Encode a row's sort key as an opaque URL-safe token"""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Decode a token produced by ``encode_cursor`` into ``size`` key values"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError('wrong key size')
+        return [_decode_value(v) for v in values]
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+
+
+def clamp_limit(value, default=20, maximum=100):
+    """Parse a client-supplied page size, falling back to ``default``"""
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+class KeysetPage:
+    """One page of rows plus the cursor for the next page"""
+
+    def __init__(self, items, next_cursor, has_more):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.has_more = has_more
+
+
+def keyset_paginate(query, columns, cursor=None, limit=20, descending=True):
+    """
+    Fetch one page of ``query`` ordered by ``columns`` (the last column must be
+    unique, e.g. the primary key). Rows may be entities or projections; the key
+    of the last row is read by column name.
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(columns))
+        key, after = db.tuple_(*columns), db.tuple_(*values)
+        query = query.filter(key < after if descending else key > after)
+
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+    rows = query.limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor([getattr(rows[-1], c.key) for c in columns])
+    return KeysetPage(rows, next_cursor, has_more)
@@ -0,0 +1,94 @@
+"""
+Versioned per-worker cache for small, rarely changing read models.
+
+A ``WorkerCache`` lazily builds a value once per worker and keeps serving it
+until either a commit touches one of its source models (in this worker) or
+its TTL expires (which bounds staleness across workers).
+"""
+from app.utils.model_events import on_models_committed
+from flask import current_app
+import threading
+import time
+
+
+class WorkerCache:
+    """Lazily built, commit-invalidated value shared by all requests in a worker"""
+
+    def __init__(self, name, builder, models=(), ttl_config=None, default_ttl=300):
+        self.name = name
+        self.builder = builder
+        self.ttl_config = ttl_config
+        self.default_ttl = default_ttl
+        self.version = 0
+
+        self._lock = threading.Lock()
+        self._value = None
+        self._built_version = -1
+        self._built_at = 0.0
+
+        if models:
+            on_models_committed(models, self.invalidate)
+
+    def invalidate(self, *args):
+        """Mark the cached value stale; the next ``get`` rebuilds it"""
+        self.version += 1
+
+    def patch(self, func):
+        """Apply ``func(value)`` to the current value in place (no-op when it is stale or unbuilt)"""
+        with self._lock:
+            if self._built_version == self.version and self._value is not None:
+                func(self._value)
+
+    def _ttl(self):
+        if self.ttl_config:
+            return current_app.config.get(self.ttl_config, self.default_ttl)
+        return self.default_ttl
+
+    def _is_fresh(self, ttl):
+        if self._built_version != self.version:
+            return False
+        return ttl <= 0 or (time.monotonic() - self._built_at) < ttl
+
+    def get(self):
+        """Return the cached value, rebuilding it if stale"""
+        ttl = self._ttl()
+        if self._is_fresh(ttl):
+            return self._value
+
+        with self._lock:
+            if self._is_fresh(ttl):
+                return self._value
+            # Read the version before building so a change committed
+            # mid-build leaves the new value stale instead of losing it.
+            version = self.version
+            value = self.builder(version)
+            self._value = value
+            self._built_version = version
+            self._built_at = time.monotonic()
+            current_app.logger.debug(f"Rebuilt {self.name} cache (v{version})")
+            return value
+
+
+class LazyCachedList:
+    """
+    Read-only sequence proxy over a ``WorkerCache`` holding a list.
+    Nothing is loaded until a template iterates, indexes or tests it.
+    """
+
+    def __init__(self, cache):
+        self._cache = cache
+
+    def __iter__(self):
+        return iter(self._cache.get())
+
+    def __len__(self):
+        return len(self._cache.get())
+
+    def __bool__(self):
+        return bool(self._cache.get())
+
+    def __getitem__(self, index):
+        return self._cache.get()[index]
+
+    def __repr__(self):
+        return f'<LazyCachedList {self._cache.name}>'
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+from sqlalchemy import event
+
+os.environ['ENVIRONMENT'] = 'testing'
+
+from app import create_app
+from app.extensions import db
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    with app.app_context():
+        # pysqlite only opens a transaction before DML, so a leading SAVEPOINT
+        # would run (and its RELEASE commit) outside one. Begin explicitly, as
+        # PostgreSQL does, so savepoints and rollbacks behave as in production.
+        @event.listens_for(db.engine, 'connect')
+        def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(db.engine, 'begin')
+        def _begin(conn):
+            conn.exec_driver_sql('BEGIN')
+    return app
+
+
+@pytest.fixture
+def session(app):
+    """A fresh in-memory database inside an app context"""
+    with app.app_context():
+        db.create_all()
+        try:
+            yield db.session
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+
+@pytest.fixture
+def make_user(session):
+    from app.models.user import User, GenderEnum
+
+    def make_user(username, **kwargs):
+        user = User(username=username, email=f'{username}@example.com', gender=GenderEnum.female, **kwargs)
+        user.set_password('password')
+        session.add(user)
+        session.commit()
+        return user
+    return make_user
+
+
+@pytest.fixture
+def make_order(session):
+    from app.models.order import Order
+
+    def make_order(client, due_date, status='active', **kwargs):
+        order = Order(
+            order_number=Order.generate_order_number(), client_id=client.id, service_id=1,
+            academic_level_id=1, deadline_id=1, title='Essay', description='Essay',
+            word_count=275, page_count=1, total_price=10, status=status, due_date=due_date, **kwargs
+        )
+        session.add(order)
+        return order
+    return make_order
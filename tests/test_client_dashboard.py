@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from app.extensions import db
+from app.models.order import Order
+from app.services.client_dashboard import ClientOrderStats
+
+
+def test_a_rolled_back_savepoint_does_not_hide_the_clients_committed_order(session, make_user, make_order):
+    client = make_user('steady')
+    ClientOrderStats.invalidate()
+    assert ClientOrderStats.get(client.id)['total_orders'] == 0
+
+    make_order(client, datetime(2026, 1, 10))
+    try:
+        with db.session.begin_nested():
+            make_order(client, datetime(2026, 1, 10))
+            db.session.flush()
+            raise ValueError('savepoint only')
+    except ValueError:
+        pass
+    session.commit()
+
+    assert ClientOrderStats.get(client.id)['total_orders'] == 1
+
+
+def test_bulk_updates_drop_every_client(session, make_user, make_order):
+    client = make_user('swept')
+    make_order(client, datetime(2026, 1, 10), status='pending')
+    session.commit()
+    assert ClientOrderStats.get(client.id)['order_status_counts'] == {'pending': 1}
+
+    db.session.execute(db.update(Order).values(status='active').execution_options(synchronize_session=False))
+    session.commit()
+
+    assert ClientOrderStats.get(client.id)['order_status_counts'] == {'active': 1}
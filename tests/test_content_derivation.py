@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from app.models.service import Service
+from app.services.content_derivation import ContentDerivation
+
+
+def test_backfill_derives_rows_without_touching_updated_at(session):
+    edited = datetime(2025, 3, 1, 9, 30)
+    session.add(Service(name='Essays', slug='essays', description='<h2>Essays</h2><p>Any topic.</p>'))
+    session.commit()
+    service = Service.query.one()
+    service.plain_excerpt, service.updated_at = None, edited
+    session.commit()
+
+    assert ContentDerivation.backfill(Service, workers=1) == 1
+    session.expire_all()
+    service = Service.query.one()
+    assert service.plain_excerpt == 'Any topic.'
+    assert service.updated_at == edited
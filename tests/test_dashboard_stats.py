@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from app.extensions import db
+from app.models.order import Order
+from app.services.dashboard_stats import DashboardStats
+
+
+def test_committed_orders_patch_the_snapshot_and_savepoint_rollbacks_do_not(session, make_user, make_order):
+    client = make_user('counted')
+    DashboardStats.invalidate()
+    assert DashboardStats.snapshot()['orders_count'] == 0
+
+    make_order(client, datetime(2026, 1, 10), status='pending')
+    try:
+        with db.session.begin_nested():
+            make_order(client, datetime(2026, 1, 10), status='pending')
+            db.session.flush()
+            raise ValueError('savepoint only')
+    except ValueError:
+        pass
+    session.commit()
+
+    stats = DashboardStats.snapshot()
+    assert stats['orders_by_status']['pending'] == 1
+    assert stats['built_at'] == DashboardStats.snapshot()['built_at']
+
+
+def test_bulk_updates_mark_the_snapshot_stale(session, make_user, make_order):
+    make_order(make_user('bulk'), datetime(2026, 1, 10), status='pending')
+    session.commit()
+    DashboardStats.invalidate()
+    built_at = DashboardStats.snapshot()['built_at']
+
+    db.session.execute(db.update(Order).values(status='active').execution_options(synchronize_session=False))
+    session.commit()
+
+    stats = DashboardStats.snapshot()
+    assert stats['built_at'] > built_at
+    assert stats['orders_by_status'] == {'active': 1}
@@ -0,0 +1,75 @@
+from datetime import datetime
+import csv
+import io
+import json
+
+import pytest
+
+from app.models.payment import Payment
+from app.services.admin_filters import filter_payments
+from app.services.exports import ExportService
+
+
+def _users(make_user, count):
+    return [make_user(f'user{i}') for i in range(count)]
+
+
+def test_csv_yields_the_header_then_one_chunk_per_partition(session, make_user):
+    _users(make_user, 5)
+
+    chunks = list(ExportService.stream('users', 'csv', chunk_size=2))
+
+    assert len(chunks) == 4
+    rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+    assert rows[0][:3] == ['id', 'username', 'email']
+    assert [row[1] for row in rows[1:]] == [f'user{i}' for i in range(5)]
+
+
+def test_ndjson_yields_one_chunk_per_partition(session, make_user):
+    _users(make_user, 5)
+
+    chunks = list(ExportService.stream('users', 'ndjson', chunk_size=2))
+
+    assert [chunk.count(b'\n') for chunk in chunks] == [2, 2, 1]
+    records = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert [record['username'] for record in records] == [f'user{i}' for i in range(5)]
+    assert isinstance(records[0]['created_at'], str)
+
+
+def test_an_empty_result_is_just_the_header(session, make_user):
+    _users(make_user, 2)
+    filters = {'search': 'nobody'}
+
+    assert b''.join(ExportService.stream('users', 'csv', filters, chunk_size=2)).decode('utf-8').splitlines() == [
+        'id,username,email,first_name,last_name,phone_number,is_admin,email_verified,created_at'
+    ]
+    assert list(ExportService.stream('users', 'ndjson', filters, chunk_size=2)) == []
+
+
+def test_payment_search_matches_the_list_page_without_an_order(session, make_user):
+    client = make_user('payer')
+    payment = Payment(order_id=999, user_id=client.id, amount=10, method='paypal')
+    session.add(payment)
+    session.commit()
+    filters = {'search': payment.payment_id}
+
+    listed = filter_payments(Payment.query, **filters).all()
+    exported = [json.loads(line) for chunk in ExportService.stream('payments', 'ndjson', filters) for line in chunk.splitlines()]
+
+    assert listed == [payment]
+    assert [record['payment_id'] for record in exported] == [payment.payment_id]
+    assert exported[0]['order_number'] is None
+
+
+def test_parquet_ends_with_a_readable_footer(session, make_user):
+    pq = pytest.importorskip('pyarrow.parquet')
+    _users(make_user, 5)
+
+    data = b''.join(ExportService.stream('users', 'parquet', chunk_size=2))
+
+    assert data[:4] == data[-4:] == b'PAR1'
+    table = pq.read_table(io.BytesIO(data))
+    assert table.num_rows == 5
+    assert pq.ParquetFile(io.BytesIO(data)).num_row_groups == 3
+    assert table.column('created_at').type.unit == 'us'
+    assert isinstance(table.column('created_at')[0].as_py(), datetime)
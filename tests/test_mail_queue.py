@@ -0,0 +1,125 @@
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+from flask_mail import Message
+
+from app.extensions import mail
+from app.models.communication import OutboundEmail
+from app.utils.mail_queue import MailQueueWorker, queue_email, queue_emails
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class RecordingHandler:
+    """Accepts every message except those to ``refused@...`` addresses"""
+
+    def __init__(self):
+        self.sessions = 0
+        self.messages = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith('refused@'):
+            return '550 No such user'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return '250 OK'
+
+
+@pytest.fixture
+def use_smtp(app):
+    """Point Flask-Mail at ``port`` on localhost (and really send) for the rest of the test"""
+    original = {key: app.config[key] for key in ('MAIL_SERVER', 'MAIL_PORT')}
+
+    def use_smtp(port):
+        app.config.update(MAIL_SERVER='127.0.0.1', MAIL_PORT=port, MAIL_SUPPRESS_SEND=False)
+        mail.init_app(app)
+
+    yield use_smtp
+    app.config.update(original)
+    app.config.pop('MAIL_SUPPRESS_SEND', None)
+    mail.init_app(app)
+
+
+@pytest.fixture
+def smtp_server(use_smtp):
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname='127.0.0.1', port=free_port())
+    controller.start()
+    use_smtp(controller.port)
+    yield handler
+    controller.stop()
+
+
+def message(to):
+    return Message('Hello', recipients=[to], sender='no-reply@example.com', body='Hi there')
+
+
+def test_queue_email_leaves_the_commit_to_the_caller(session):
+    queue_email(message('a@example.com'))
+    assert OutboundEmail.query.count() == 1
+
+    session.rollback()
+    assert OutboundEmail.query.count() == 0
+
+    queue_emails([message('a@example.com'), message('b@example.com')])
+    session.commit()
+    assert OutboundEmail.query.filter_by(status='pending').count() == 2
+
+
+def test_worker_delivers_a_batch_over_one_connection(app, session, smtp_server):
+    queue_emails([message(f'user{i}@example.com') for i in range(6)])
+    session.commit()
+
+    assert MailQueueWorker(app).run_once() == 6
+
+    assert OutboundEmail.query.filter_by(status='sent').count() == 6
+    assert sorted(envelope.rcpt_tos[0] for envelope in smtp_server.messages) == [
+        f'user{i}@example.com' for i in range(6)
+    ]
+    assert smtp_server.sessions == 1
+
+
+def test_refused_recipient_only_fails_its_own_message(app, session, smtp_server):
+    queue_emails([message('first@example.com'), message('refused@example.com'), message('last@example.com')])
+    session.commit()
+
+    MailQueueWorker(app).run_once()
+
+    refused = OutboundEmail.query.filter_by(status='pending').one()
+    assert refused.recipients['to'] == ['refused@example.com']
+    assert refused.attempts == 1
+    assert 'No such user' in refused.last_error
+    assert OutboundEmail.query.filter_by(status='sent').count() == 2
+    assert [envelope.rcpt_tos for envelope in smtp_server.messages] == [['first@example.com'], ['last@example.com']]
+    assert smtp_server.sessions == 1
+
+
+def test_unreachable_server_retries_until_failed(app, session, use_smtp):
+    use_smtp(free_port())
+    queue_emails([message('a@example.com'), message('b@example.com')])
+    session.commit()
+    worker = MailQueueWorker(app)
+    worker.max_attempts = 2
+
+    worker.run_once()
+    emails = OutboundEmail.query.order_by(OutboundEmail.id).all()
+    assert [(email.status, email.attempts) for email in emails] == [('pending', 1), ('pending', 1)]
+
+    OutboundEmail.query.update({'next_attempt_at': OutboundEmail.created_at})
+    session.commit()
+    worker.run_once()
+    session.expire_all()
+    assert [(email.status, email.attempts) for email in emails] == [('failed', 2), ('failed', 2)]
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+from app.extensions import socketio
+from app.models.communication import Notification
+from app.models.outbox import OutboxEvent
+from app.services.order_lifecycle import OrderLifecycleService
+from app.services.triggers.outbox import OutboxDispatcher
+
+
+def test_each_overdue_order_gets_its_own_event_and_an_overdue_message(app, session, make_user, make_order, monkeypatch):
+    monkeypatch.setattr(socketio, 'emit', lambda *args, **kwargs: None)
+    client = make_user('late')
+    now = datetime(2026, 1, 10, 12)
+    orders = [make_order(client, now - timedelta(days=1)), make_order(client, now - timedelta(hours=1))]
+    make_order(client, now + timedelta(days=1))
+    session.commit()
+
+    moved = OrderLifecycleService.sweep(now=now)
+    assert moved['overdue'] == sorted(order.id for order in orders)
+    events = OutboxEvent.query.order_by(OutboxEvent.id).all()
+    assert [event.payload['order_id'] for event in events] == moved['overdue']
+    assert len({event.idempotency_key for event in events}) == 2
+
+    # Sweeping again after a deadline extension and a new due date publishes again
+    orders[0].status, orders[0].due_date = 'active', now + timedelta(hours=1)
+    session.commit()
+    assert OrderLifecycleService.sweep(now=now + timedelta(hours=2))['overdue'] == [orders[0].id]
+    assert OutboxEvent.query.count() == 3
+
+    OutboxDispatcher(app).run_once()
+    notifications = Notification.query.all()
+    assert len(notifications) == 3
+    assert all('passed its due date' in notification.message for notification in notifications)
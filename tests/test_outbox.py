@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db, socketio
+from app.models.communication import Notification
+from app.models.outbox import OutboxEvent
+from app.services.triggers.outbox import OutboxDispatcher, outbox_handler, publish_event
+from app.sockets.utils import send_system_notification
+from app.utils.model_events import after_commit
+
+failures = []
+
+
+@outbox_handler('test.notify')
+def _notify_then_maybe_fail(payload):
+    for user_id in payload['user_ids']:
+        send_system_notification(user_id, 'Hello', 'Hi')
+    if failures:
+        raise RuntimeError(failures.pop())
+
+
+@pytest.fixture
+def emits(monkeypatch):
+    sent = []
+    monkeypatch.setattr(socketio, 'emit', lambda event, data, room=None: sent.append((event, room)))
+    return sent
+
+
+def test_duplicate_key_is_a_no_op_that_keeps_the_callers_changes(session, make_user):
+    assert publish_event('test.notify', {'user_ids': []}, key='once') is not None
+    session.commit()
+
+    user = make_user('caller')
+    user.first_name = 'Changed'
+    assert publish_event('test.notify', {'user_ids': []}, key='once') is None
+    session.commit()
+
+    session.expire_all()
+    assert user.first_name == 'Changed'
+    assert OutboxEvent.query.count() == 1
+
+
+def test_callers_integrity_error_is_not_swallowed(session, make_user):
+    make_user('taken')
+    from app.models.user import User, GenderEnum
+    session.add(User(username='taken', email='other@example.com', password_hash='x', gender=GenderEnum.male))
+
+    with pytest.raises(IntegrityError):
+        publish_event('test.notify', {'user_ids': []})
+
+
+def test_failed_handler_leaves_nothing_behind_and_retries_once(app, session, make_user, emits):
+    users = [make_user('first'), make_user('second')]
+    publish_event('test.notify', {'user_ids': [user.id for user in users]})
+    session.commit()
+    dispatcher = OutboxDispatcher(app)
+
+    failures.append('crashed after notifying')
+    dispatcher.run_once()
+    event = OutboxEvent.query.one()
+    assert (event.status, event.attempts) == ('pending', 1)
+    assert Notification.query.count() == 0
+    assert emits == []
+
+    event.next_attempt_at = event.created_at
+    session.commit()
+    dispatcher.run_once()
+    assert OutboxEvent.query.one().status == 'done'
+    assert Notification.query.count() == 2
+    assert sorted(emits) == [('new_notification', f'user_{user.id}') for user in users]
+
+
+def test_after_commit_callbacks_survive_a_savepoint_and_die_with_a_rollback(session, make_user):
+    user = make_user('someone')
+    calls = []
+    user.first_name = 'Pending'
+    after_commit(db.session, lambda: calls.append('kept'))
+    try:
+        with db.session.begin_nested():
+            raise ValueError('savepoint only')
+    except ValueError:
+        pass
+    session.commit()
+    assert calls == ['kept']
+
+    user.first_name = 'Rolled back'
+    after_commit(db.session, lambda: calls.append('dropped'))
+    session.rollback()
+    session.commit()
+    assert calls == ['kept']
+
+
+def test_order_paid_notifies_the_client_and_the_admins(app, session, make_user, make_order, emits):
+    from datetime import datetime
+    from app.services.triggers.triggers import handle_payment_completion
+
+    client, admin = make_user('payer'), make_user('boss', is_admin=True)
+    order = make_order(client, datetime(2026, 1, 10))
+    session.commit()
+    handle_payment_completion(order.id, payment_id=1)
+    session.commit()
+
+    OutboxDispatcher(app).run_once()
+    assert OutboxEvent.query.one().status == 'done'
+    notifications = {(n.user_id, n.title) for n in Notification.query}
+    assert notifications == {(client.id, 'Payment Confirmed'), (admin.id, 'Payment Completed')}
@@ -0,0 +1,102 @@
+import time
+
+import fakeredis
+import pytest
+
+from app.sockets.presence import MemoryPresence, RedisPresence
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def redis_backend(server, ttl=90):
+    return RedisPresence(fakeredis.FakeRedis(server=server, decode_responses=True), ttl=ttl)
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def backend(request, server):
+    if request.param == 'memory':
+        return MemoryPresence(ttl=90)
+    return redis_backend(server)
+
+
+def test_join_and_leave(backend):
+    backend.join(1, 'sid-a')
+    backend.join(1, 'sid-b')
+    backend.join(2, 'sid-c')
+
+    assert backend.is_online(1)
+    assert backend.online_among([1, 2, 3]) == {'1', '2'}
+    assert sorted(backend.online_users()) == ['1', '2']
+
+    # One of two tabs closing leaves the user online
+    backend.leave(1, 'sid-a')
+    assert backend.is_online(1)
+
+    backend.leave(1, 'sid-b')
+    assert not backend.is_online(1)
+    assert backend.online_users() == ['2']
+
+
+def test_leave_unknown_session_is_harmless(backend):
+    backend.leave(7, 'never-joined')
+    assert not backend.is_online(7)
+    assert backend.online_among([]) == set()
+
+
+def test_redis_last_leave_removes_the_key(server):
+    backend = redis_backend(server)
+    backend.join(5, 'sid')
+    backend.leave(5, 'sid')
+    assert not fakeredis.FakeRedis(server=server).exists('presence:user:5')
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake wall clock, shared by the backend and the fake Redis server"""
+    now = [time.time()]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    return now
+
+
+def test_redis_key_expires_without_heartbeat(server, clock):
+    backend = redis_backend(server, ttl=30)
+    backend.join(1, 'sid')
+
+    # A heartbeat from the owning worker pushes the expiry forward
+    clock[0] += 20
+    backend.heartbeat({'sid': 1})
+    clock[0] += 20
+    assert backend.is_online(1)
+
+    # A session nobody refreshes disappears with its key
+    clock[0] += 31
+    assert not backend.is_online(1)
+    assert backend.online_users() == []
+
+
+def test_redis_heartbeat_prunes_sessions_of_a_dead_worker(server, clock):
+    live_worker = redis_backend(server, ttl=30)
+    dead_worker = redis_backend(server, ttl=30)
+    dead_worker.join(1, 'dead-sid')
+    live_worker.join(1, 'live-sid')
+
+    # Only the live worker keeps heartbeating, past the dead one's expiry
+    clock[0] += 20
+    live_worker.heartbeat({'live-sid': 1})
+    clock[0] += 20
+    live_worker.heartbeat({'live-sid': 1})
+
+    assert live_worker.client.hkeys('presence:user:1') == ['live-sid']
+    assert live_worker.is_online(1)
+
+
+def test_memory_sessions_expire_without_heartbeat(monkeypatch):
+    backend = MemoryPresence(ttl=30)
+    backend.join(1, 'sid')
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 31)
+    assert not backend.is_online(1)
+    assert backend.online_users() == []
@@ -0,0 +1,66 @@
+from app.models.blog import BlogCategory, BlogPost
+from app.services.search import SearchIndex, analyze, stem
+
+
+def _post(session, category=None, **kwargs):
+    post = BlogPost(
+        title=kwargs.pop('title', 'Writing a literature review'), slug=kwargs.pop('slug', 'literature-review'),
+        content=kwargs.pop('content', '<p>Sources, themes and gaps.</p>'), author='Editor', category=category,
+        is_published=kwargs.pop('is_published', True), **kwargs
+    )
+    session.add(post)
+    session.commit()
+    return post
+
+
+def _found(query):
+    return [(doc_type, doc_id) for doc_type, doc_id, _ in SearchIndex.search(query)]
+
+
+def test_analyze_drops_stopwords_and_stems():
+    assert analyze('The writers are writing') == [stem('writers'), stem('writing')]
+    assert stem('writing') == stem('writes') == stem('write')
+
+
+def test_saved_posts_are_indexed_and_ranked_by_title(session):
+    review = _post(session)
+    other = _post(session, title='Formatting references', slug='references', content='<p>A literature list.</p>')
+
+    assert _found('literature') == [('blog', review.id), ('blog', other.id)]
+    assert _found('nothing here') == []
+
+
+def test_unpublishing_and_deleting_remove_the_post(session):
+    post = _post(session)
+    post.is_published = False
+    session.commit()
+    assert _found('literature') == []
+
+    post.is_published = True
+    session.commit()
+    assert _found('literature') == [('blog', post.id)]
+
+    session.delete(post)
+    session.commit()
+    assert _found('literature') == []
+
+
+def test_renaming_a_category_reindexes_its_posts(session):
+    category = BlogCategory(name='Guides', slug='guides')
+    post = _post(session, category=category)
+    assert ('blog', post.id) in _found('guides')
+
+    category.name = 'Tutorials'
+    session.commit()
+
+    assert _found('tutorials') == [('blog_category', category.id), ('blog', post.id)]
+    assert _found('guides') == []
+
+
+def test_suggest_completes_the_last_word(session):
+    post = _post(session)
+
+    assert SearchIndex.suggest('review lit') == [
+        {'type': 'blog', 'id': post.id, 'title': post.title, 'slug': post.slug}
+    ]
+    assert SearchIndex.suggest('l') == []
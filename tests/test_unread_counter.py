@@ -0,0 +1,87 @@
+from app.extensions import socketio
+from app.models.communication import Chat, ChatMessage, Notification, UnreadCounter
+from app.services import notification_services
+
+
+def add_notification(session, user, is_read=False):
+    notification = Notification(user_id=user.id, title='Hello', message='Hi', is_read=is_read)
+    session.add(notification)
+    session.commit()
+    return notification
+
+
+def test_mark_as_read_seeds_an_unseeded_counter_correctly(session, make_user):
+    user = make_user('reader')
+    first = add_notification(session, user)
+    add_notification(session, user)
+    assert session.get(UnreadCounter, user.id) is None
+
+    first.mark_as_read()
+
+    assert UnreadCounter.get_counts(user.id) == (0, 1)
+    assert UnreadCounter.get_notification_totals(user.id) == (1, 2)
+
+
+def test_mark_as_read_adjusts_an_existing_counter(session, make_user):
+    user = make_user('reader')
+    first = add_notification(session, user)
+    add_notification(session, user)
+    assert UnreadCounter.get_counts(user.id) == (0, 2)
+
+    first.mark_as_read()
+    first.mark_as_read()
+
+    assert UnreadCounter.get_counts(user.id) == (0, 1)
+
+
+def test_reconcile_fixes_only_drifted_counters(session, make_user):
+    client, admin, other = make_user('client'), make_user('admin', is_admin=True), make_user('other')
+    chat = Chat(user_id=client.id, admin_id=admin.id, subject='Order')
+    session.add(chat)
+    session.flush()
+    session.add_all([
+        ChatMessage(chat_id=chat.id, user_id=admin.id, content='One'),
+        ChatMessage(chat_id=chat.id, user_id=admin.id, content='Two'),
+        ChatMessage(chat_id=chat.id, user_id=client.id, content='Three'),
+    ])
+    session.commit()
+    add_notification(session, client)
+    add_notification(session, client, is_read=True)
+    for user in (client, admin, other):
+        UnreadCounter.get_counts(user.id)
+
+    session.get(UnreadCounter, client.id).messages = 9
+    session.get(UnreadCounter, admin.id).notifications_total = 4
+    session.commit()
+
+    assert UnreadCounter.reconcile() == 2
+    assert UnreadCounter.get_counts(client.id) == (2, 1)
+    assert UnreadCounter.get_notification_totals(client.id) == (1, 2)
+    assert UnreadCounter.get_counts(admin.id) == (1, 0)
+    assert UnreadCounter.get_notification_totals(admin.id) == (0, 0)
+    assert UnreadCounter.reconcile() == 0
+
+
+def test_deleting_a_user_deletes_their_counter(session, make_user):
+    user = make_user('leaving')
+    UnreadCounter.get_counts(user.id)
+
+    session.delete(user)
+    session.commit()
+
+    assert session.get(UnreadCounter, user.id) is None
+
+
+def test_notifying_the_admins_refreshes_their_counts_after_the_commit(session, make_user, monkeypatch):
+    queued = []
+    monkeypatch.setattr(socketio, 'emit', lambda *args, **kwargs: None)
+    monkeypatch.setattr(notification_services, 'queue_unread_counts', queued.append)
+    admins = [make_user('first', is_admin=True), make_user('second', is_admin=True)]
+    make_user('client')
+
+    notification_services.NotificationService.notify_all_admins('New order', 'An order was placed')
+    assert queued == []
+    session.commit()
+
+    assert queued == [admin.id for admin in admins]
+    assert [UnreadCounter.get_counts(admin.id) for admin in admins] == [(0, 1), (0, 1)]